@@ -21,6 +21,9 @@ from app.models.user import User          # noqa: F401
 from app.models.audit import Audit        # noqa: F401
 from app.models.monitor import Monitor    # noqa: F401
 from app.models.task import ScanTask      # noqa: F401
+from app.models.crawl import CrawlJob     # noqa: F401
+from app.models.email_audit import EmailAuditJob  # noqa: F401
+from app.models.bulk_scan import BulkScanJob  # noqa: F401
 
 # Try optional models (may not exist yet)
 try:
@@ -0,0 +1,44 @@
+"""Scan task resume arguments
+
+Revision ID: 3b7e9a1c5d24
+Revises: fc011efa5a7f
+Create Date: 2026-10-19 10:12:41.302118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9a1c5d24'
+down_revision: Union[str, Sequence[str], None] = 'fc011efa5a7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the scan arguments needed to re-enqueue an interrupted scan task."""
+    op.add_column('scantask', sa.Column(
+        'lang',
+        sqlmodel.sql.sqltypes.AutoString(),
+        nullable=False,
+        server_default='en'
+    ))
+    # NULL for existing tasks: their plan features are unknown, so they are not resumed
+    op.add_column('scantask', sa.Column('features', sa.JSON(), nullable=True))
+    op.add_column('scantask', sa.Column(
+        'recoveries',
+        sa.Integer(),
+        nullable=False,
+        server_default='0'
+    ))
+
+
+def downgrade() -> None:
+    """Remove the scan task resume arguments."""
+    op.drop_column('scantask', 'recoveries')
+    op.drop_column('scantask', 'features')
+    op.drop_column('scantask', 'lang')
@@ -0,0 +1,39 @@
+"""Scan task owner
+
+Revision ID: 8d2f4c6a1e93
+Revises: 3b7e9a1c5d24
+Create Date: 2026-10-19 14:48:09.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4c6a1e93'
+down_revision: Union[str, Sequence[str], None] = '3b7e9a1c5d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the owner of each scan task."""
+    # NULL for existing tasks: they are no longer readable through the API
+    op.add_column('scantask', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.create_index('ix_scantask_user_id', 'scantask', ['user_id'])
+    try:
+        op.create_foreign_key('fk_scantask_user_id', 'scantask', 'users', ['user_id'], ['id'])
+    except Exception:
+        pass  # Not supported by every backend (SQLite)
+
+
+def downgrade() -> None:
+    """Remove the scan task owner."""
+    try:
+        op.drop_constraint('fk_scantask_user_id', 'scantask', type_='foreignkey')
+    except Exception:
+        pass
+    op.drop_index('ix_scantask_user_id', table_name='scantask')
+    op.drop_column('scantask', 'user_id')
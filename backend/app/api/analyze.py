@@ -4,20 +4,23 @@ Main API route for URL analysis
 """
 # ── Standard Library ──
 import asyncio
+import json
 import logging
 import time
 import uuid
 from datetime import datetime, date
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 # ── Third-Party ──
 import validators
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session
 
 # ── Local ──
 from ..database import get_session, engine
+from ..core.cache import get_redis
+from ..core.security import TASK_EVENTS_TOKEN_MINUTES, create_task_events_token, verify_task_events_token
 from ..deps import get_current_user, get_current_user_optional
 from ..models.user import User
 from ..core.permissions import FeatureGuard
@@ -33,7 +36,8 @@ from ..services import (
     GreenITAnalyzer,
     DNSAnalyzer,
 )
-from ..services.scanner import process_url
+from ..services.scanner import MAX_COMPETITORS, process_comparison_stream, process_url
+from ..services.scan_events import ScanEventChannel
 
 logger = logging.getLogger(__name__)
 
@@ -101,10 +105,10 @@ async def analyze_url(
     try:
         # Prepare tasks
         # Prepare tasks
-        tasks = [process_url(url, request.lang, allowed_features=allowed_features)]
+        tasks = [process_url(url, request.lang, allowed_features=allowed_features, mode=request.mode)]
         
         if request.competitor_url:
-            tasks.append(process_url(request.competitor_url, request.lang, allowed_features=allowed_features))
+            tasks.append(process_url(request.competitor_url, request.lang, allowed_features=allowed_features, mode=request.mode))
         
         # Run in parallel
         results = await asyncio.gather(*tasks)
@@ -132,6 +136,10 @@ async def analyze_url(
                 main_response.winner = "draw"
             
             logger.info(f"🏆 Battle Mode: {main_response.url} ({main_score}) vs {competitor_response.url} ({competitor_score}) - Winner: {main_response.winner}")
+
+        # Quick scan upgrade: the full scan of the target runs on the worker, its result is stored in the task
+        if request.mode == "quick" and request.upgrade and current_user:
+            main_response.upgrade_task_id = _enqueue_scan(session, current_user, url, request.lang, allowed_features)
             
         return main_response
         
@@ -142,13 +150,34 @@ async def analyze_url(
         )
 
 
-from ..services.scanner import process_url_stream
+from ..services.scanner import process_quick_stream, process_url_stream
+
+def _enqueue_scan(session: Session, user: User, url: str, lang: str, allowed_features: List[str]) -> str:
+    """Record a background scan task of `user` and send it to the Celery worker"""
+    task_id = str(uuid.uuid4())
+    task = ScanTask(
+        id=task_id,
+        user_id=user.id,
+        url=url,
+        lang=lang,
+        features=allowed_features,
+        status=AuditStatus.PENDING
+    )
+    session.add(task)
+    session.commit()
+    
+    from ..worker import process_scan_task
+    process_scan_task.delay(task_id, url, lang, allowed_features)
+    return task_id
+
 
 @router.get("/stream")
 async def analyze_stream(
     url: str,
     lang: str = "en",
     competitor_url: Optional[str] = None,
+    mode: str = Query("full", pattern="^(full|quick)$"),
+    upgrade: bool = Query(False, description="Quick mode: stream the full scan after the provisional result"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
@@ -180,6 +209,8 @@ async def analyze_stream(
         raise HTTPException(status_code=400, detail=f"Invalid URL: {url}")
         
     if competitor_url:
+        if mode == "quick":
+            raise HTTPException(status_code=400, detail="Quick mode does not support competitor comparison")
         competitor_url = competitor_url.strip()
         if not competitor_url.startswith(("http://", "https://")):
             competitor_url = f"https://{competitor_url}"
@@ -193,12 +224,71 @@ async def analyze_stream(
             media_type="application/x-ndjson"
         )
         
+    if mode == "quick":
+        return StreamingResponse(
+            process_quick_stream(url, lang, allowed_features=allowed_features, upgrade=upgrade),
+            media_type="application/x-ndjson"
+        )
+        
     return StreamingResponse(
         process_url_stream(url, lang, allowed_features=allowed_features), 
         media_type="application/x-ndjson"
     )
 
 
+def _normalize_url(raw: str, label: str) -> str:
+    url = raw.strip()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+    if not validators.url(url):
+        raise HTTPException(status_code=400, detail=f"Invalid {label}: {url}")
+    return url
+
+
+@router.get("/compare/stream")
+async def compare_stream(
+    url: str,
+    competitors: List[str] = Query(..., description="Competitor URLs (repeat the parameter)"),
+    lang: str = "en",
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Compare a site with several competitors: NDJSON progress of every scan,
+    then per-category rankings. Each competitor counts as one scan of the
+    daily quota, even when a recent shared result is reused.
+    """
+    config = FeatureGuard.get_plan_config(current_user.plan_tier or "starter")
+    allowed_features = config.get("features", [])
+    max_competitors = min(config.get("max_competitors", 1), MAX_COMPETITORS)
+
+    url = _normalize_url(url, "URL")
+    competitor_urls = list(dict.fromkeys(_normalize_url(raw, "Competitor URL") for raw in competitors))
+    competitor_urls = [competitor for competitor in competitor_urls if competitor != url]
+    if not competitor_urls:
+        raise HTTPException(status_code=400, detail="At least one competitor URL is required")
+    if len(competitor_urls) > max_competitors:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Your plan compares up to {max_competitors} competitors at once.",
+        )
+
+    scans = 1 + len(competitor_urls)
+    if FeatureGuard.remaining_scans(current_user) < scans:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Daily scan quota reached: this comparison needs {scans} scans.",
+        )
+    FeatureGuard.consume_scans(current_user, scans)
+    session.add(current_user)
+    session.commit()
+
+    return StreamingResponse(
+        process_comparison_stream(url, competitor_urls, lang, allowed_features=allowed_features),
+        media_type="application/x-ndjson"
+    )
+
+
 
 @router.post("/analyze/async", response_model=TaskResponse)
 async def analyze_url_async(
@@ -225,19 +315,10 @@ async def analyze_url_async(
     if not validators.url(url):
         raise HTTPException(status_code=400, detail=f"Invalid URL: {url}")
 
-    # Create Task Record
-    task_id = str(uuid.uuid4())
-    task = ScanTask(
-        id=task_id,
-        url=url,
-        status=AuditStatus.PENDING
-    )
-    session.add(task)
-    session.commit()
-    
-    # Enqueue Background Job via Celery
-    from ..worker import process_scan_task
-    process_scan_task.delay(task_id, url, request.lang)
+    config = FeatureGuard.get_plan_config(current_user.plan_tier or "starter")
+
+    # Create Task Record and enqueue Background Job via Celery
+    task_id = _enqueue_scan(session, current_user, url, request.lang, config.get("features", []))
     
     return TaskResponse(
         task_id=task_id,
@@ -246,6 +327,121 @@ async def analyze_url_async(
     )
 
 
+def _get_own_task(task_id: str, current_user: User, session: Session) -> ScanTask:
+    task = session.get(ScanTask, task_id)
+    if not task or task.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.get("/tasks/{task_id}", response_model=ScanTask)
+async def get_task(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Status and result of a background scan (async analysis or quick scan upgrade)"""
+    return _get_own_task(task_id, current_user, session)
+
+
+# Seconds between checks of the task row when Redis (live progress) is not configured
+TASK_POLL = 2.0
+
+
+def _stored_outcome(task_id: str) -> Optional[dict]:
+    """Final event of a finished task from its row (None while it runs)"""
+    with Session(engine) as session:
+        task = session.get(ScanTask, task_id)
+        if task is None:
+            return {"type": "error", "message": "Task not found"}
+        if task.status == AuditStatus.COMPLETED:
+            return {"type": "complete", "data": task.result}
+        if task.status == AuditStatus.FAILED:
+            return {"type": "error", "message": task.error or "Analysis failed"}
+        return None
+
+
+def _format_event(event: dict, seq: Optional[int], fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps(event) + "\n"
+    event_id = f"id: {seq}\n" if seq is not None else ""
+    return f"{event_id}event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _task_event_stream(task_id: str, after: int, fmt: str, finished: bool) -> AsyncIterator[str]:
+    if get_redis() is None:
+        # No live progress without Redis: only the outcome, once stored
+        while (outcome := await asyncio.to_thread(_stored_outcome, task_id)) is None:
+            await asyncio.sleep(TASK_POLL)
+        yield _format_event(outcome, None, fmt)
+        return
+
+    # A finished task only has its replay left: fall back to the row right after it
+    async for message in ScanEventChannel(task_id).subscribe(after, idle=0.0 if finished else 15.0):
+        if message is None:
+            # Quiet for a while: the terminal event may be gone (replay expired, worker lost)
+            outcome = await asyncio.to_thread(_stored_outcome, task_id)
+            if outcome is not None:
+                yield _format_event(outcome, None, fmt)
+                return
+            if fmt == "sse":
+                yield ": keepalive\n\n"
+            continue
+        yield _format_event(message["event"], message["seq"], fmt)
+
+
+@router.post("/tasks/{task_id}/events/token")
+async def task_events_token(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Short-lived token for /tasks/{id}/events?token=..., for clients that cannot set headers (EventSource)"""
+    _get_own_task(task_id, current_user, session)
+    return {
+        "token": create_task_events_token(task_id, current_user.id),
+        "expires_in": TASK_EVENTS_TOKEN_MINUTES * 60,
+    }
+
+
+@router.get("/tasks/{task_id}/events")
+async def task_events(
+    task_id: str,
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+    token: Optional[str] = Query(None, description="Token from POST /tasks/{id}/events/token, instead of the Authorization header"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    session: Session = Depends(get_session),
+):
+    """
+    Live progress of a background scan, like /api/stream: the recent events
+    replayed, then live ones, until "complete" or "error". Server-sent events
+    (reconnections resume after Last-Event-ID) or NDJSON.
+    Only the task's owner can follow it (bearer token, or `token` for EventSource).
+    """
+    if current_user is not None:
+        user_id = current_user.id
+    else:
+        user_id = verify_task_events_token(token, task_id) if token else None
+    if user_id is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    task = session.get(ScanTask, task_id)
+    if not task or task.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    finished = task.status in (AuditStatus.COMPLETED, AuditStatus.FAILED)
+
+    return StreamingResponse(
+        _task_event_stream(task_id, after, format, finished),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
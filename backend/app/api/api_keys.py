@@ -5,8 +5,7 @@ from app.models.user import User
 from app.models.api_key import ApiKey, ApiKeyCreate, ApiKeyRead, ApiKeyCreated
 from app.deps import get_current_user
 from app.core.permissions import FeatureGuard
-import secrets
-import hashlib
+from app.services.api_keys import create_api_key
 
 router = APIRouter(prefix="/api/api-keys", tags=["api-keys"])
 
@@ -27,22 +26,7 @@ def create_key(
     if not FeatureGuard.can_perform_action(current_user, "api_access"):
         raise HTTPException(status_code=403, detail="API access is restricted to Agency plan.")
     
-    # Generate key
-    raw_key = "sk_" + secrets.token_urlsafe(32)
-    # Prefix for UI
-    prefix = raw_key[:8]
-    # Hash
-    hashed_key = hashlib.sha256(raw_key.encode()).hexdigest()
-    
-    api_key = ApiKey(
-        user_id=current_user.id,
-        name=key_in.name,
-        prefix=prefix,
-        hashed_key=hashed_key
-    )
-    session.add(api_key)
-    session.commit()
-    session.refresh(api_key)
+    api_key, raw_key = create_api_key(session, current_user.id, key_in.name)
     
     return ApiKeyCreated(
         **api_key.model_dump(),
@@ -0,0 +1,271 @@
+"""
+Bulk Scan Routes
+Upload a URL list (CSV or one URL per line), follow, download, cancel and resume
+full scans of every URL (run as Celery jobs fanned out over several workers)
+"""
+import asyncio
+import csv
+import io
+import json
+import uuid
+from typing import AsyncIterator, List, Optional
+
+import validators
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from ..database import get_session, engine
+from ..deps import get_current_user
+from ..core.cache import get_redis
+from ..core.permissions import FeatureGuard
+from ..models.user import User
+from ..models.audit import Audit
+from ..models.bulk_scan import BulkScanJob, BulkScanRead, BulkScanStatus
+from ..services.bulk_scan import MAX_URLS, SCAN_FEATURES, SHARDS, BulkScanShard
+
+router = APIRouter(prefix="/api/bulk-scans", tags=["Bulk Scans"])
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+# Seconds between checks for new results while following a running job
+FOLLOW_POLL = 2.0
+STREAM_BATCH = 500
+
+_FINISHED = (BulkScanStatus.COMPLETED, BulkScanStatus.FAILED, BulkScanStatus.CANCELLED)
+
+
+def _get_own_job(job_id: str, current_user: User, session: Session) -> BulkScanJob:
+    job = session.get(BulkScanJob, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Bulk scan not found")
+    return job
+
+
+def _parse_urls(content: bytes) -> List[Optional[str]]:
+    """First cell of every row, as a URL (https:// when no scheme), None when invalid; header rows are dropped"""
+    text = content.decode("utf-8-sig", errors="replace")
+    urls = []
+    for row in csv.reader(io.StringIO(text)):
+        cell = next((value.strip() for value in row if value.strip()), "")
+        if not cell or cell.lower() in ("url", "urls", "site", "website", "domain"):
+            continue
+        url = cell if cell.startswith(("http://", "https://")) else f"https://{cell}"
+        urls.append(url if validators.url(url) else None)
+    return urls
+
+
+def _select_features(current_user: User, features: Optional[str]) -> List[str]:
+    """Requested scan features, all within the plan; by default every plan feature but the headless browser"""
+    plan_features = FeatureGuard.get_plan_config(current_user.plan_tier or "starter").get("features", [])
+    if not features:
+        return [feature for feature in SCAN_FEATURES if feature in plan_features and feature != "deep_scan"]
+
+    selected = list(dict.fromkeys(feature.strip() for feature in features.split(",") if feature.strip()))
+    unknown = [feature for feature in selected if feature not in SCAN_FEATURES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown features: {', '.join(unknown)}")
+    not_allowed = [feature for feature in selected if feature not in plan_features]
+    if not_allowed:
+        raise HTTPException(status_code=403, detail=f"Upgrade required for: {', '.join(not_allowed)}")
+    return selected
+
+
+def _is_finished(job_id: str) -> bool:
+    # Short-lived session: a followed stream can stay open for a long time
+    with Session(engine) as session:
+        job = session.get(BulkScanJob, job_id)
+        return job is None or job.status in _FINISHED
+
+
+def _with_full_results(rows: List[str]) -> List[str]:
+    """Summary lines with the full scan result (from the audit history) under "result" """
+    parsed = [json.loads(raw) for raw in rows]
+    ids = [row["audit_id"] for row in parsed if row.get("audit_id")]
+    with Session(engine) as session:
+        audits = {audit.id: audit for audit in session.exec(select(Audit).where(Audit.id.in_(ids)))} if ids else {}
+    for row in parsed:
+        audit = audits.get(row.get("audit_id"))
+        row["result"] = json.loads(audit.summary) if audit else None
+    return [json.dumps(row) for row in parsed]
+
+
+async def _stream_results(job_id: str, offset: int, limit: Optional[int], follow: bool, full: bool) -> AsyncIterator[str]:
+    """NDJSON lines from offset (limit lines at most); when following, until the job has stopped and every line was sent"""
+    sent = 0
+    while limit is None or sent < limit:
+        finished = not follow or await asyncio.to_thread(_is_finished, job_id)
+        batch = STREAM_BATCH if limit is None else min(STREAM_BATCH, limit - sent)
+        rows = await BulkScanShard.read_results(job_id, offset, batch)
+        if rows:
+            if full:
+                rows = await asyncio.to_thread(_with_full_results, rows)
+            offset += len(rows)
+            sent += len(rows)
+            yield "\n".join(rows) + "\n"
+            continue
+        if finished:
+            return
+        await asyncio.sleep(FOLLOW_POLL)
+
+
+def _dispatch(job: BulkScanJob):
+    from ..worker import run_bulk_scan
+    for shard in range(job.shards):
+        run_bulk_scan.delay(job.id, shard)
+
+
+@router.post("", response_model=BulkScanRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_bulk_scan(
+    file: UploadFile = File(...),
+    features: Optional[str] = Form(None),
+    lang: str = Form("en"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Scan every URL of an uploaded list in the background.
+    `features` is a comma-separated subset of the plan's scan features.
+    Each URL counts as one scan of the daily quota, reserved at upload.
+    """
+    if not FeatureGuard.can_perform_action(current_user, "bulk_scan"):
+        raise HTTPException(status_code=403, detail="Bulk scans are restricted to Agency plan.")
+    selected = _select_features(current_user, features)
+    if get_redis() is None:
+        raise HTTPException(status_code=503, detail="Bulk scans are unavailable (Redis not configured)")
+
+    content = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=400, detail="File too large (5 MB max)")
+    entries = _parse_urls(content)
+    urls = list(dict.fromkeys(url for url in entries if url))
+    if not urls:
+        raise HTTPException(status_code=400, detail="No valid URL in the file")
+    if len(urls) > MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"Too many URLs: {MAX_URLS} at most per bulk scan")
+
+    remaining = FeatureGuard.remaining_scans(current_user)
+    if len(urls) > remaining:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Daily scan quota allows {remaining} more scans, the file has {len(urls)} URLs.",
+        )
+    FeatureGuard.consume_scans(current_user, len(urls))
+    session.add(current_user)
+
+    job = BulkScanJob(
+        id=str(uuid.uuid4()),
+        user_id=current_user.id,
+        lang=lang,
+        features=selected,
+        shards=min(SHARDS, len(urls)),
+        url_count=len(urls),
+        urls_skipped=len(entries) - len(urls),
+    )
+    await BulkScanShard.enqueue(job.id, urls)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    _dispatch(job)
+
+    return job
+
+
+@router.get("", response_model=List[BulkScanRead])
+async def list_bulk_scans(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    List the current user's bulk scans, newest first
+    """
+    statement = (
+        select(BulkScanJob)
+        .where(BulkScanJob.user_id == current_user.id)
+        .order_by(BulkScanJob.created_at.desc())
+    )
+    return session.exec(statement).all()
+
+
+@router.get("/{job_id}", response_model=BulkScanRead)
+async def read_bulk_scan(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Bulk scan progress as of the last checkpoint
+    """
+    return _get_own_job(job_id, current_user, session)
+
+
+@router.get("/{job_id}/results")
+async def stream_bulk_scan_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    follow: bool = Query(True),
+    full: bool = Query(False),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Per-URL results as NDJSON, in completion order: {"index", "url", "status",
+    "score", "scores", "audit_id", "duration", "error"}.
+    With follow, the response stays open and streams URLs as they finish.
+    Download in chunks with follow=false&offset=..&limit=..; full=true adds
+    each complete scan result under "result" (limit required, 100 at most).
+    """
+    _get_own_job(job_id, current_user, session)
+    if full and (limit is None or limit > 100):
+        raise HTTPException(status_code=400, detail="Full results are downloaded in chunks: limit 100 at most")
+    return StreamingResponse(
+        _stream_results(job_id, offset, limit, follow, full),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.delete("/{job_id}", response_model=BulkScanRead)
+async def cancel_bulk_scan(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Stop a bulk scan: running scans are interrupted and can be resumed
+    """
+    job = _get_own_job(job_id, current_user, session)
+    if job.status in (BulkScanStatus.PENDING, BulkScanStatus.RUNNING):
+        await BulkScanShard.request_cancel(job_id)
+        if job.status == BulkScanStatus.PENDING:
+            job.status = BulkScanStatus.CANCELLED
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+    return job
+
+
+@router.post("/{job_id}/resume", response_model=BulkScanRead, status_code=status.HTTP_202_ACCEPTED)
+async def resume_bulk_scan(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Continue a cancelled or failed bulk scan with the URLs not done yet
+    """
+    job = _get_own_job(job_id, current_user, session)
+    if job.status not in (BulkScanStatus.CANCELLED, BulkScanStatus.FAILED):
+        raise HTTPException(status_code=409, detail=f"Bulk scan is {job.status.value}, only cancelled or failed scans can be resumed")
+
+    await BulkScanShard.clear_cancel(job_id)
+    job.status = BulkScanStatus.PENDING
+    job.finished_at = None
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    _dispatch(job)
+
+    return job
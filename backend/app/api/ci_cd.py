@@ -0,0 +1,53 @@
+"""
+CI/CD Routes
+Pass/fail gate for deployment pipelines, authenticated with an API key
+(X-API-Key header). Passed answers 200, failed answers 422 so that
+`curl --fail` breaks the build.
+"""
+import validators
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlmodel import Session
+
+from ..database import get_session
+from ..deps import get_api_key_user
+from ..core.permissions import FeatureGuard
+from ..models import CIGateRequest, CIGateResponse
+from ..models.user import User
+from ..services.ci_gate import run_gate
+
+router = APIRouter(prefix="/api/v1", tags=["CI/CD"])
+
+
+@router.post("/scan", response_model=CIGateResponse, responses={422: {"model": CIGateResponse}})
+async def pipeline_scan(
+    request: CIGateRequest,
+    current_user: User = Depends(get_api_key_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Scan a deployment and compare its global score with the threshold.
+    Analyzers still running once the verdict is certain are cancelled.
+    """
+    if not FeatureGuard.can_perform_action(current_user, "api_access"):
+        raise HTTPException(status_code=403, detail="API access is restricted to Agency plan.")
+    if not validators.url(request.url):
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {request.url}")
+    if FeatureGuard.remaining_scans(current_user) < 1:
+        raise HTTPException(status_code=403, detail="Daily scan quota reached. Upgrade your plan for more.")
+
+    FeatureGuard.consume_scans(current_user)
+    session.add(current_user)
+    session.commit()
+
+    config = FeatureGuard.get_plan_config(current_user.plan_tier or "starter")
+    result = await run_gate(
+        request.url,
+        request.threshold,
+        request.lang,
+        allowed_features=config.get("features", []),
+        fail_on_error=request.fail_on_error,
+    )
+    if result.status == "failed":
+        return JSONResponse(status_code=422, content=result.model_dump(mode="json"))
+    return result
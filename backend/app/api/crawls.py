@@ -0,0 +1,150 @@
+"""
+Large-Site Crawl Routes
+Start, follow, cancel and resume crawls of 50k-500k pages (run as Celery jobs)
+"""
+import uuid
+from typing import Any, Dict, List
+
+import validators
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, select
+
+from ..database import get_session
+from ..deps import get_current_user
+from ..core.permissions import FeatureGuard
+from ..models.user import User
+from ..models.crawl import CrawlJob, CrawlJobCreate, CrawlJobRead, CrawlStatus
+from ..services.large_crawl import LargeSiteCrawler
+
+router = APIRouter(prefix="/api/crawls", tags=["Large Crawls"])
+
+
+def _get_own_job(crawl_id: str, current_user: User, session: Session) -> CrawlJob:
+    job = session.get(CrawlJob, crawl_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+    return job
+
+
+@router.post("", response_model=CrawlJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_crawl(
+    crawl_in: CrawlJobCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Start a large-site crawl in the background
+    """
+    if not FeatureGuard.can_perform_action(current_user, "large_crawl"):
+        raise HTTPException(status_code=403, detail="Large-site crawls are restricted to Agency plan.")
+
+    url = crawl_in.url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+    if not validators.url(url):
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {url}")
+
+    job = CrawlJob(
+        id=str(uuid.uuid4()),
+        user_id=current_user.id,
+        url=url,
+        max_pages=crawl_in.max_pages,
+        max_depth=crawl_in.max_depth,
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    from ..worker import run_large_crawl
+    run_large_crawl.delay(job.id)
+
+    return job
+
+
+@router.get("", response_model=List[CrawlJobRead])
+async def list_crawls(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    List the current user's crawls, newest first
+    """
+    statement = (
+        select(CrawlJob)
+        .where(CrawlJob.user_id == current_user.id)
+        .order_by(CrawlJob.created_at.desc())
+    )
+    return session.exec(statement).all()
+
+
+@router.get("/{crawl_id}", response_model=CrawlJobRead)
+async def read_crawl(
+    crawl_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Crawl progress as of the last checkpoint
+    """
+    return _get_own_job(crawl_id, current_user, session)
+
+
+@router.get("/{crawl_id}/pages")
+async def read_crawl_pages(
+    crawl_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> List[Dict[str, Any]]:
+    """
+    Crawled pages in crawl order: [{"url", "status", "depth"}]
+    """
+    _get_own_job(crawl_id, current_user, session)
+    return await LargeSiteCrawler.read_pages(crawl_id, offset, limit)
+
+
+@router.delete("/{crawl_id}", response_model=CrawlJobRead)
+async def cancel_crawl(
+    crawl_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Stop a crawl at its next checkpoint (its state is kept and can be resumed)
+    """
+    job = _get_own_job(crawl_id, current_user, session)
+    if job.status in (CrawlStatus.PENDING, CrawlStatus.RUNNING):
+        await LargeSiteCrawler.request_cancel(crawl_id)
+        if job.status == CrawlStatus.PENDING:
+            job.status = CrawlStatus.CANCELLED
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+    return job
+
+
+@router.post("/{crawl_id}/resume", response_model=CrawlJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def resume_crawl(
+    crawl_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Continue a cancelled or failed crawl from its last state
+    """
+    job = _get_own_job(crawl_id, current_user, session)
+    if job.status not in (CrawlStatus.CANCELLED, CrawlStatus.FAILED):
+        raise HTTPException(status_code=409, detail=f"Crawl is {job.status.value}, only cancelled or failed crawls can be resumed")
+
+    await LargeSiteCrawler.clear_cancel(crawl_id)
+    job.status = CrawlStatus.PENDING
+    job.finished_at = None
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    from ..worker import run_large_crawl
+    run_large_crawl.delay(job.id)
+
+    return job
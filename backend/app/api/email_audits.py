@@ -0,0 +1,214 @@
+"""
+Bulk Email Audit Routes
+Start, follow, export and cancel SPF/DMARC/DKIM/MX audits of up to 10k domains (run as Celery jobs)
+"""
+import asyncio
+import uuid
+from typing import AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from ..database import get_session, engine
+from ..deps import get_current_user
+from ..core.cache import get_redis
+from ..core.permissions import FeatureGuard
+from ..models.user import User
+from ..models.email_audit import EmailAuditJob, EmailAuditCreate, EmailAuditRead, EmailAuditStatus
+from ..services.bulk_email_audit import MAX_DOMAINS, BulkEmailAudit, normalize_domain
+
+router = APIRouter(prefix="/api/email-audits", tags=["Bulk Email Audits"])
+
+# Seconds between checks for new results while following a running audit
+FOLLOW_POLL = 1.0
+STREAM_BATCH = 500
+
+_FINISHED = (EmailAuditStatus.COMPLETED, EmailAuditStatus.FAILED, EmailAuditStatus.CANCELLED)
+
+
+def _get_own_job(audit_id: str, current_user: User, session: Session) -> EmailAuditJob:
+    job = session.get(EmailAuditJob, audit_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Email audit not found")
+    return job
+
+
+def _is_finished(audit_id: str) -> bool:
+    # Short-lived session: a followed stream can stay open for minutes
+    with Session(engine) as session:
+        job = session.get(EmailAuditJob, audit_id)
+        return job is None or job.status in _FINISHED
+
+
+async def _stream_results(audit_id: str, offset: int, follow: bool) -> AsyncIterator[str]:
+    """NDJSON lines from offset; when following, until the audit has stopped and every line was sent"""
+    while True:
+        finished = not follow or await asyncio.to_thread(_is_finished, audit_id)
+        rows = await BulkEmailAudit.read_results(audit_id, offset, STREAM_BATCH)
+        if rows:
+            offset += len(rows)
+            yield "\n".join(rows) + "\n"
+            continue
+        if finished:
+            return
+        await asyncio.sleep(FOLLOW_POLL)
+
+
+@router.post("", response_model=EmailAuditRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_email_audit(
+    audit_in: EmailAuditCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Start a bulk email-health audit in the background.
+    Entries may be domains, URLs or email addresses; invalid and duplicate ones are skipped.
+    """
+    if not FeatureGuard.can_perform_action(current_user, "bulk_email_audit"):
+        raise HTTPException(status_code=403, detail="Bulk email audits are restricted to Agency plan.")
+    if len(audit_in.domains) > MAX_DOMAINS:
+        raise HTTPException(status_code=400, detail=f"Too many domains: {MAX_DOMAINS} at most per audit")
+    if get_redis() is None:
+        raise HTTPException(status_code=503, detail="Bulk email audits are unavailable (Redis not configured)")
+
+    domains = list(dict.fromkeys(
+        domain for domain in (normalize_domain(raw) for raw in audit_in.domains) if domain
+    ))
+    if not domains:
+        raise HTTPException(status_code=400, detail="No valid domain in the list")
+
+    job = EmailAuditJob(
+        id=str(uuid.uuid4()),
+        user_id=current_user.id,
+        domain_count=len(domains),
+        domains_skipped=len(audit_in.domains) - len(domains),
+    )
+    await BulkEmailAudit.store_domains(job.id, domains)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    from ..worker import run_email_audit
+    run_email_audit.delay(job.id)
+
+    return job
+
+
+@router.get("", response_model=List[EmailAuditRead])
+async def list_email_audits(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    List the current user's email audits, newest first
+    """
+    statement = (
+        select(EmailAuditJob)
+        .where(EmailAuditJob.user_id == current_user.id)
+        .order_by(EmailAuditJob.created_at.desc())
+    )
+    return session.exec(statement).all()
+
+
+@router.get("/{audit_id}", response_model=EmailAuditRead)
+async def read_email_audit(
+    audit_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Audit progress as of the last checkpoint
+    """
+    return _get_own_job(audit_id, current_user, session)
+
+
+@router.get("/{audit_id}/results")
+async def stream_email_audit_results(
+    audit_id: str,
+    offset: int = Query(0, ge=0),
+    follow: bool = Query(True),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Per-domain results as NDJSON, in completion order.
+    With follow, the response stays open and streams domains as they finish;
+    reconnect with offset = lines already received to pick up where it stopped.
+    """
+    _get_own_job(audit_id, current_user, session)
+    return StreamingResponse(
+        _stream_results(audit_id, offset, follow),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/{audit_id}/export")
+async def export_email_audit(
+    audit_id: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Download every result of a finished audit (CSV or NDJSON)
+    """
+    job = _get_own_job(audit_id, current_user, session)
+    if job.status not in _FINISHED:
+        raise HTTPException(status_code=409, detail=f"Email audit is {job.status.value}, export it once finished")
+
+    if format == "csv":
+        body, media_type = BulkEmailAudit.export_csv(audit_id), "text/csv"
+    else:
+        body, media_type = _stream_results(audit_id, 0, follow=False), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="email-audit-{audit_id}.{format}"'}
+    )
+
+
+@router.delete("/{audit_id}", response_model=EmailAuditRead)
+async def cancel_email_audit(
+    audit_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Stop an audit at its next checkpoint (finished domains are kept and it can be resumed)
+    """
+    job = _get_own_job(audit_id, current_user, session)
+    if job.status in (EmailAuditStatus.PENDING, EmailAuditStatus.RUNNING):
+        await BulkEmailAudit.request_cancel(audit_id)
+        if job.status == EmailAuditStatus.PENDING:
+            job.status = EmailAuditStatus.CANCELLED
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+    return job
+
+
+@router.post("/{audit_id}/resume", response_model=EmailAuditRead, status_code=status.HTTP_202_ACCEPTED)
+async def resume_email_audit(
+    audit_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Continue a cancelled or failed audit with the domains not done yet
+    """
+    job = _get_own_job(audit_id, current_user, session)
+    if job.status not in (EmailAuditStatus.CANCELLED, EmailAuditStatus.FAILED):
+        raise HTTPException(status_code=409, detail=f"Email audit is {job.status.value}, only cancelled or failed audits can be resumed")
+
+    await BulkEmailAudit.clear_cancel(audit_id)
+    job.status = EmailAuditStatus.PENDING
+    job.finished_at = None
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    from ..worker import run_email_audit
+    run_email_audit.delay(job.id)
+
+    return job
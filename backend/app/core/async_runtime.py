@@ -0,0 +1,138 @@
+"""
+Async Worker Runtime
+One long-lived event loop per worker process, on a background thread.
+
+Celery tasks hand their coroutine to this loop instead of starting a loop of
+their own (async_to_sync). Scans are I/O-bound, so with a thread pool
+(`celery worker -P threads -c 64`) one process runs many scans at once on the
+shared loop, up to WORKER_MAX_INFLIGHT. Everything bound to the loop outlives
+each task: the browser, the Redis and DNS clients, the politeness schedule and
+the per-loop caches.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncRuntime:
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _thread: Optional[threading.Thread] = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+    # Created on the loop (asyncio primitives are bound to it)
+    _inflight: Optional[asyncio.Semaphore] = None
+
+    max_inflight: int = 0
+    stats: Dict[str, int] = {"submitted": 0, "waiting": 0, "running": 0, "peak_running": 0, "completed": 0, "failed": 0}
+
+    @classmethod
+    def configure(cls, max_inflight: int):
+        """Tasks running at once on the loop (0 = no limit). Takes effect on the next start."""
+        cls.max_inflight = max_inflight
+
+    @classmethod
+    def start(cls) -> asyncio.AbstractEventLoop:
+        """The process's loop, started on first use (and again in a forked child)"""
+        with cls._lock:
+            if cls._loop is not None and cls._pid == os.getpid() and cls._thread.is_alive():
+                return cls._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def serve():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=serve, name="async-runtime", daemon=True)
+            thread.start()
+            ready.wait()
+
+            cls._loop, cls._thread, cls._pid = loop, thread, os.getpid()
+            cls._inflight = None
+            logger.info(f"🔁 AsyncRuntime: Shared event loop started (pid {cls._pid}, "
+                        f"{cls.max_inflight or 'unlimited'} tasks in flight)")
+            return loop
+
+    @classmethod
+    def run(cls, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """
+        Run fn() on the shared loop and block the calling thread until it is done.
+        On timeout (or when the calling thread is interrupted) the coroutine is cancelled.
+        """
+        loop = cls.start()
+        if threading.current_thread() is cls._thread:
+            raise RuntimeError("AsyncRuntime.run() called from the runtime loop: await the coroutine instead")
+
+        cls.stats["submitted"] += 1
+        future = asyncio.run_coroutine_threadsafe(cls._limited(fn), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    @classmethod
+    async def _limited(cls, fn: Callable[[], Awaitable[T]]) -> T:
+        if cls._inflight is None and cls.max_inflight > 0:
+            cls._inflight = asyncio.Semaphore(cls.max_inflight)
+
+        stats = cls.stats
+        stats["waiting"] += 1
+        try:
+            if cls._inflight is not None:
+                await cls._inflight.acquire()
+        finally:
+            stats["waiting"] -= 1
+
+        stats["running"] += 1
+        stats["peak_running"] = max(stats["peak_running"], stats["running"])
+        try:
+            result = await fn()
+            stats["completed"] += 1
+            return result
+        except BaseException:
+            stats["failed"] += 1
+            raise
+        finally:
+            stats["running"] -= 1
+            if cls._inflight is not None:
+                cls._inflight.release()
+
+    @classmethod
+    def stop(cls, timeout: float = 10.0, cleanup: Optional[Callable[[], Awaitable[Any]]] = None):
+        """Cancel what is still running, run cleanup() on the loop, then stop it"""
+        with cls._lock:
+            loop, thread = cls._loop, cls._thread
+            if loop is None or cls._pid != os.getpid():
+                return
+            cls._loop = cls._thread = cls._pid = None
+
+        async def shutdown():
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if cleanup is not None:
+                try:
+                    await cleanup()
+                except Exception as e:
+                    logger.warning(f"AsyncRuntime cleanup failed: {e}")
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"AsyncRuntime: Shutdown incomplete: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("🛑 AsyncRuntime: Shared event loop stopped.")
@@ -0,0 +1,37 @@
+"""
+Shared Redis access for scan-time caches.
+Clients are bound to the running event loop (Celery tasks may run several loops per process).
+"""
+import asyncio
+import logging
+import weakref
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Async Redis client for the current event loop.
+    Returns None when Redis is not configured; callers treat caches as optional.
+    """
+    settings = get_settings()
+    if not settings.redis_url:
+        return None
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(
+            settings.redis_url,
+            socket_timeout=2.0,
+            socket_connect_timeout=2.0,
+        )
+        _clients[loop] = client
+    return client
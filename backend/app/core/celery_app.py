@@ -1,5 +1,8 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+from .async_runtime import AsyncRuntime
 from .config import get_settings
+from .executor import CPUExecutor
 
 settings = get_settings()
 
@@ -16,4 +19,31 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_acks_late=True, # Ensure tasks are not lost if worker crashes
+    task_reject_on_worker_lost=True, # Requeue them too when the worker process dies (tasks are idempotent)
 )
+
+
+@worker_process_init.connect
+def init_cpu_pool(**kwargs):
+    # Each worker process gets its own pool (falls back to threads in prefork children)
+    CPUExecutor.start(settings.cpu_pool_workers, settings.cpu_task_limits_map)
+
+
+@worker_process_shutdown.connect
+def shutdown_cpu_pool(**kwargs):
+    CPUExecutor.shutdown(wait=False)
+
+
+@worker_init.connect
+def init_async_runtime(sender=None, **kwargs):
+    AsyncRuntime.configure(settings.worker_max_inflight)
+    # The thread pool runs tasks in this process (no worker_process_init): start the CPU pool here
+    if "thread" in str(getattr(sender, "pool_cls", "")).lower():
+        CPUExecutor.start(settings.cpu_pool_workers, settings.cpu_task_limits_map)
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_async_runtime(**kwargs):
+    from ..services.rendering import RenderingService
+    AsyncRuntime.stop(cleanup=RenderingService.stop)
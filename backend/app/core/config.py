@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -56,6 +56,34 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://redis:6379/0"
 
+    # CPU pool (parsing, fingerprinting, image diffing)
+    # 0 = one worker per CPU core
+    cpu_pool_workers: int = 0
+    # Per task type concurrency caps, e.g. "parse=4,wappalyzer=2,image_diff=1"
+    cpu_task_limits: str = ""
+
+    # Bulk scans: full scans running at once across all workers and jobs
+    bulk_scan_concurrency: int = 16
+
+    # Celery tasks share one long-lived event loop per worker process
+    # (run the worker with `-P threads -c N` to run several scans per process)
+    worker_shared_loop: bool = True
+    # Tasks running at once on that loop (0 = no limit)
+    worker_max_inflight: int = 32
+
+    # Requests to each audited host, across every scan and worker (0 = no limit)
+    politeness_host_connections: int = 6
+    politeness_host_rps: float = 10.0
+    # Outbound requests in flight per process (0 = half the open-file limit)
+    outbound_socket_budget: int = 0
+
+    # Offline CVE index (see scripts/import_cve_feed.py)
+    cve_index_path: str = "data/cve_index.sqlite3"
+
+    # Known JS library hashes (see scripts/import_js_hashes.py)
+    js_hash_detection: bool = True
+    js_hash_index_path: str = "data/js_hashes.sqlite3"
+
     # AI / LLM
     openrouter_api_key: str = ""
     openai_api_key: str = ""
@@ -64,6 +92,15 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def cpu_task_limits_map(self) -> Dict[str, int]:
+        limits = {}
+        for item in self.cpu_task_limits.split(","):
+            if "=" in item:
+                name, value = item.split("=", 1)
+                limits[name.strip()] = int(value)
+        return limits
+
     model_config = SettingsConfigDict(
         env_file=[".env", "backend/.env"],
         env_file_encoding="utf-8",
@@ -0,0 +1,133 @@
+"""
+CPU Executor
+Managed process pool for CPU-heavy analysis steps (HTML parsing, fingerprinting, image diffing).
+Keeps the event loop free: every job goes through a per-task-type concurrency cap,
+and queue depth / timings are tracked so the pool can be monitored.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent jobs per task type (the pool itself is shared).
+# Anything not listed falls back to "default".
+DEFAULT_TASK_LIMITS = {
+    "parse": 4,
+    "wappalyzer": 2,
+    "seo": 2,
+    "image_diff": 1,
+    "default": 2,
+}
+
+
+class CPUExecutor:
+    """
+    Singleton wrapper around a ProcessPoolExecutor.
+
+    Task functions must be module-level (picklable) and return plain data
+    (dicts, lists, tuples or pydantic models).
+    """
+    _executor: Optional[Executor] = None
+    _is_process_pool: bool = False
+    _limits: Dict[str, int] = dict(DEFAULT_TASK_LIMITS)
+    # asyncio primitives are bound to a loop; Celery may run several loops per process
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+    _stats: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def start(cls, max_workers: int = 0, limits: Optional[Dict[str, int]] = None):
+        """Create the pool. Safe to call more than once (the previous pool is replaced)."""
+        if cls._executor is not None:
+            cls.shutdown(wait=False)
+
+        workers = max_workers or os.cpu_count() or 2
+        if limits:
+            cls._limits.update(limits)
+
+        # Daemonic processes (Celery prefork children) cannot spawn children.
+        # There, a scan already owns its whole process, so a thread pool is enough.
+        if multiprocessing.current_process().daemon:
+            cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+            cls._is_process_pool = False
+            logger.info(f"⚙️ CPUExecutor: Daemonic process, using thread pool ({workers} workers)")
+        else:
+            cls._executor = ProcessPoolExecutor(max_workers=workers)
+            cls._is_process_pool = True
+            logger.info(f"⚙️ CPUExecutor: Process pool started ({workers} workers)")
+
+    @classmethod
+    def shutdown(cls, wait: bool = True):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=wait, cancel_futures=True)
+            cls._executor = None
+            logger.info("🛑 CPUExecutor: Pool stopped.")
+
+    @classmethod
+    def _semaphore(cls, task_type: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        per_loop = cls._semaphores.setdefault(loop, {})
+        if task_type not in per_loop:
+            limit = cls._limits.get(task_type, cls._limits.get("default", 2))
+            per_loop[task_type] = asyncio.Semaphore(limit)
+        return per_loop[task_type]
+
+    @classmethod
+    def _stat(cls, task_type: str) -> Dict[str, float]:
+        return cls._stats.setdefault(task_type, {
+            "queued": 0, "running": 0, "completed": 0, "failed": 0, "total_seconds": 0.0
+        })
+
+    @classmethod
+    async def run(cls, task_type: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) off the event loop, limited by the task type's concurrency cap.
+        Falls back to the loop's default thread pool when the pool was never started
+        (scripts, one-off CLI usage).
+        """
+        stat = cls._stat(task_type)
+        loop = asyncio.get_running_loop()
+
+        stat["queued"] += 1
+        try:
+            await cls._semaphore(task_type).acquire()
+        finally:
+            stat["queued"] -= 1
+
+        stat["running"] += 1
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(cls._executor, fn, *args)
+            stat["completed"] += 1
+            return result
+        except Exception:
+            stat["failed"] += 1
+            raise
+        finally:
+            stat["running"] -= 1
+            stat["total_seconds"] += time.perf_counter() - started
+            cls._semaphore(task_type).release()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Queue depth and throughput per task type (exposed on /health)."""
+        per_type = {}
+        for task_type, stat in cls._stats.items():
+            done = stat["completed"] + stat["failed"]
+            per_type[task_type] = {
+                "queued": int(stat["queued"]),
+                "running": int(stat["running"]),
+                "completed": int(stat["completed"]),
+                "failed": int(stat["failed"]),
+                "limit": cls._limits.get(task_type, cls._limits.get("default", 2)),
+                "avg_ms": round(stat["total_seconds"] / done * 1000, 1) if done else 0.0,
+            }
+        return {
+            "mode": "process" if cls._is_process_pool and cls._executor else ("thread" if cls._executor else "default"),
+            "tasks": per_type,
+        }
@@ -41,3 +41,27 @@ class FeatureGuard:
             
         return user.scans_count_today < daily_limit
 
+    @staticmethod
+    def remaining_scans(user: User) -> int:
+        """
+        Scans left in today's quota.
+        """
+        user_plan = user.plan_tier or "starter"
+        config = FeatureGuard.get_plan_config(user_plan)
+        daily_limit = config.get("daily_scans", 0)
+
+        if user.last_scan_date != date.today():
+            return daily_limit
+        return max(0, daily_limit - user.scans_count_today)
+
+    @staticmethod
+    def consume_scans(user: User, count: int = 1):
+        """
+        Count scans against today's quota (caller commits the user).
+        """
+        today = date.today()
+        if user.last_scan_date != today:
+            user.scans_count_today = count
+            user.last_scan_date = today
+        else:
+            user.scans_count_today += count
@@ -5,7 +5,8 @@ PLANS = {
         "features": ["basic_scan", "seo_scan", "tech_scan", "links_scan", "smo_scan", "dns_scan"],
         "label": "Starter (Gratuit)",
         "history_days": 7,
-        "monitor_limit": 1
+        "monitor_limit": 1,
+        "max_competitors": 1
     },
     "pro": {
         "daily_scans": 50,
@@ -14,15 +15,17 @@ PLANS = {
                      "security_scan", "gdpr_scan", "green_scan"],
         "label": "Pro",
         "history_days": 30,
-        "monitor_limit": 10
+        "monitor_limit": 10,
+        "max_competitors": 5
     },
     "agency": {
         "daily_scans": 9999,
-        "features": ["basic_scan", "deep_scan", "pdf_export", "history", "ai_assistant", "whitelabel", "api_access", "lead_widget",
+        "features": ["basic_scan", "deep_scan", "pdf_export", "history", "ai_assistant", "whitelabel", "api_access", "lead_widget", "large_crawl", "bulk_email_audit", "bulk_scan",
                      "seo_scan", "tech_scan", "links_scan", "smo_scan", "dns_scan",
                      "security_scan", "gdpr_scan", "green_scan"],
         "label": "Agency",
         "history_days": 3650,
-        "monitor_limit": 9999
+        "monitor_limit": 9999,
+        "max_competitors": 10
     }
 }
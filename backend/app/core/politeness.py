@@ -0,0 +1,495 @@
+"""
+Host Politeness Scheduler
+Every outbound request to an audited site goes through one per-host schedule,
+shared by the analyzers of a scan (links, crawler, exposed files, Green IT,
+SMO...), by concurrent scans and by every worker, so a site scanned from
+several sources at once still sees a bounded, spaced-out stream of requests.
+
+Per target host (coordinated in Redis under `polite:{host}:*`, in-process when
+Redis is unavailable):
+- at most `politeness_host_connections` requests in flight (expiring leases,
+  so a dead worker never holds a connection for long)
+- requests spaced to `politeness_host_rps` per second
+- a 429 or 503 stops all requests to the host until its Retry-After (or an
+  exponential backoff) has passed, and halves its request rate; the rate then
+  doubles back every RECOVERY seconds without a new refusal
+
+Process-wide, the number of requests in flight is capped by a socket budget
+(`outbound_socket_budget`, by default half the open-file limit) shared by every
+event loop, so bursts of checks never exhaust file descriptors.
+
+httpx clients opt in with `polite_client(...)` (same arguments as
+httpx.AsyncClient); aiohttp sessions with `trace_configs=[polite_trace_config()]`.
+"""
+import asyncio
+import logging
+import resource
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional, Tuple
+
+import aiohttp
+import httpx
+from yarl import URL
+
+from .cache import get_redis
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Reserves a connection lease and the next request time of a host.
+# Returns -1 when every connection is taken, else the milliseconds to wait before sending.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local limit = tonumber(ARGV[2])
+if limit > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+    if redis.call('ZCARD', KEYS[1]) >= limit then
+        return -1
+    end
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[5]), ARGV[1])
+    redis.call('PEXPIRE', KEYS[1], ARGV[5])
+end
+local state = redis.call('HMGET', KEYS[2], 'tat', 'until', 'rate', 'since')
+local start = math.max(now, tonumber(state[1]) or 0, tonumber(state[2]) or 0)
+start = math.min(start, now + tonumber(ARGV[7]))
+local rate = tonumber(ARGV[3])
+if rate > 0 and state[3] then
+    rate = math.min(rate, tonumber(state[3]) * 2 ^ ((now - tonumber(state[4])) / tonumber(ARGV[4])))
+end
+if rate > 0 then
+    redis.call('HSET', KEYS[2], 'tat', math.floor(start + 1000 / rate))
+    redis.call('PEXPIRE', KEYS[2], ARGV[6])
+end
+return start - now
+"""
+
+# Records a refusal (429/503): pause until Retry-After or an exponential backoff, halve the rate
+# (once per pause: refusals of requests already in flight do not count again).
+# Returns the pause in milliseconds.
+_PENALIZE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'until', 'rate', 'since', 'strikes')
+local paused_until = tonumber(state[1]) or 0
+local recovery = tonumber(ARGV[4])
+if now < paused_until then
+    -- Requests sent before the pause was known: the host is already backing off
+    return paused_until - now
+end
+local strikes = 1
+if paused_until > 0 and now - paused_until < recovery then
+    strikes = (tonumber(state[4]) or 0) + 1
+end
+local pause = tonumber(ARGV[1])
+if pause <= 0 then
+    pause = tonumber(ARGV[5]) * 2 ^ (strikes - 1)
+end
+pause = math.min(pause, tonumber(ARGV[6]))
+redis.call('HSET', KEYS[1], 'until', math.max(paused_until, now + pause), 'strikes', strikes)
+local max_rate = tonumber(ARGV[2])
+if max_rate > 0 then
+    local rate = max_rate
+    if state[2] then
+        rate = math.min(max_rate, tonumber(state[2]) * 2 ^ ((now - tonumber(state[3])) / recovery))
+    end
+    redis.call('HSET', KEYS[1], 'rate', math.max(tonumber(ARGV[3]), rate / 2), 'since', now)
+end
+redis.call('PEXPIRE', KEYS[1], ARGV[7])
+return pause
+"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta-seconds or HTTP date) in seconds, None when absent or invalid"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class SocketBudget:
+    """Counting semaphore shared by every event loop of the process (Celery tasks run their own loops)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                self.release()  # Granted just as the wait was cancelled: pass it on
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not loop.is_closed():
+                    # The socket goes to the waiter directly: in_use is unchanged
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+            self.in_use -= 1
+
+    def _grant(self, future: asyncio.Future):
+        if future.done():
+            self.release()  # Cancelled in the meantime
+        else:
+            future.set_result(None)
+
+
+class _LocalHost:
+    """In-process schedule of one host (no Redis), same rules as the Redis scripts (times in seconds)"""
+
+    __slots__ = ("leases", "tat", "paused_until", "rate", "since", "strikes")
+
+    def __init__(self):
+        self.leases: Dict[str, float] = {}  # token -> expiry
+        self.tat = 0.0
+        self.paused_until = 0.0
+        self.rate: Optional[float] = None
+        self.since = 0.0
+        self.strikes = 0
+
+    @property
+    def idle(self) -> bool:
+        return not self.leases and max(self.tat, self.paused_until) < time.monotonic()
+
+
+class HostLease:
+    """One request's place in its host schedule; release() once the response is closed"""
+
+    __slots__ = ("host", "token", "remote", "_released")
+
+    def __init__(self, host: str, token: str, remote: bool):
+        self.host = host
+        self.token = token
+        self.remote = remote  # Taken in Redis (else in-process)
+        self._released = False
+
+    async def release(self):
+        if self._released:
+            return
+        self._released = True
+        HostPoliteness.budget().release()
+        await HostPoliteness._release(self)
+
+
+class HostPoliteness:
+    MIN_RATE = 0.5  # Requests per second a host is never slowed below
+    RECOVERY = 30.0  # Seconds for a halved rate to double back
+    BASE_BACKOFF = 1.0  # First pause after a refusal without Retry-After (doubles on repeat)
+    MAX_BACKOFF = 60.0  # Longest pause honoured (Retry-After included)
+    MAX_WAIT = 30.0  # A request never waits longer than this for its turn
+    LEASE_TTL = 120.0  # A request holding its connection longer is no longer counted
+    STATE_TTL = 600  # Host schedules are forgotten after this long without requests
+    BUSY_POLL = 0.05
+    MAX_LOCAL_HOSTS = 10000
+    REDIS_RETRY = 30.0  # After a Redis error, use the local schedule this long
+    REFUSAL_STATUSES = (429, 503)
+
+    _host_connections: Optional[int] = None
+    _host_rps: Optional[float] = None
+    _budget: Optional[SocketBudget] = None
+    _budget_lock = threading.Lock()
+    _local: "OrderedDict[str, _LocalHost]" = OrderedDict()
+    _local_lock = threading.Lock()
+    _redis_down_until = 0.0
+    stats: Dict[str, int] = {"requests": 0, "delayed": 0, "busy": 0, "refusals": 0}
+
+    @classmethod
+    def configure(
+        cls,
+        host_connections: Optional[int] = None,
+        host_rps: Optional[float] = None,
+        socket_budget: Optional[int] = None,
+    ):
+        """Override the settings (scripts, benchmarks): 0 lifts the per-host limit"""
+        if host_connections is not None:
+            cls._host_connections = host_connections
+        if host_rps is not None:
+            cls._host_rps = host_rps
+        if socket_budget is not None:
+            with cls._budget_lock:
+                cls._budget = SocketBudget(socket_budget)
+        with cls._local_lock:
+            cls._local.clear()
+
+    @classmethod
+    def host_connections(cls) -> int:
+        if cls._host_connections is None:
+            cls._host_connections = get_settings().politeness_host_connections
+        return cls._host_connections
+
+    @classmethod
+    def host_rps(cls) -> float:
+        if cls._host_rps is None:
+            cls._host_rps = get_settings().politeness_host_rps
+        return cls._host_rps
+
+    @classmethod
+    def budget(cls) -> SocketBudget:
+        if cls._budget is None:
+            with cls._budget_lock:
+                if cls._budget is None:
+                    limit = get_settings().outbound_socket_budget
+                    if limit <= 0:
+                        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+                        limit = max(64, soft // 2) if soft != resource.RLIM_INFINITY else 4096
+                    cls._budget = SocketBudget(limit)
+        return cls._budget
+
+    @classmethod
+    def _redis(cls):
+        return get_redis() if time.monotonic() >= cls._redis_down_until else None
+
+    @classmethod
+    def _redis_failed(cls, e: Exception):
+        cls._redis_down_until = time.monotonic() + cls.REDIS_RETRY
+        logger.warning(f"Politeness schedule unavailable in Redis, local one for {cls.REDIS_RETRY:.0f}s: {e}")
+
+    @staticmethod
+    def _keys(host: str) -> Tuple[str, str]:
+        return f"polite:{host}:conns", f"polite:{host}:state"
+
+    @classmethod
+    async def acquire(cls, host: str) -> HostLease:
+        """Wait for a connection of the host, its next request slot and a socket of the budget"""
+        host = (host or "").lower()
+        token = uuid.uuid4().hex
+        counted = False
+        while True:
+            remote, delay = await cls._try_acquire(host, token)
+            if delay is not None:
+                break
+            if not counted:
+                cls.stats["busy"] += 1
+                counted = True
+            await asyncio.sleep(cls.BUSY_POLL)
+
+        lease = HostLease(host, token, remote)
+        try:
+            if delay > 0:
+                cls.stats["delayed"] += 1
+                await asyncio.sleep(delay)
+            await cls.budget().acquire()
+        except BaseException:
+            await cls._release(lease)
+            raise
+        cls.stats["requests"] += 1
+        return lease
+
+    @classmethod
+    async def _try_acquire(cls, host: str, token: str) -> Tuple[bool, Optional[float]]:
+        """(taken in Redis, seconds to wait or None when the host has no free connection)"""
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                wait_ms = await redis.eval(
+                    _ACQUIRE_SCRIPT, 2, *cls._keys(host),
+                    token, cls.host_connections(), cls.host_rps(), int(cls.RECOVERY * 1000),
+                    int(cls.LEASE_TTL * 1000), cls.STATE_TTL * 1000, int(cls.MAX_WAIT * 1000),
+                )
+                return True, None if wait_ms < 0 else wait_ms / 1000
+            except Exception as e:
+                cls._redis_failed(e)
+        return False, cls._local_acquire(host, token)
+
+    @classmethod
+    def _local_host(cls, host: str) -> _LocalHost:
+        state = cls._local.get(host)
+        if state is None:
+            state = cls._local[host] = _LocalHost()
+            if len(cls._local) > cls.MAX_LOCAL_HOSTS:
+                for name in [name for name, other in cls._local.items() if other.idle]:
+                    del cls._local[name]
+        cls._local.move_to_end(host)
+        return state
+
+    @classmethod
+    def _effective_rate(cls, state: _LocalHost, now: float) -> float:
+        max_rate = cls.host_rps()
+        if max_rate <= 0 or state.rate is None:
+            return max_rate
+        return min(max_rate, state.rate * 2 ** ((now - state.since) / cls.RECOVERY))
+
+    @classmethod
+    def _local_acquire(cls, host: str, token: str) -> Optional[float]:
+        now = time.monotonic()
+        limit = cls.host_connections()
+        with cls._local_lock:
+            state = cls._local_host(host)
+            if limit > 0:
+                for held, expiry in list(state.leases.items()):
+                    if expiry <= now:
+                        del state.leases[held]
+                if len(state.leases) >= limit:
+                    return None
+                state.leases[token] = now + cls.LEASE_TTL
+            start = min(max(now, state.tat, state.paused_until), now + cls.MAX_WAIT)
+            rate = cls._effective_rate(state, now)
+            if rate > 0:
+                state.tat = start + 1 / rate
+            return start - now
+
+    @classmethod
+    async def _release(cls, lease: HostLease):
+        if lease.remote:
+            redis = get_redis()
+            try:
+                await redis.zrem(cls._keys(lease.host)[0], lease.token)
+            except Exception as e:
+                logger.debug(f"Politeness lease release failed (it will expire): {e}")
+            return
+        with cls._local_lock:
+            state = cls._local.get(lease.host)
+            if state is not None:
+                state.leases.pop(lease.token, None)
+
+    @classmethod
+    async def observe(cls, host: str, status: int, retry_after: Optional[str] = None):
+        """Feed a response back: 429 / 503 pause the host and slow it down"""
+        if status not in cls.REFUSAL_STATUSES:
+            return
+        host = (host or "").lower()
+        pause = parse_retry_after(retry_after)
+        cls.stats["refusals"] += 1
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                await redis.eval(
+                    _PENALIZE_SCRIPT, 1, cls._keys(host)[1],
+                    int((pause or 0) * 1000), cls.host_rps(), cls.MIN_RATE, int(cls.RECOVERY * 1000),
+                    int(cls.BASE_BACKOFF * 1000), int(cls.MAX_BACKOFF * 1000), cls.STATE_TTL * 1000,
+                )
+                return
+            except Exception as e:
+                cls._redis_failed(e)
+        cls._local_penalize(host, pause)
+
+    @classmethod
+    def _local_penalize(cls, host: str, pause: Optional[float]):
+        now = time.monotonic()
+        with cls._local_lock:
+            state = cls._local_host(host)
+            if now < state.paused_until:
+                return  # Requests sent before the pause was known: already backing off
+            paused = state.paused_until > 0 and now - state.paused_until < cls.RECOVERY
+            state.strikes = state.strikes + 1 if paused else 1
+            if not pause:
+                pause = cls.BASE_BACKOFF * 2 ** (state.strikes - 1)
+            state.paused_until = max(state.paused_until, now + min(pause, cls.MAX_BACKOFF))
+            if cls.host_rps() > 0:
+                state.rate = max(cls.MIN_RATE, cls._effective_rate(state, now) / 2)
+                state.since = now
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives the host lease back once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, lease: HostLease):
+        self._stream = stream
+        self._lease = lease
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            await self._lease.release()
+
+
+class PoliteTransport(httpx.AsyncBaseTransport):
+    """httpx transport scheduling every request (redirect hops included) through HostPoliteness"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs):
+        self._transport = transport or httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        lease = await HostPoliteness.acquire(request.url.host)
+        try:
+            response = await self._transport.handle_async_request(request)
+            await HostPoliteness.observe(lease.host, response.status_code, response.headers.get("Retry-After"))
+        except BaseException:
+            await lease.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, lease)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# httpx.AsyncClient arguments that belong to its transport
+_TRANSPORT_OPTIONS = ("verify", "cert", "http1", "http2", "limits", "trust_env")
+
+
+def polite_client(**kwargs) -> httpx.AsyncClient:
+    """httpx.AsyncClient (same arguments) whose requests go through the host schedule"""
+    options = {name: kwargs[name] for name in _TRANSPORT_OPTIONS if name in kwargs}
+    for name in ("verify", "cert", "http1", "http2", "limits"):
+        kwargs.pop(name, None)
+    return httpx.AsyncClient(transport=PoliteTransport(**options), **kwargs)
+
+
+def polite_trace_config() -> aiohttp.TraceConfig:
+    """
+    aiohttp hooks scheduling every request of a session through HostPoliteness.
+    The lease covers a request until its response headers; the session's
+    connector limits (limit_per_host) bound the body reads that follow.
+    """
+    config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.leases = getattr(context, "leases", [])
+        context.leases.append(await HostPoliteness.acquire(params.url.host))
+
+    async def on_request_redirect(session, context, params):
+        # Each hop of a redirect chain takes its own turn, on the host it leads to
+        await HostPoliteness.observe(params.url.host, params.response.status, params.response.headers.get("Retry-After"))
+        await context.leases.pop().release()
+        location = params.response.headers.get("Location")
+        next_host = params.url.join(URL(location)).host if location else params.url.host
+        context.leases.append(await HostPoliteness.acquire(next_host))
+
+    async def on_request_end(session, context, params):
+        await HostPoliteness.observe(params.url.host, params.response.status, params.response.headers.get("Retry-After"))
+        while context.leases:
+            await context.leases.pop().release()
+
+    async def on_request_exception(session, context, params):
+        while getattr(context, "leases", None):
+            await context.leases.pop().release()
+
+    config.on_request_start.append(on_request_start)
+    config.on_request_redirect.append(on_request_redirect)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    return config
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import get_settings
 
@@ -23,3 +23,24 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
+
+# Scope of the short-lived tokens following one background scan's events
+# (EventSource cannot send an Authorization header)
+TASK_EVENTS_SCOPE = "task_events"
+TASK_EVENTS_TOKEN_MINUTES = 5
+
+def create_task_events_token(task_id: str, user_id: int) -> str:
+    # No "sub" claim: the token is refused as an access token
+    expire = datetime.utcnow() + timedelta(minutes=TASK_EVENTS_TOKEN_MINUTES)
+    to_encode = {"exp": expire, "scope": TASK_EVENTS_SCOPE, "task": task_id, "uid": user_id}
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+def verify_task_events_token(token: str, task_id: str) -> Optional[int]:
+    """User id the token was issued to for this task (None if invalid, expired or for another task)"""
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        return None
+    if payload.get("scope") != TASK_EVENTS_SCOPE or payload.get("task") != task_id:
+        return None
+    return payload.get("uid")
@@ -1,5 +1,5 @@
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlmodel import Session, select
 from app.db.session import get_session
@@ -9,6 +9,7 @@ from app.core.security import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 from typing import Optional
 
@@ -51,3 +52,21 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def get_api_key_user(api_key: Optional[str] = Depends(api_key_header), session: Session = Depends(get_session)) -> User:
+    """Owner of the X-API-Key header's key (machine clients such as CI pipelines)"""
+    from app.services.api_keys import get_active_api_key, update_last_used
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or missing API key",
+        headers={"WWW-Authenticate": "X-API-Key"},
+    )
+    key = get_active_api_key(session, api_key) if api_key else None
+    if key is None:
+        raise credentials_exception
+    user = session.get(User, key.user_id)
+    if user is None or not user.is_active:
+        raise credentials_exception
+    update_last_used(session, key.id)
+    return user
@@ -17,11 +17,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
 
+    # CPU pool for parsing / fingerprinting / image diffing
+    from app.core.executor import CPUExecutor
+    CPUExecutor.start(settings.cpu_pool_workers, settings.cpu_task_limits_map)
+
     # Initialize Scheduler
     from app.services.monitoring import start_scheduler, shutdown_scheduler
     start_scheduler()
 
-    # Task Recovery: Mark stuck tasks from previous run as FAILED
+    # Task Recovery: Re-enqueue scans interrupted by the previous run (they resume from their checkpoint)
     from app.services.task_recovery import TaskRecoveryService
     try:
         TaskRecoveryService.recover_stuck_tasks()
@@ -34,8 +38,9 @@ async def lifespan(app: FastAPI):
     shutdown_scheduler()
     from app.services.rendering import RenderingService
     await RenderingService.stop()
+    CPUExecutor.shutdown()
 
-from .api import auth, analyze, audit, billing, monitors, ai, api_keys, leads, widget, users
+from .api import auth, analyze, audit, billing, monitors, ai, api_keys, leads, widget, users, crawls, email_audits, bulk_scans, ci_cd
 from fastapi.staticfiles import StaticFiles
 import os
 
@@ -74,6 +79,10 @@ app.include_router(billing.router)
 app.include_router(monitors.router)
 app.include_router(ai.router)
 app.include_router(api_keys.router)
+app.include_router(crawls.router)
+app.include_router(email_audits.router)
+app.include_router(bulk_scans.router)
+app.include_router(ci_cd.router)
 app.include_router(leads.router, prefix="/api/leads", tags=["leads"])
 app.include_router(widget.router, prefix="/api/widget", tags=["widget"])
 
@@ -89,4 +98,5 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    from app.core.executor import CPUExecutor
+    return {"status": "ok", "cpu_pool": CPUExecutor.stats()}
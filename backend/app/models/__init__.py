@@ -5,6 +5,11 @@ from .schemas import (
     AnalyzeRequest,
     AnalyzeResponse,
     SEOResult,
+    DuplicateCluster,
+    SiteAuditIssue,
+    SiteAuditPage,
+    DuplicateMeta,
+    SiteAuditResult,
     SecurityResult,
     TechStackResult,
     BrokenLinksResult,
@@ -14,6 +19,7 @@ from .schemas import (
     SSLInfo,
     Technology,
     BrokenLink,
+    LinkSource,
     AuditStatus,
     SeverityLevel,
     ExposedFile,
@@ -25,6 +31,10 @@ from .schemas import (
     GreenResult,
     DNSHealthResult,
     AnalyzeResponse,
+    ComparisonResponse,
+    RankEntry,
+    CIGateRequest,
+    CIGateResponse,
     TaskResponse
 )
 from .task import ScanTask
@@ -34,6 +44,11 @@ __all__ = [
     "AnalyzeResponse",
     "TaskResponse",
     "SEOResult",
+    "DuplicateCluster",
+    "SiteAuditIssue",
+    "SiteAuditPage",
+    "DuplicateMeta",
+    "SiteAuditResult",
     "SecurityResult",
     "TechStackResult",
     "BrokenLinksResult",
@@ -43,6 +58,7 @@ __all__ = [
     "SSLInfo",
     "Technology",
     "BrokenLink",
+    "LinkSource",
     "AuditStatus",
     "SeverityLevel",
     "ExposedFile",
@@ -52,5 +68,9 @@ __all__ = [
     "CookieItem",
     "SMOResult",
     "GreenResult",
-    "DNSHealthResult"
+    "DNSHealthResult",
+    "ComparisonResponse",
+    "RankEntry",
+    "CIGateRequest",
+    "CIGateResponse"
 ]
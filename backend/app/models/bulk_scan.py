@@ -0,0 +1,59 @@
+"""
+Bulk Scan Job Model - SQLModel ORM
+Tracks full scans of uploaded URL lists, fanned out over several Celery tasks.
+The URL queue and per-URL results live in Redis; full results are saved to the audit history.
+"""
+from datetime import datetime
+from typing import List, Optional
+from enum import Enum
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, JSON
+
+
+class BulkScanStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class BulkScanJob(SQLModel, table=True):
+    """Bulk URL scan, resumable by id"""
+    __tablename__ = "bulk_scan_jobs"
+
+    id: str = Field(primary_key=True)  # UUID string, also the Redis key namespace
+    user_id: int = Field(index=True, foreign_key="users.id")
+    status: BulkScanStatus = Field(default=BulkScanStatus.PENDING)
+    lang: str = Field(default="en")
+    features: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    shards: int = Field(default=1)  # Celery tasks sharing the queue
+    url_count: int = Field(default=0)
+    urls_skipped: int = Field(default=0)  # Invalid or duplicate entries of the uploaded list
+
+    # Checkpointed counters (the live values are in Redis while running)
+    urls_done: int = Field(default=0)
+    urls_failed: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    last_checkpoint_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+
+
+class BulkScanRead(SQLModel):
+    """Schema for reading bulk scan progress"""
+    id: str
+    status: BulkScanStatus
+    lang: str
+    features: List[str]
+    url_count: int
+    urls_skipped: int
+    urls_done: int
+    urls_failed: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    last_checkpoint_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
@@ -0,0 +1,63 @@
+"""
+Crawl Job Model - SQLModel ORM
+Tracks large-site crawls run as background jobs (frontier and visited set live in Redis)
+"""
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+from sqlmodel import Field, SQLModel
+
+
+class CrawlStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class CrawlJob(SQLModel, table=True):
+    """Large-site crawl, resumable by id"""
+    __tablename__ = "crawl_jobs"
+
+    id: str = Field(primary_key=True)  # UUID string, also the Redis key namespace
+    user_id: int = Field(index=True, foreign_key="users.id")
+    url: str = Field(max_length=2048)
+    status: CrawlStatus = Field(default=CrawlStatus.PENDING)
+    max_pages: int = Field(default=50000)
+    max_depth: int = Field(default=10)
+
+    # Checkpointed counters (the live values are in Redis while running)
+    pages_crawled: int = Field(default=0)
+    pages_discovered: int = Field(default=0)
+    error_pages: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    last_checkpoint_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+
+
+class CrawlJobCreate(SQLModel):
+    """Schema for starting a large-site crawl"""
+    url: str = Field(max_length=2048)
+    max_pages: int = Field(default=50000, ge=1, le=500000)
+    max_depth: int = Field(default=10, ge=1, le=50)
+
+
+class CrawlJobRead(SQLModel):
+    """Schema for reading crawl job progress"""
+    id: str
+    url: str
+    status: CrawlStatus
+    max_pages: int
+    max_depth: int
+    pages_crawled: int
+    pages_discovered: int
+    error_pages: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    last_checkpoint_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
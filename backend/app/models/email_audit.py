@@ -0,0 +1,58 @@
+"""
+Email Audit Job Model - SQLModel ORM
+Tracks bulk email-health audits (SPF/DMARC/DKIM/MX of many domains) run as background jobs.
+The domain list and per-domain results live in Redis.
+"""
+from datetime import datetime
+from typing import List, Optional
+from enum import Enum
+from sqlmodel import Field, SQLModel
+
+
+class EmailAuditStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class EmailAuditJob(SQLModel, table=True):
+    """Bulk email-health audit, resumable by id"""
+    __tablename__ = "email_audit_jobs"
+
+    id: str = Field(primary_key=True)  # UUID string, also the Redis key namespace
+    user_id: int = Field(index=True, foreign_key="users.id")
+    status: EmailAuditStatus = Field(default=EmailAuditStatus.PENDING)
+    domain_count: int = Field(default=0)
+    domains_skipped: int = Field(default=0)  # Invalid or duplicate entries of the submitted list
+
+    # Checkpointed counters (the live values are in Redis while running)
+    domains_done: int = Field(default=0)
+    domains_failed: int = Field(default=0)  # No DNS answer at all (timeouts, SERVFAIL)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    last_checkpoint_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+
+
+class EmailAuditCreate(SQLModel):
+    """Schema for starting a bulk email audit"""
+    domains: List[str]
+
+
+class EmailAuditRead(SQLModel):
+    """Schema for reading bulk email audit progress"""
+    id: str
+    status: EmailAuditStatus
+    domain_count: int
+    domains_skipped: int
+    domains_done: int
+    domains_failed: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    last_checkpoint_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
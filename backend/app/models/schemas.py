@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, HttpUrl, Field, field_validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Collection, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -43,6 +43,8 @@ class AnalyzeRequest(BaseModel):
     url: str = Field(..., description="URL to analyze", examples=["https://example.com"])
     competitor_url: Optional[str] = Field(None, description="Competitor URL to compare against", examples=["https://competitor.com"])
     lang: str = Field("en", description="Language for analysis results (en, fr)", examples=["en", "fr"])
+    mode: Literal["full", "quick"] = Field("full", description="quick: static checks only (headers, TLS, DNS, meta and OG tags), provisional score")
+    upgrade: bool = Field(False, description="Quick mode: run the full scan in the background afterwards (see upgrade_task_id)")
     
     @field_validator("url", "competitor_url")
     @classmethod
@@ -81,6 +83,44 @@ class LighthouseScores(BaseModel):
     best_practices: Optional[int] = Field(None, ge=0, le=100)
 
 
+class DuplicateCluster(BaseModel):
+    """Crawled pages with identical or near-identical main content"""
+    pages: List[str] = Field(default_factory=list, description="Member URLs (first ones)")
+    size: int = 0
+    max_distance: int = Field(0, description="Largest SimHash distance in bits (0 = identical text)")
+
+
+class SiteAuditIssue(BaseModel):
+    """One on-page SEO issue across the crawled pages"""
+    code: str = Field(..., description="Issue identifier, e.g. title_missing, hreflang_no_return")
+    pages: int = Field(0, description="Pages having the issue")
+    examples: List[str] = Field(default_factory=list, description="First affected URLs")
+
+
+class SiteAuditPage(BaseModel):
+    """A crawled page and its on-page SEO issues"""
+    url: str
+    issues: List[str] = Field(default_factory=list)
+
+
+class DuplicateMeta(BaseModel):
+    """A title or meta description shared by several crawled pages"""
+    value: str
+    size: int = 0
+    pages: List[str] = Field(default_factory=list, description="First pages using it")
+
+
+class SiteAuditResult(BaseModel):
+    """On-page SEO checks of every crawled page, aggregated site-wide"""
+    pages_audited: int = 0
+    pages_with_issues: int = 0
+    pages_reused: int = Field(0, description="Unchanged pages whose previous findings were reused")
+    issues: List[SiteAuditIssue] = Field(default_factory=list, description="Most widespread first")
+    duplicate_titles: List[DuplicateMeta] = Field(default_factory=list)
+    duplicate_descriptions: List[DuplicateMeta] = Field(default_factory=list)
+    top_offenders: List[SiteAuditPage] = Field(default_factory=list, description="Pages with the most issues")
+
+
 class SEOResult(BaseModel):
     """SEO and Performance analysis results"""
     scores: LighthouseScores = Field(default_factory=LighthouseScores)
@@ -88,6 +128,9 @@ class SEOResult(BaseModel):
     audits: List[Dict[str, Any]] = Field(default_factory=list, description="Detailed audit items")
     opportunities: List[Dict[str, Any]] = Field(default_factory=list, description="Performance opportunities")
     diagnostics: List[Dict[str, Any]] = Field(default_factory=list, description="Diagnostic information")
+    duplicate_clusters: List[DuplicateCluster] = Field(default_factory=list, description="Duplicate content across crawled pages")
+    pages_compared: int = Field(0, description="Crawled pages with enough text to compare")
+    site_audit: Optional[SiteAuditResult] = Field(None, description="On-page checks of every crawled page")
     error: Optional[str] = None
 
 
@@ -201,13 +244,21 @@ class TechStackResult(BaseModel):
 # Broken Links Models
 # ============================================
 
+class LinkSource(BaseModel):
+    """Page containing a link"""
+    page: str
+    anchor_text: Optional[str] = None
+
+
 class BrokenLink(BaseModel):
     """Broken link information"""
     url: str
     status_code: int
     source_text: Optional[str] = None
     is_internal: bool = True
-    error_type: str = Field("http_error", description="http_error, timeout, connection_error")
+    error_type: str = Field("http_error", description="http_error, timeout, connection_error, dns_error, unknown_error")
+    sources: List[LinkSource] = Field(default_factory=list, description="Pages linking to this URL (first ones)")
+    source_count: int = Field(0, description="Number of crawled pages linking to this URL")
 
 
 class BrokenLinksResult(BaseModel):
@@ -217,6 +268,8 @@ class BrokenLinksResult(BaseModel):
     broken_count: int = 0
     internal_broken: int = 0
     external_broken: int = 0
+    unchecked_count: int = Field(0, description="Link targets left unverified (time budget or request cap reached)")
+    unchanged_pages: int = Field(0, description="Pages unchanged since the previous scan (incremental re-scans)")
     scanned_pages: List[str] = Field(default_factory=list, description="List of internal pages found during crawl")
     error: Optional[str] = None
 
@@ -301,6 +354,8 @@ class SPFInfo(BaseModel):
     record: Optional[str] = None
     status: str = "missing" # valid, warning, critical, missing
     warnings: List[str] = Field(default_factory=list)
+    dns_lookups: int = Field(0, description="DNS-querying terms across the include chain (RFC 7208 limit: 10)")
+    includes: List[str] = Field(default_factory=list, description="include:/redirect= domains, nested ones included")
 
 class DMARCInfo(BaseModel):
     present: bool = False
@@ -314,11 +369,18 @@ class DKIMInfo(BaseModel):
     selectors_found: List[str] = Field(default_factory=list)
     status: str = "manual_check" # found, missing, manual_check
     note: str = "DKIM uses cryptic selectors (e.g. google._domainkey). We checked common ones but a manual check is recommended."
+    providers: List[str] = Field(default_factory=list, description="Email senders recognised from the SPF includes")
+
+class MXInfo(BaseModel):
+    present: bool = False
+    records: List[str] = Field(default_factory=list, description="'preference host', lowest preference first")
+    status: str = "missing" # valid, null (RFC 7505: no mail accepted), missing
 
 class DNSHealthResult(BaseModel):
     spf: SPFInfo = Field(default_factory=SPFInfo)
     dmarc: DMARCInfo = Field(default_factory=DMARCInfo)
     dkim: DKIMInfo = Field(default_factory=DKIMInfo)
+    mx: MXInfo = Field(default_factory=MXInfo)
     domain: Optional[str] = None
     server_ip: Optional[str] = None
     score: int = Field(0, ge=0, le=100)
@@ -329,6 +391,17 @@ class DNSHealthResult(BaseModel):
 # Main Response Model
 # ============================================
 
+# Share of each category in the global score (renormalized over the categories available)
+GLOBAL_SCORE_WEIGHTS: Dict[str, float] = {
+    "performance": 0.20,
+    "seo": 0.20,
+    "security": 0.20,
+    "accessibility": 0.15,
+    "best_practices": 0.10,
+    "gdpr": 0.15,
+    "green_it": 0.10
+}
+
 class VisualDiffResult(BaseModel):
     """Visual Regression Test Result"""
     difference_percentage: float = 0.0
@@ -365,11 +438,14 @@ class AnalyzeResponse(BaseModel):
     # Metadata
     screenshot_path: Optional[str] = Field(None, description="Path to the screenshot of the scan")
     scan_duration_seconds: Optional[float] = None
+    scan_mode: str = Field("full", description="'full', or 'quick' (static checks only, provisional score)")
+    upgrade_task_id: Optional[str] = Field(None, description="Background full scan of a quick scan (GET /api/tasks/{id})")
     errors: List[str] = Field(default_factory=list)
     
-    def calculate_global_score(self) -> int:
+    def calculate_global_score(self, pending: Collection[str] = ()) -> int:
         """
         Calculate weighted global score.
+        `pending` categories (not analyzed yet, e.g. by a quick scan) are left out.
         
         Weights:
         - Performance (Google Lighthouse): 20%
@@ -386,16 +462,7 @@ class AnalyzeResponse(BaseModel):
         import logging
         logger = logging.getLogger(__name__)
         
-        # Define weights for each category
-        weight_config = {
-            "performance": 0.20,
-            "seo": 0.20,
-            "security": 0.20,
-            "accessibility": 0.15,
-            "best_practices": 0.10,
-            "gdpr": 0.15,
-            "green_it": 0.10
-        }
+        weight_config = GLOBAL_SCORE_WEIGHTS
         
         # Collect available scores with their weights
         available_scores = []
@@ -484,6 +551,10 @@ class AnalyzeResponse(BaseModel):
         total_available_weight += weight_config["green_it"]
         logger.info(f"   📊 Green IT: {green_score}/100 (weight: {weight_config['green_it']})")
         
+        if pending:
+            available_scores = [item for item in available_scores if item["name"] not in pending]
+            total_available_weight = sum(item["weight"] for item in available_scores)
+        
         # Calculate weighted average
         if total_available_weight > 0:
             # Normalize weights to sum to 1.0
@@ -504,3 +575,74 @@ class AnalyzeResponse(BaseModel):
         
         return self.global_score
 
+    def category_scores(self) -> Dict[str, Optional[int]]:
+        """Score of each category (None when its analysis did not run), plus the global score"""
+        return {
+            "global": self.global_score,
+            "performance": self.seo.scores.performance,
+            "seo": self.seo.scores.seo,
+            "accessibility": self.seo.scores.accessibility,
+            "best_practices": self.seo.scores.best_practices,
+            "security": self.security.score,
+            "gdpr": self.gdpr.score,
+            "green_it": self.green_it.score,
+            "dns": self.dns_health.score,
+        }
+
+
+# ============================================
+# Comparison Models
+# ============================================
+
+class RankEntry(BaseModel):
+    """One site's place in a category ranking (tied scores share a rank)"""
+    url: str
+    score: int
+    rank: int
+
+
+class ComparisonResponse(BaseModel):
+    """Target site compared with several competitors"""
+    target: AnalyzeResponse
+    competitors: List[AnalyzeResponse] = Field(default_factory=list)
+    failed: List[str] = Field(default_factory=list, description="Competitor URLs whose scan did not complete")
+    rankings: Dict[str, List[RankEntry]] = Field(default_factory=dict, description="Per category, best first")
+    target_ranks: Dict[str, int] = Field(default_factory=dict, description="Target's rank per category")
+
+
+# ============================================
+# CI Gate Models
+# ============================================
+
+class CIGateRequest(BaseModel):
+    """Pass/fail scan of a deployment, for CI pipelines"""
+    url: str = Field(..., description="URL to check", examples=["https://staging.example.com"])
+    threshold: int = Field(80, ge=0, le=100, description="Minimum global score to pass")
+    lang: str = Field("en", description="Language for analysis results (en, fr)")
+    fail_on_error: bool = Field(True, description="Fail as soon as an analyzer errors")
+
+    @field_validator("url")
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        v = v.strip()
+        if not v.startswith(("http://", "https://")):
+            v = f"https://{v}"
+        return v
+
+
+class CIGateResponse(BaseModel):
+    """
+    Verdict of a CI gate scan. The scan stops once the threshold is certainly
+    met or missed, so the score is known within [score_min, score_max]; `score`
+    is set when every analyzer finished.
+    """
+    url: str
+    status: str = Field(..., description="passed or failed")
+    threshold: int
+    score: Optional[int] = None
+    score_min: int
+    score_max: int
+    completed: List[str] = Field(default_factory=list, description="Analyzers that finished before the verdict")
+    cancelled: List[str] = Field(default_factory=list, description="Analyzers stopped once the verdict was known")
+    errors: List[str] = Field(default_factory=list)
+    scan_duration_seconds: float = 0.0
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlmodel import SQLModel, Field
 from sqlalchemy import Column, JSON
 from datetime import datetime
@@ -13,6 +13,13 @@ class ScanTask(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     finished_at: Optional[datetime] = None
     url: str
+    # Owner: only they can read the task and follow its progress
+    user_id: Optional[int] = Field(default=None, index=True, foreign_key="users.id")
+    # Scan arguments, kept so an interrupted scan can be re-enqueued as it was requested
+    lang: str = Field(default="en")
+    features: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    # Times the task was re-enqueued after a restart
+    recoveries: int = Field(default=0)
     
     # Store the full AnalyzeResponse as JSON
     # using sa_column=Column(JSON) acts as a generic JSON field
@@ -2,15 +2,23 @@
 API Key Service
 Handles generation, hashing, and validation of API keys.
 """
+import hashlib
 import secrets
+from datetime import datetime
 from typing import Tuple, Optional
 from sqlmodel import Session, select
 from ..models.api_key import ApiKey
-from ..core.security import get_password_hash, verify_password
 
 def generate_api_key() -> str:
     """Generate a secure random API key with prefix"""
-    return f"sk_live_{secrets.token_urlsafe(32)}"
+    return f"sk_{secrets.token_urlsafe(32)}"
+
+def hash_api_key(raw_key: str) -> str:
+    """
+    SHA-256 of the key. Keys are 256-bit random tokens, so a fast hash is
+    enough and lets the key be looked up directly through the indexed column.
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()
 
 def create_api_key(session: Session, user_id: int, name: str) -> Tuple[ApiKey, str]:
     """
@@ -19,12 +27,11 @@ def create_api_key(session: Session, user_id: int, name: str) -> Tuple[ApiKey, s
     The raw_key_string is shown ONLY ONCE.
     """
     raw_key = generate_api_key()
-    key_hash = get_password_hash(raw_key)
     
     db_obj = ApiKey(
         user_id=user_id,
-        key_hash=key_hash,
-        prefix=raw_key[:12], # Store prefix for identification (sk_live_xxxx)
+        hashed_key=hash_api_key(raw_key),
+        prefix=raw_key[:8], # Store prefix for identification in the UI (sk_xxxxx)
         name=name
     )
     
@@ -34,34 +41,16 @@ def create_api_key(session: Session, user_id: int, name: str) -> Tuple[ApiKey, s
     
     return db_obj, raw_key
 
-def get_api_key_by_prefix(session: Session, raw_key: str) -> Optional[ApiKey]:
-    """
-    Find and validate API key.
-    Performance optimization: Search by prefix first, then check hash.
-    """
-    # Assuming prefix is always sk_live_ + 4 chars or so for lookup, 
-    # but since stored prefix length is fixed or semi-fixed, we can try to math it.
-    # Our generated keys are "sk_live_" + 32 bytes urlsafe.
-    # Stored prefix is first 12 chars: "sk_live_XXXX"
-    
-    if len(raw_key) < 12:
+def get_active_api_key(session: Session, raw_key: str) -> Optional[ApiKey]:
+    """Find the active API key matching a raw key (None when unknown or revoked)"""
+    if not raw_key or not raw_key.startswith("sk_"):
         return None
         
-    prefix = raw_key[:12]
-    
-    # query all active keys with this prefix (should be very few, ideally 1)
-    statement = select(ApiKey).where(ApiKey.prefix == prefix, ApiKey.is_active == True)
-    results = session.exec(statement).all()
-    
-    for key_obj in results:
-        if verify_password(raw_key, key_obj.key_hash):
-            return key_obj
-            
-    return None
+    statement = select(ApiKey).where(ApiKey.hashed_key == hash_api_key(raw_key), ApiKey.is_active == True)
+    return session.exec(statement).first()
 
 def update_last_used(session: Session, api_key_id: int):
     """Update the last_used_at timestamp"""
-    from datetime import datetime
     key = session.get(ApiKey, api_key_id)
     if key:
         key.last_used_at = datetime.utcnow()
@@ -0,0 +1,329 @@
+"""
+Bulk Email-Health Audit Service
+SPF / DMARC / DKIM / MX checks of up to 10k domains, run as a Celery job.
+Only the DNS analysis runs: no page fetch, no browser, no PageSpeed.
+
+All audit state lives in Redis under `emailaudit:{audit_id}:*`, so the worker's
+memory stays flat whatever the list size:
+- domains: the submitted list, read by index in batches
+- done: bitmap of finished domain indexes, written with their results (a
+  redelivered job skips them)
+- results: one JSON line per finished domain, in completion order
+- stats: counters
+
+Domains are analysed CONCURRENCY at a time; the DNS engine caps the queries on
+the wire and shares its cache, so the SPF includes of common providers are only
+resolved once for the whole list.
+"""
+import asyncio
+import csv
+import inspect
+import io
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import validators
+
+from ..core.cache import get_redis
+from ..models.schemas import DNSHealthResult
+from .dns_health import DNSAnalyzer
+
+logger = logging.getLogger(__name__)
+
+MAX_DOMAINS = 10000
+
+# Keep results around after completion for streaming and export
+RESULT_TTL = 7 * 86400
+
+# Run lock: refreshed at every checkpoint, so it only outlives a dead worker briefly
+LOCK_TTL = 60
+
+EXPORT_COLUMNS = (
+    "domain", "score", "spf", "spf_lookups", "dmarc", "dmarc_policy", "dkim", "dkim_selectors",
+    "providers", "mx", "mx_records", "server_ip", "warnings", "error",
+)
+
+
+class AuditAlreadyRunning(Exception):
+    """Another worker holds this audit (e.g. a broker redelivery of a long job)"""
+
+
+def normalize_domain(raw: str) -> Optional[str]:
+    """
+    Bare domain of a submitted entry (domain, URL or email address), IDNA-encoded,
+    or None when it is not a valid domain. A leading www. is dropped as in a scan.
+    """
+    value = raw.strip().lower()
+    if "@" in value and "://" not in value:
+        value = value.rsplit("@", 1)[1]
+    if "://" in value:
+        value = urlparse(value).netloc
+    value = value.split("/", 1)[0].split(":", 1)[0].rstrip(".")
+    if value.startswith("www.") and value.count(".") == 2:
+        value = value[4:]
+    try:
+        value = value.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    return value if validators.domain(value) else None
+
+
+def audit_row(result: DNSHealthResult) -> Dict[str, Any]:
+    """Compact per-domain result streamed and exported (no probed selector list)"""
+    return {
+        "domain": result.domain,
+        "score": result.score,
+        "spf": result.spf.status,
+        "spf_lookups": result.spf.dns_lookups,
+        "dmarc": result.dmarc.status,
+        "dmarc_policy": result.dmarc.policy,
+        "dkim": result.dkim.status,
+        "dkim_selectors": result.dkim.selectors_found,
+        "providers": result.dkim.providers,
+        "mx": result.mx.status,
+        "mx_records": result.mx.records,
+        "server_ip": result.server_ip,
+        "warnings": result.spf.warnings,
+        "error": result.error,
+    }
+
+
+def _decode(raw) -> str:
+    return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+
+class BulkEmailAudit:
+    """Runs (or resumes) one bulk audit by id"""
+
+    CONCURRENCY = 100  # Domains in analysis at once; wire queries are capped by DNSEngine.MAX_CONCURRENCY
+    DKIM_BUDGET = 40  # Selector probes per domain: inferred and most common selectors only
+    READ_BATCH = 500
+    FLUSH_ROWS = 100
+    FLUSH_INTERVAL = 0.5  # seconds: results reach the stream at least this often
+    CHECKPOINT_INTERVAL = 5.0
+    STORE_BATCH = 1000
+
+    def __init__(
+        self,
+        audit_id: str,
+        concurrency: int = CONCURRENCY,
+        on_checkpoint: Optional[Callable[[Dict[str, int]], Any]] = None,
+    ):
+        self.audit_id = audit_id
+        self.concurrency = concurrency
+        self.on_checkpoint = on_checkpoint
+        self.redis = get_redis()
+        if self.redis is None:
+            raise RuntimeError("Bulk email audits require Redis (REDIS_URL)")
+
+        self.analyzer = DNSAnalyzer(dkim_budget=self.DKIM_BUDGET)
+        self.domains_key = self._key(audit_id, "domains")
+        self.done_key = self._key(audit_id, "done")
+        self.results_key = self._key(audit_id, "results")
+        self.stats_key = self._key(audit_id, "stats")
+        self.cancel_key = self._key(audit_id, "cancel")
+        self.lock_key = self._key(audit_id, "lock")
+        self.lock_token = uuid.uuid4().hex
+
+    @staticmethod
+    def _key(audit_id: str, name: str) -> str:
+        return f"emailaudit:{audit_id}:{name}"
+
+    @classmethod
+    async def store_domains(cls, audit_id: str, domains: Sequence[str]):
+        redis = get_redis()
+        if redis is None:
+            raise RuntimeError("Bulk email audits require Redis (REDIS_URL)")
+        key = cls._key(audit_id, "domains")
+        pipe = redis.pipeline(transaction=False)
+        for start in range(0, len(domains), cls.STORE_BATCH):
+            pipe.rpush(key, *domains[start:start + cls.STORE_BATCH])
+        pipe.expire(key, RESULT_TTL)
+        await pipe.execute()
+
+    @classmethod
+    async def request_cancel(cls, audit_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.set(cls._key(audit_id, "cancel"), "1", ex=RESULT_TTL)
+
+    @classmethod
+    async def clear_cancel(cls, audit_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.delete(cls._key(audit_id, "cancel"))
+
+    @classmethod
+    async def read_results(cls, audit_id: str, offset: int = 0, limit: int = 500) -> List[str]:
+        """Result JSON lines in completion order"""
+        redis = get_redis()
+        if redis is None:
+            return []
+        rows = await redis.lrange(cls._key(audit_id, "results"), offset, offset + limit - 1)
+        return [_decode(raw) for raw in rows]
+
+    @classmethod
+    async def export_csv(cls, audit_id: str) -> AsyncIterator[str]:
+        """CSV of every result, read and written chunk by chunk"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        offset = 0
+        while True:
+            rows = await cls.read_results(audit_id, offset, cls.STORE_BATCH)
+            for raw in rows:
+                row = json.loads(raw)
+                writer.writerow({
+                    key: " | ".join(value) if isinstance(value, list) else value
+                    for key, value in row.items()
+                })
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            if len(rows) < cls.STORE_BATCH:
+                return
+            offset += len(rows)
+
+    async def stats(self) -> Dict[str, int]:
+        raw = await self.redis.hgetall(self.stats_key)
+        stats = {_decode(k): int(v) for k, v in raw.items()}
+        stats.setdefault("domains_done", 0)
+        stats.setdefault("domains_failed", 0)
+        stats["domain_count"] = await self.redis.llen(self.domains_key)
+        return stats
+
+    async def _checkpoint(self):
+        stats = await self.stats()
+        if self.on_checkpoint:
+            outcome = self.on_checkpoint(stats) if inspect.iscoroutinefunction(self.on_checkpoint) \
+                else asyncio.to_thread(self.on_checkpoint, stats)
+            await outcome
+        return stats
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Analyses every domain not done yet, until the list is exhausted or a cancel
+        is requested. Returns the final stats.
+        """
+        if not await self.redis.set(self.lock_key, self.lock_token, nx=True, ex=LOCK_TTL):
+            raise AuditAlreadyRunning(self.audit_id)
+        try:
+            return await self._run()
+        finally:
+            if await self.redis.get(self.lock_key) in (self.lock_token, self.lock_token.encode()):
+                await self.redis.delete(self.lock_key)
+
+    async def _run(self) -> Dict[str, int]:
+        stop = asyncio.Event()
+        # Both bounded: the list is never held in memory, nor are unwritten results
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        finished: asyncio.Queue = asyncio.Queue(maxsize=self.FLUSH_ROWS * 4)
+
+        async def producer():
+            total = await self.redis.llen(self.domains_key)
+            for start in range(0, total, self.READ_BATCH):
+                if stop.is_set():
+                    break
+                names = await self.redis.lrange(self.domains_key, start, start + self.READ_BATCH - 1)
+                pipe = self.redis.pipeline(transaction=False)
+                for index in range(start, start + len(names)):
+                    pipe.getbit(self.done_key, index)
+                done = await pipe.execute()
+                for offset, (name, bit) in enumerate(zip(names, done)):
+                    if not bit:
+                        await pending.put((start + offset, _decode(name)))
+            for _ in range(self.concurrency):
+                await pending.put(None)
+
+        async def worker():
+            while True:
+                item = await pending.get()
+                if item is None:
+                    return
+                if stop.is_set():
+                    continue  # Drained, so the producer never blocks; left for a resume
+                index, domain = item
+                try:
+                    result = await self.analyzer.analyze_domain(domain)
+                except Exception as e:
+                    result = DNSHealthResult(domain=domain, error=f"Analysis failed: {e}")
+                await finished.put((index, audit_row(result)))
+
+        closing = False
+
+        async def writer():
+            rows = []
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            # wait_for can swallow a cancel that lands as an item arrives: closing ends the loop regardless
+            while not closing:
+                try:
+                    item = await asyncio.wait_for(finished.get(), timeout=max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    item = False
+                if item:
+                    rows.append(item)
+                if item is None or len(rows) >= self.FLUSH_ROWS or time.monotonic() >= deadline:
+                    await self._flush(rows)
+                    rows = []
+                    deadline = time.monotonic() + self.FLUSH_INTERVAL
+                if item is None:
+                    return
+
+        async def checkpointer():
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.CHECKPOINT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.redis.expire(self.lock_key, LOCK_TTL)
+                    if await self.redis.exists(self.cancel_key):
+                        stop.set()
+                    await self._checkpoint()
+                except Exception as e:
+                    logger.warning(f"Email audit {self.audit_id} checkpoint failed: {e}")
+
+        monitor = asyncio.create_task(checkpointer())
+        feeder = asyncio.create_task(producer())
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        output = asyncio.create_task(writer())
+        try:
+            await asyncio.gather(feeder, *workers)
+            await finished.put(None)
+            await output
+        finally:
+            stop.set()
+            closing = True
+            for task in (feeder, *workers, output):
+                task.cancel()
+            await asyncio.gather(feeder, *workers, output, return_exceptions=True)
+            await monitor
+
+        stats = await self.stats()
+        if stats["domains_done"] >= stats["domain_count"]:
+            await self._finish()
+        return stats
+
+    async def _flush(self, rows: List[tuple]):
+        """Results, their done bits and counters in one transaction: a domain is either recorded or re-run"""
+        if not rows:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(self.results_key, *(json.dumps(row, separators=(",", ":")) for _, row in rows))
+        for index, _ in rows:
+            pipe.setbit(self.done_key, index, 1)
+        pipe.hincrby(self.stats_key, "domains_done", len(rows))
+        failed = sum(1 for _, row in rows if row["error"])
+        if failed:
+            pipe.hincrby(self.stats_key, "domains_failed", failed)
+        for key in (self.results_key, self.done_key, self.stats_key):
+            pipe.expire(key, RESULT_TTL)
+        await pipe.execute()
+
+    async def _finish(self):
+        """Drop the done bitmap, keep the list, counters and results for a while"""
+        await self.redis.delete(self.done_key)
@@ -0,0 +1,389 @@
+"""
+Bulk Scan Service
+Full scans of uploaded URL lists (a few thousand URLs), fanned out over several
+Celery tasks ("shards") that share one queue.
+
+State lives in Redis under `bulkscan:{job_id}:*`, so any shard can die and be
+redelivered without losing or repeating work:
+- queue: URLs not started yet, popped with LMOVE into the shard's processing list
+- processing:{shard}: URLs in flight, moved back to the queue when the shard restarts
+- results: one JSON summary line per finished URL, in completion order
+- stats: counters
+
+Two lease sets coordinate every shard of every job:
+- bulkscan:slots: at most `bulk_scan_concurrency` scans at once, platform-wide
+- bulkscan:host:{host}: one scan per target host at a time, then a cooldown
+  before the next one starts (a scan already crawls the site: bulk lists with
+  many pages of one client site must not multiply that load)
+
+Leases expire on their own, so a dead worker never holds a slot or a host for long.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from ..core.cache import get_redis
+from ..core.config import get_settings
+from ..models import AnalyzeResponse
+from .scanner import process_url_stream
+
+logger = logging.getLogger(__name__)
+
+MAX_URLS = 5000
+
+# Celery tasks pulling from the same URL queue (so a job spreads over several workers)
+SHARDS = 4
+
+# Features a bulk scan may select (the scanner's analyzers, plus the headless browser)
+SCAN_FEATURES = (
+    "seo_scan", "security_scan", "tech_scan", "links_scan", "gdpr_scan",
+    "smo_scan", "green_scan", "dns_scan", "deep_scan",
+)
+
+# Keep results around after completion for streaming and download
+RESULT_TTL = 7 * 86400
+
+# Shard run locks: refreshed at every checkpoint, so they only outlive a dead worker briefly
+LOCK_TTL = 60
+
+
+class ShardAlreadyRunning(Exception):
+    """Another worker holds this shard (e.g. a broker redelivery of a long job)"""
+
+
+def _decode(raw) -> str:
+    return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+
+class RedisLeases:
+    """
+    Counting semaphore over a sorted set: members are lease tokens, scores their
+    expiry time. Expired leases are dropped on every acquire.
+    """
+
+    _ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+    def __init__(self, redis, ttl: float):
+        self.redis = redis
+        self.ttl = ttl
+        self._acquire = redis.register_script(self._ACQUIRE_SCRIPT)
+
+    async def acquire(self, key: str, token: str, limit: int) -> bool:
+        now = time.time()
+        return bool(await self._acquire(
+            keys=[key], args=[now, now + self.ttl, limit, token, int(self.ttl * 1000)]
+        ))
+
+    async def renew(self, key: str, token: str):
+        await self.redis.zadd(key, {token: time.time() + self.ttl}, xx=True)
+
+    async def release(self, key: str, token: str, linger: float = 0.0):
+        """Free the lease, or keep it counted `linger` more seconds (cooldown)"""
+        if linger > 0:
+            await self.redis.zadd(key, {token: time.time() + linger}, xx=True)
+        else:
+            await self.redis.zrem(key, token)
+
+
+def scan_row(index: int, url: str, duration: float, response: Optional[AnalyzeResponse] = None,
+             audit_id: Optional[int] = None, error: Optional[str] = None) -> Dict[str, Any]:
+    """Summary line of one scanned URL (the full result is in the audit history under audit_id)"""
+    row: Dict[str, Any] = {"index": index, "url": url, "status": "failed" if error else "completed"}
+    if response is not None:
+        scores = response.category_scores()
+        row["score"] = scores.pop("global")
+        row["scores"] = scores
+        row["audit_id"] = audit_id
+    row["duration"] = round(duration, 2)
+    row["error"] = error
+    return row
+
+
+class BulkScanShard:
+    """One shard of a bulk scan: pops URLs from the shared queue and scans a few at a time"""
+
+    CONCURRENCY = 4  # Scans at once per shard (within the platform-wide slots)
+    SLOT_TTL = 300.0  # Lease lifetime, renewed at every checkpoint while the scan runs
+    HOST_COOLDOWN = 5.0  # Seconds between two scans of the same host
+    HOST_RETRY = 1.0  # Pause after BUSY_STREAK URLs in a row whose host is busy
+    BUSY_STREAK = 20
+    SLOT_POLL = 0.5
+    CHECKPOINT_INTERVAL = 10.0
+    STORE_BATCH = 1000
+    SLOTS_KEY = "bulkscan:slots"
+
+    def __init__(
+        self,
+        job_id: str,
+        shard: int,
+        shards: int,
+        lang: str = "en",
+        features: Sequence[str] = (),
+        concurrency: int = CONCURRENCY,
+        on_result: Optional[Callable[[str, AnalyzeResponse], Optional[int]]] = None,
+        on_checkpoint: Optional[Callable[[Dict[str, int]], Any]] = None,
+        scan: Optional[Callable[[str, str, List[str]], Any]] = None,
+    ):
+        self.job_id = job_id
+        self.shard = shard
+        self.shards = shards
+        self.lang = lang
+        self.features = list(features)
+        self.concurrency = concurrency
+        # on_result(url, response) -> audit id, run in a thread (saves the full result)
+        self.on_result = on_result
+        self.on_checkpoint = on_checkpoint
+        self.scan = scan or self._scan
+        self.redis = get_redis()
+        if self.redis is None:
+            raise RuntimeError("Bulk scans require Redis (REDIS_URL)")
+
+        self.slot_limit = get_settings().bulk_scan_concurrency
+        self.leases = RedisLeases(self.redis, self.SLOT_TTL)
+        self.queue_key = self._key(job_id, "queue")
+        self.processing_key = self._key(job_id, f"processing:{shard}")
+        self.results_key = self._key(job_id, "results")
+        self.stats_key = self._key(job_id, "stats")
+        self.cancel_key = self._key(job_id, "cancel")
+        self.lock_key = self._key(job_id, f"lock:{shard}")
+        self.lock_token = uuid.uuid4().hex
+        # Leases held by running scans: (key, token)
+        self._held: Dict[str, Tuple[str, str]] = {}
+
+    @staticmethod
+    def _key(job_id: str, name: str) -> str:
+        return f"bulkscan:{job_id}:{name}"
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        return f"bulkscan:host:{(urlparse(url).hostname or '').lower()}"
+
+    @staticmethod
+    def _encode(index: int, url: str) -> str:
+        return f"{index}\t{url}"
+
+    @staticmethod
+    def _decode_item(raw) -> Tuple[int, str]:
+        index, url = _decode(raw).split("\t", 1)
+        return int(index), url
+
+    @classmethod
+    async def enqueue(cls, job_id: str, urls: Sequence[str]):
+        redis = get_redis()
+        if redis is None:
+            raise RuntimeError("Bulk scans require Redis (REDIS_URL)")
+        key = cls._key(job_id, "queue")
+        pipe = redis.pipeline(transaction=False)
+        for start in range(0, len(urls), cls.STORE_BATCH):
+            pipe.rpush(key, *(cls._encode(start + i, url) for i, url in enumerate(urls[start:start + cls.STORE_BATCH])))
+        pipe.hset(cls._key(job_id, "stats"), "url_count", len(urls))
+        for name in ("queue", "stats"):
+            pipe.expire(cls._key(job_id, name), RESULT_TTL)
+        await pipe.execute()
+
+    @classmethod
+    async def request_cancel(cls, job_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.set(cls._key(job_id, "cancel"), "1", ex=RESULT_TTL)
+
+    @classmethod
+    async def clear_cancel(cls, job_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.delete(cls._key(job_id, "cancel"))
+
+    @classmethod
+    async def cancel_requested(cls, job_id: str) -> bool:
+        redis = get_redis()
+        return redis is not None and bool(await redis.exists(cls._key(job_id, "cancel")))
+
+    @classmethod
+    async def read_results(cls, job_id: str, offset: int = 0, limit: int = 500) -> List[str]:
+        """Summary JSON lines in completion order"""
+        redis = get_redis()
+        if redis is None:
+            return []
+        rows = await redis.lrange(cls._key(job_id, "results"), offset, offset + limit - 1)
+        return [_decode(raw) for raw in rows]
+
+    @classmethod
+    async def job_stats(cls, job_id: str, shards: int) -> Dict[str, int]:
+        redis = get_redis()
+        raw = await redis.hgetall(cls._key(job_id, "stats"))
+        stats = {_decode(k): int(v) for k, v in raw.items()}
+        stats.setdefault("url_count", 0)
+        stats.setdefault("urls_done", 0)
+        stats.setdefault("urls_failed", 0)
+        pipe = redis.pipeline(transaction=False)
+        pipe.llen(cls._key(job_id, "queue"))
+        for shard in range(shards):
+            pipe.llen(cls._key(job_id, f"processing:{shard}"))
+        for shard in range(shards):
+            pipe.exists(cls._key(job_id, f"lock:{shard}"))
+        counts = await pipe.execute()
+        stats["queued"] = counts[0]
+        stats["in_flight"] = sum(counts[1:shards + 1])
+        stats["shards_running"] = sum(counts[shards + 1:])
+        return stats
+
+    async def stats(self) -> Dict[str, int]:
+        return await self.job_stats(self.job_id, self.shards)
+
+    async def _scan(self, url: str, lang: str, features: List[str]) -> Tuple[Optional[AnalyzeResponse], Optional[str]]:
+        """(result, None) or (None, error message), from the scan's own event stream"""
+        response, error = None, None
+        async for chunk in process_url_stream(url, lang, features):
+            event = json.loads(chunk)
+            if event.get("type") == "complete":
+                response = AnalyzeResponse(**event["data"])
+            elif event.get("type") == "error":
+                error = event.get("message")
+        if response is None:
+            return None, error or "Analysis stream completed without result"
+        return response, None
+
+    async def _checkpoint(self):
+        stats = await self.stats()
+        if self.on_checkpoint:
+            outcome = self.on_checkpoint(stats) if inspect.iscoroutinefunction(self.on_checkpoint) \
+                else asyncio.to_thread(self.on_checkpoint, stats)
+            await outcome
+        return stats
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Scans queued URLs until the queue is empty or a cancel is requested.
+        Returns the job's stats once this shard's lock is released: the shard
+        that sees no other shard running is the last one.
+        """
+        if not await self.redis.set(self.lock_key, self.lock_token, nx=True, ex=LOCK_TTL):
+            raise ShardAlreadyRunning(f"{self.job_id}:{self.shard}")
+        try:
+            await self._run()
+        finally:
+            if await self.redis.get(self.lock_key) in (self.lock_token, self.lock_token.encode()):
+                await self.redis.delete(self.lock_key)
+        return await self._checkpoint()
+
+    async def _requeue_in_flight(self) -> int:
+        """Resume: URLs this shard had started go back to the head of the queue"""
+        moved = 0
+        while await self.redis.lmove(self.processing_key, self.queue_key, "RIGHT", "LEFT") is not None:
+            moved += 1
+        return moved
+
+    async def _run(self):
+        stop = asyncio.Event()
+        moved = await self._requeue_in_flight()
+        if moved:
+            logger.info(f"Resuming bulk scan {self.job_id} shard {self.shard}: {moved} URLs requeued")
+
+        async def worker():
+            busy_streak = 0
+            while not stop.is_set():
+                raw = await self.redis.lmove(self.queue_key, self.processing_key, "LEFT", "RIGHT")
+                if raw is None:
+                    return  # Queue drained (other shards finish their own in-flight URLs)
+                index, url = self._decode_item(raw)
+
+                host_key, token = self._host_key(url), uuid.uuid4().hex
+                if not await self.leases.acquire(host_key, token, 1):
+                    # Host busy or cooling down: back to the tail, try another URL
+                    pipe = self.redis.pipeline(transaction=True)
+                    pipe.lrem(self.processing_key, 1, raw)
+                    pipe.rpush(self.queue_key, raw)
+                    await pipe.execute()
+                    busy_streak += 1
+                    if busy_streak % self.BUSY_STREAK == 0:
+                        await asyncio.sleep(self.HOST_RETRY)
+                    continue
+                busy_streak = 0
+                self._held[f"host:{token}"] = (host_key, token)
+                try:
+                    await self._scan_one(raw, index, url, token, stop)
+                finally:
+                    self._held.pop(f"host:{token}", None)
+                    await self.leases.release(host_key, token, linger=self.HOST_COOLDOWN)
+
+        async def checkpointer():
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.CHECKPOINT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.redis.expire(self.lock_key, LOCK_TTL)
+                    for key, token in list(self._held.values()):
+                        await self.leases.renew(key, token)
+                    if await self.redis.exists(self.cancel_key):
+                        stop.set()
+                    await self._checkpoint()
+                except Exception as e:
+                    logger.warning(f"Bulk scan {self.job_id} shard {self.shard} checkpoint failed: {e}")
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        monitor = asyncio.create_task(checkpointer())
+        cancelled = asyncio.create_task(self._watch_cancel(stop, workers))
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            stop.set()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            cancelled.cancel()
+            await monitor
+
+    async def _watch_cancel(self, stop: asyncio.Event, workers: List[asyncio.Task]):
+        """Scans can take minutes: a cancel interrupts them (their URLs stay in processing for a resume)"""
+        await stop.wait()
+        for task in workers:
+            task.cancel()
+
+    async def _scan_one(self, raw, index: int, url: str, token: str, stop: asyncio.Event):
+        # Platform-wide slot; the host lease is already held
+        while not await self.leases.acquire(self.SLOTS_KEY, token, self.slot_limit):
+            if stop.is_set():
+                return
+            await asyncio.sleep(self.SLOT_POLL)
+        self._held[f"slot:{token}"] = (self.SLOTS_KEY, token)
+        started = time.monotonic()
+        try:
+            try:
+                response, error = await self.scan(url, self.lang, self.features)
+            except Exception as e:
+                response, error = None, str(e)
+            audit_id = None
+            if response is not None and self.on_result:
+                try:
+                    audit_id = await asyncio.to_thread(self.on_result, url, response)
+                except Exception as e:
+                    logger.warning(f"Bulk scan {self.job_id}: saving {url} failed: {e}")
+            row = scan_row(index, url, time.monotonic() - started, response, audit_id, error)
+        finally:
+            self._held.pop(f"slot:{token}", None)
+            await self.leases.release(self.SLOTS_KEY, token)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(self.results_key, json.dumps(row, separators=(",", ":")))
+        pipe.hincrby(self.stats_key, "urls_done", 1)
+        if error:
+            pipe.hincrby(self.stats_key, "urls_failed", 1)
+        pipe.lrem(self.processing_key, 1, raw)
+        for key in (self.results_key, self.stats_key):
+            pipe.expire(key, RESULT_TTL)
+        await pipe.execute()
@@ -0,0 +1,147 @@
+"""
+CI Gate Service
+Pass/fail scan for deployment pipelines: runs only the analyzers that feed
+the global score and stops as soon as the verdict can no longer change.
+
+After each analyzer finishes, the global score is bounded by assuming every
+category still pending scores 0 (lowest) or 100 (highest). Once the lowest
+possible score reaches the threshold, or the highest falls below it, the
+remaining analyzers are cancelled: a site with poor security headers fails
+without waiting for Lighthouse.
+
+Browser rendering is not used: the gate scores the page as served.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..models import CIGateResponse, GDPRResult, GreenResult, SecurityResult, SEOResult
+from ..models.schemas import GLOBAL_SCORE_WEIGHTS
+from .gdpr import GDPRAnalyzer
+from .green_it import GreenITAnalyzer
+from .security import SecurityAnalyzer
+from .seo import SEOAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# feature_key, AnalyzerClass, internal name, result class (used when skipped or failed, as in a full scan)
+SCORED_ANALYZERS = [
+    ("seo_scan", SEOAnalyzer, "seo", SEOResult),
+    ("security_scan", SecurityAnalyzer, "security", SecurityResult),
+    ("gdpr_scan", GDPRAnalyzer, "gdpr", GDPRResult),
+    ("green_scan", GreenITAnalyzer, "green", GreenResult),
+]
+
+
+def category_scores(name: str, result) -> Dict[str, Optional[int]]:
+    """Global-score categories produced by one analyzer (None: left out of the score)"""
+    if name == "seo":
+        return {
+            "performance": result.scores.performance,
+            "seo": result.scores.seo,
+            "accessibility": result.scores.accessibility,
+            "best_practices": result.scores.best_practices,
+        }
+    category = "green_it" if name == "green" else name
+    return {category: result.score}
+
+
+def score_bounds(known: Dict[str, Optional[int]]) -> Tuple[int, int]:
+    """
+    Lowest and highest global score still possible (same formula as
+    AnalyzeResponse.calculate_global_score) given the categories known so far.
+    Pending categories count as 0 for the lowest bound and 100 for the highest.
+    """
+    bounds = []
+    for pending_score in (0, 100):
+        scores = []
+        for category, weight in GLOBAL_SCORE_WEIGHTS.items():
+            if category not in known:
+                scores.append((pending_score, weight))
+            elif known[category] is not None:
+                scores.append((max(0, min(100, known[category])), weight))
+        total_weight = sum(weight for _, weight in scores)
+        if total_weight > 0:
+            weighted_sum = sum(score * (weight / total_weight) for score, weight in scores)
+            bounds.append(max(0, min(100, int(round(weighted_sum)))))
+        else:
+            bounds.append(0)
+    return bounds[0], bounds[1]
+
+
+def _verdict(lowest: int, highest: int, threshold: int) -> Optional[str]:
+    if lowest >= threshold:
+        return "passed"
+    if highest < threshold:
+        return "failed"
+    return None
+
+
+async def run_gate(
+    url: str,
+    threshold: int,
+    lang: str = "en",
+    allowed_features: Optional[List[str]] = None,
+    fail_on_error: bool = True
+) -> CIGateResponse:
+    """Scan `url` until its global score is certainly above or below `threshold`"""
+    start_time = time.time()
+    if allowed_features is None:
+        allowed_features = [feature for feature, _, _, _ in SCORED_ANALYZERS]
+
+    known: Dict[str, Optional[int]] = {}
+    running: Dict[asyncio.Task, Tuple[str, type]] = {}
+    for feature_key, analyzer_cls, name, result_cls in SCORED_ANALYZERS:
+        if feature_key not in allowed_features:
+            known.update(category_scores(name, result_cls(error="Skipped (Plan Limit)")))
+            continue
+        analyzer = analyzer_cls()
+        coro = analyzer.analyze(url, lang) if name == "seo" else analyzer.analyze(url)
+        running[asyncio.create_task(coro)] = (name, result_cls)
+
+    completed: List[str] = []
+    errors: List[str] = []
+    lowest, highest = score_bounds(known)
+    verdict = _verdict(lowest, highest, threshold)
+    pending = set(running)
+    try:
+        while pending and verdict is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, result_cls = running[task]
+                completed.append(name)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    errors.append(f"{name.upper()} analysis failed: {str(e)}")
+                    result = result_cls(error=str(e))
+                known.update(category_scores(name, result))
+
+            lowest, highest = score_bounds(known)
+            if errors and fail_on_error:
+                verdict = "failed"
+            else:
+                verdict = _verdict(lowest, highest, threshold)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    cancelled = [running[task][0] for task in running if task in pending]
+    if cancelled:
+        logger.info(f"🚦 CI gate {url}: {verdict} (score {lowest}-{highest}, threshold {threshold}), cancelled {', '.join(cancelled)}")
+
+    return CIGateResponse(
+        url=url,
+        status=verdict,
+        threshold=threshold,
+        score=lowest if lowest == highest else None,
+        score_min=lowest,
+        score_max=highest,
+        completed=completed,
+        cancelled=cancelled,
+        errors=errors,
+        scan_duration_seconds=round(time.time() - start_time, 2)
+    )
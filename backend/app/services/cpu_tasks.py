@@ -0,0 +1,213 @@
+"""
+CPU Tasks
+Picklable, module-level functions run inside the CPUExecutor process pool.
+They take and return plain data so nothing heavy crosses the process boundary.
+"""
+from typing import Dict, List, Optional, Tuple, Any
+from urllib.parse import urljoin, urlparse
+
+# Per-process Wappalyzer instance (loading the fingerprint DB is expensive)
+_wappalyzer = None
+
+
+def extract_links(html: str, page_url: str, base_url: str) -> List[Tuple[str, str, bool]]:
+    """
+    Extract anchor and image links from HTML.
+    URLs are canonicalized (tracking params dropped), so each target is listed
+    once, with the first anchor text found. www. and trailing-slash variants are
+    distinct targets: one can be broken while the other works.
+
+    Returns:
+        List of tuples (url, anchor_text, is_internal)
+    """
+    from bs4 import BeautifulSoup
+    from .url_canon import canonicalize_url, same_site
+
+    links: Dict[str, Tuple[str, str, bool]] = {}
+    soup = BeautifulSoup(html, "lxml")
+    base_netloc = urlparse(base_url).netloc
+
+    def add(raw: str, anchor_text: str):
+        # Non-http(s) schemes (javascript:, mailto:, tel:, data:) canonicalize to None
+        full_url = canonicalize_url(raw, page_url)
+        if full_url is None:
+            return
+        if full_url not in links:
+            links[full_url] = (full_url, anchor_text, same_site(urlparse(full_url).netloc, base_netloc))
+
+    # Find all anchor tags
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag.get("href", "").strip()
+        # Skip empty and anchor-only links
+        if href and not href.startswith("#"):
+            add(href, a_tag.get_text(strip=True)[:100])  # Limit text length
+
+    # Also check images
+    for img_tag in soup.find_all("img", src=True):
+        add(img_tag.get("src", ""), f"[Image: {img_tag.get('alt', 'no alt')[:50]}]")
+
+    return list(links.values())
+
+
+def extract_resources(html: str, base_url: str) -> List[str]:
+    """Absolute canonical URLs of page assets (images, scripts, styles, media), each listed once."""
+    from bs4 import BeautifulSoup
+    from .url_canon import canonicalize_url
+
+    soup = BeautifulSoup(html, "html.parser")
+    raw = []
+
+    # Images
+    raw.extend(img.get("src") for img in soup.find_all("img", src=True))
+    # Scripts
+    raw.extend(script.get("src") for script in soup.find_all("script", src=True))
+    # Styles
+    raw.extend(link.get("href") for link in soup.find_all("link", rel="stylesheet", href=True))
+    # Media (Video/Audio)
+    raw.extend(source.get("src") for source in soup.find_all("source", src=True))
+
+    urls: Dict[str, None] = {}  # Ordered set
+    for value in raw:
+        if not value or value.startswith("data:"):
+            continue
+        url = canonicalize_url(value, base_url)
+        if url is not None:
+            urls.setdefault(url)
+    return list(urls)
+
+
+def extract_script_sources(html: str, base_url: str) -> List[str]:
+    """Absolute canonical URLs of external scripts, in document order."""
+    from bs4 import BeautifulSoup
+    from .url_canon import canonicalize_url
+
+    soup = BeautifulSoup(html, "html.parser")
+    seen = []
+    for script in soup.find_all("script", src=True):
+        src = canonicalize_url(script["src"], base_url)
+        if src is not None and src not in seen:
+            seen.append(src)
+    return seen
+
+
+def _get_meta(soup, property_name: str, attr: str = "property") -> Optional[str]:
+    """Helper to safely extract meta content"""
+    # Try finding by property (og:*) or name (twitter:*)
+    tag = soup.find("meta", attrs={attr: property_name})
+
+    # Fallback: sometimes people swap name/property
+    if not tag:
+        alt_attr = "name" if attr == "property" else "property"
+        tag = soup.find("meta", attrs={alt_attr: property_name})
+
+    if tag and tag.get("content"):
+        return tag["content"].strip()
+    return None
+
+
+def extract_social_meta(html: str) -> Dict[str, Optional[str]]:
+    """Open Graph / Twitter Card tags plus basic title/description fallbacks."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    meta_desc_tag = soup.find("meta", attrs={"name": "description"})
+    return {
+        "og_title": _get_meta(soup, "og:title"),
+        "og_description": _get_meta(soup, "og:description"),
+        "og_image": _get_meta(soup, "og:image"),
+        "og_url": _get_meta(soup, "og:url"),
+        "og_site_name": _get_meta(soup, "og:site_name"),
+        "twitter_card": _get_meta(soup, "twitter:card", "name"),
+        "twitter_title": _get_meta(soup, "twitter:title", "name"),
+        "twitter_description": _get_meta(soup, "twitter:description", "name"),
+        "twitter_image": _get_meta(soup, "twitter:image", "name"),
+        "page_title": soup.title.string.strip() if soup.title and soup.title.string else None,
+        "meta_description": meta_desc_tag["content"].strip() if meta_desc_tag and meta_desc_tag.get("content") else None,
+    }
+
+
+def _html_parser(charset: Optional[str]):
+    from lxml import html as lxml_html
+
+    if charset:
+        try:
+            return lxml_html.HTMLParser(encoding=charset)
+        except LookupError:
+            pass  # Unknown charset: let lxml sniff <meta charset>
+    return lxml_html.HTMLParser()
+
+
+def audit_page(body: bytes, charset: Optional[str], page_url: str) -> Dict[str, Any]:
+    """
+    On-page SEO facts of one HTML page, gathered in a single pass over its elements:
+    title, meta description/viewport/robots, H1 count, images without alt,
+    canonical and hreflang alternates (absolute canonical URLs).
+    """
+    from lxml import html as lxml_html
+    from .url_canon import canonicalize_url
+
+    findings: Dict[str, Any] = {
+        "title": None, "description": None, "h1": 0, "images": 0, "images_no_alt": 0,
+        "viewport": False, "noindex": False, "canonical": None, "hreflang": {},
+    }
+    root = lxml_html.document_fromstring(body, parser=_html_parser(charset))
+    base = page_url
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue  # Comments, processing instructions
+        if tag == "title":
+            if findings["title"] is None:
+                findings["title"] = " ".join(element.text_content().split()) or None
+        elif tag == "meta":
+            name = (element.get("name") or "").strip().lower()
+            content = (element.get("content") or "").strip()
+            if name == "description" and findings["description"] is None:
+                findings["description"] = " ".join(content.split()) or None
+            elif name == "viewport":
+                findings["viewport"] = findings["viewport"] or bool(content)
+            elif name == "robots" and {"noindex", "none"} & set(content.lower().replace(",", " ").split()):
+                findings["noindex"] = True
+        elif tag == "link":
+            rel = (element.get("rel") or "").lower().split()
+            href = (element.get("href") or "").strip()
+            if not href:
+                continue
+            if "canonical" in rel and findings["canonical"] is None:
+                findings["canonical"] = canonicalize_url(href, base)
+            elif "alternate" in rel and element.get("hreflang"):
+                alternate = canonicalize_url(href, base)
+                if alternate:
+                    findings["hreflang"].setdefault(element.get("hreflang").strip().lower(), alternate)
+        elif tag == "base":
+            if element.get("href") and base == page_url:
+                base = urljoin(page_url, element.get("href").strip())
+        elif tag == "h1":
+            findings["h1"] += 1
+        elif tag == "img":
+            findings["images"] += 1
+            # alt="" is the correct markup for decorative images: only a missing attribute counts
+            if element.get("alt") is None:
+                findings["images_no_alt"] += 1
+    return findings
+
+
+def audit_pages(pages: List[Tuple[str, bytes, Optional[str]]]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """audit_page() over a batch of (url, body, charset): one pool round-trip for several pages"""
+    results = []
+    for page_url, body, charset in pages:
+        try:
+            results.append((page_url, audit_page(body, charset, page_url)))
+        except Exception:
+            results.append((page_url, None))  # Unparsable page: left out of the audit
+    return results
+
+
+def fingerprint_technologies(url: str, html: str, headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Wappalyzer detection with version extraction (regex over the whole page)."""
+    global _wappalyzer
+    if _wappalyzer is None:
+        from .wappalyzer_enhanced import EnhancedWappalyzer
+        _wappalyzer = EnhancedWappalyzer()
+    return _wappalyzer.analyze(url, html, headers)
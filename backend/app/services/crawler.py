@@ -1,72 +1,245 @@
 import asyncio
+import hashlib
+import inspect
 import logging
-from typing import Set, List, Dict, Tuple
-from urllib.parse import urljoin, urlparse, urldefrag
-from collections import deque
+import time
+from contextlib import aclosing
+from typing import Set, List, Dict, Tuple, Optional, Callable, Any, Awaitable
+from urllib.parse import urljoin, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
+
+from ..core.politeness import polite_trace_config
+from .html_stream import ExtractedLinks, StreamingLinkExtractor, is_html_content_type
+from .page_fingerprints import PageFingerprint, PageFingerprintStore
+from .robots import CRAWLER_USER_AGENT, RobotsCache, RobotsPolicy
+from .sitemaps import SitemapReader
+from .url_canon import canonicalize_url, same_site, url_key
 
 logger = logging.getLogger(__name__)
 
+# Called with a progress dict after each page: may be a plain function or a coroutine function
+ProgressCallback = Callable[[Dict[str, Any]], Any]
+# Called with (url, status, links) for every fetched page; links is None for non-HTML / error pages
+PageCallback = Callable[[str, int, Optional[ExtractedLinks]], Any]
+# Called with (url, body, charset) for every HTML page read in full, before its PageCallback
+HtmlCallback = Callable[[str, bytes, Optional[str]], Any]
+
+
+async def invoke_callback(callback: Callable[..., Any], *args):
+    """Run a sync or async callback; its failures never stop the crawl"""
+    try:
+        outcome = callback(*args)
+        if inspect.isawaitable(outcome):
+            await outcome
+    except Exception as e:
+        logger.debug(f"Crawl callback failed: {e}")
+
+
+class _HostSlot:
+    """Per-host concurrency cap and crawl-delay spacing"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.lock = asyncio.Lock()
+        self.next_request_at = 0.0
+
+    async def wait_turn(self):
+        if self.delay <= 0:
+            return
+        async with self.lock:
+            wait = self.next_request_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.next_request_at = time.monotonic() + self.delay
+
+
 class AsyncCrawler:
-    def __init__(self, base_url: str, max_pages: int = 50, max_depth: int = 3, concurrency: int = 10):
-        self.base_url = base_url
+    """
+    Same-domain crawler: a bounded pool of workers pulls from a shared frontier queue,
+    so one slow page only occupies its own slot instead of stalling a whole batch.
+    """
+
+    # Link extraction streams the body: pages are never read past this cap
+    MAX_BODY_BYTES = 5 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+    # robots.txt Crawl-delay is honoured up to this value (inline scans must finish)
+    MAX_CRAWL_DELAY = 10.0
+    # Sitemap seeds take at most this share of max_pages: links found while crawling get the rest
+    SITEMAP_SHARE = 0.5
+
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int = 50,
+        max_depth: int = 3,
+        concurrency: int = 10,
+        per_host_concurrency: Optional[int] = None,
+        crawl_delay: float = 0.0,
+        on_progress: Optional[ProgressCallback] = None,
+        on_page: Optional[PageCallback] = None,
+        respect_robots: bool = True,
+        use_sitemaps: bool = True,
+        fingerprints: Optional[PageFingerprintStore] = None,
+        content_signatures: bool = False,
+        on_html: Optional[HtmlCallback] = None,
+        time_budget: Optional[float] = None,
+    ):
+        self.base_url = canonicalize_url(base_url) or base_url
         self.max_pages = max_pages
         self.max_depth = max_depth
         self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency or concurrency
+        self.crawl_delay = crawl_delay
+        self.on_progress = on_progress
+        self.on_page = on_page
+        # Previous scan's pages: conditional requests, unchanged pages are not re-parsed
+        self.fingerprints = fingerprints
+        # SimHash of each page's main text (links.simhash), for near-duplicate detection
+        self.content_signatures = content_signatures
+        # Raw HTML consumer (site-wide audit); bodies are only kept when it is set
+        self.on_html = on_html
+        # Seconds before the crawl is stopped, fetches in progress included (None: no limit)
+        self.time_budget = time_budget
         self.visited: Set[str] = set()
+        self._seen_keys: Set[str] = set()  # url_key() of visited URLs: aliases are fetched once
         self.results: List[Dict[str, str]] = []  # Stores found URLs with metadata if needed
-        self.domain = urlparse(base_url).netloc
-        self.base_scheme = urlparse(base_url).scheme
+        self.domain = urlparse(self.base_url).netloc
+        self.base_scheme = urlparse(self.base_url).scheme
+        self.origin = f"{self.base_scheme}://{self.domain}"
+        self.respect_robots = respect_robots
+        self.use_sitemaps = use_sitemaps
+        self.robots: Optional[RobotsPolicy] = None
+        self.disallowed: Set[str] = set()  # Same-domain URLs skipped because of robots.txt
+        self.pages_crawled = 0
+        self._hosts: Dict[str, _HostSlot] = {}
 
     def _normalize_url(self, url: str, current_url: str) -> str | None:
         """
-        Normalizes the URL:
-        1. Resolves relative paths.
-        2. Removes fragments (#).
-        3. Checks domain validity.
-        4. Ignores mailto: etc.
+        Canonical same-site URL of a link found on `current_url`, or None
+        (other schemes, other hosts; www. and bare domain count as the same site).
         """
-        # Remove whitespace
-        url = url.strip()
-        
-        # Ignored schemes
-        if url.startswith(("mailto:", "tel:", "javascript:", "data:")):
+        canonical = canonicalize_url(url, current_url)
+        if canonical is None or not same_site(urlparse(canonical).netloc, self.domain):
             return None
+        return canonical
 
-        # Resolve relative URL using the page where the link was found
-        absolute_url = urljoin(current_url, url)
+    async def _load_robots(self, session: aiohttp.ClientSession):
+        """Fetch (or reuse) the site's robots.txt and apply its Crawl-delay"""
+        if not self.respect_robots:
+            return
+        self.robots = await RobotsCache.get(session, self.origin)
+        delay = self.robots.crawl_delay
+        if delay:
+            self.crawl_delay = max(self.crawl_delay, min(delay, self.MAX_CRAWL_DELAY))
+            for slot in self._hosts.values():
+                slot.delay = self.crawl_delay
 
-        # Remove anchors/fragments
-        absolute_url, _ = urldefrag(absolute_url)
+    def _allowed(self, url: str) -> bool:
+        if self.robots is None or self.robots.allowed(url):
+            return True
+        self.disallowed.add(url)
+        return False
 
-        # Parse normalized URL
-        parsed = urlparse(absolute_url)
+    async def _seed_from_sitemaps(self, session: aiohttp.ClientSession, add: Callable[[str], Awaitable[bool]]):
+        """
+        Stream page URLs from the sitemaps listed in robots.txt (default /sitemap.xml)
+        into `add`, which returns False once the crawl cannot take more pages.
+        """
+        if not self.use_sitemaps:
+            return
+        sitemaps = self.robots.sitemaps if self.robots else []
+        if not sitemaps:
+            sitemaps = [f"{self.origin}/sitemap.xml"]
 
-        # Ensure scheme is http or https
-        if parsed.scheme not in ("http", "https"):
-            return None
+        async with aclosing(SitemapReader(session).iter_urls(sitemaps)) as locations:
+            async for location in locations:
+                normalized = self._normalize_url(location, self.base_url)
+                if normalized and self._allowed(normalized) and not await add(normalized):
+                    return
 
-        # Check domain (must be same domain or subdomain if strictness allows, usually strictly same netloc for simple site explorer)
-        # Check against initial domain. 
-        if parsed.netloc != self.domain:
-            return None
-            
-        return absolute_url
+    def _host_slot(self, url: str) -> _HostSlot:
+        host = urlparse(url).netloc
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = _HostSlot(self.per_host_concurrency, self.crawl_delay)
+        return slot
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> Tuple[int, Optional[ExtractedLinks]]:
+        slot = self._host_slot(url)
+        async with slot.semaphore:
+            await slot.wait_turn()
+            return await self._get(session, url)
 
-    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> str:
+    async def _get(self, session: aiohttp.ClientSession, url: str) -> Tuple[int, Optional[ExtractedLinks]]:
+        """
+        (status, links) - status 0 on network failure, links None for non-HTML / error pages.
+        The body is parsed as it streams in and never read past MAX_BODY_BYTES.
+        With a fingerprint store, the previous scan's validators are sent and a
+        304 returns its stored links (flagged unchanged) without any parsing.
+        With on_html set, the body is also handed over once the response is closed.
+        """
+        previous = self.fingerprints.page(url) if self.fingerprints else None
+        headers = previous.conditional_headers() if previous and previous.links else None
         try:
-            async with session.get(url, timeout=10, ssl=False) as response:
-                if response.status == 200:
-                    # Only text/html
-                    content_type = response.headers.get("Content-Type", "")
-                    if "text/html" in content_type:
-                        return await response.text()
-                return ""
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10), ssl=False, headers=headers) as response:
+                if response.status == 304 and headers:
+                    # Unchanged since the previous scan: reuse its links, nothing to parse
+                    previous.links.unchanged = True
+                    return previous.status, previous.links
+
+                # Only text/html: anything else is dropped before its body is read
+                if response.status != 200 or not is_html_content_type(response.headers.get("Content-Type")):
+                    return response.status, None
+
+                extractor = StreamingLinkExtractor(response.charset, signature=self.content_signatures)
+                digest = hashlib.blake2b(digest_size=16) if self.fingerprints else None
+                body = bytearray() if self.on_html else None
+                received = 0
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    remaining = self.MAX_BODY_BYTES - received
+                    if len(chunk) > remaining:
+                        chunk = chunk[:remaining]
+                        extractor.result.truncated = True
+                    received += len(chunk)
+                    extractor.feed(chunk)
+                    if digest:
+                        digest.update(chunk)
+                    if body is not None:
+                        body += chunk
+                    if extractor.result.truncated:
+                        break
+                links = extractor.close()
+
+                if self.fingerprints:
+                    content_hash = digest.hexdigest()
+                    links.unchanged = bool(previous and previous.content_hash == content_hash)
+                    self.fingerprints.put_page(url, PageFingerprint(
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                        content_hash=content_hash,
+                        status=response.status,
+                        links=links,
+                    ))
+                status, charset = response.status, response.charset
         except Exception as e:
             logger.warning(f"Failed to fetch {url}: {str(e)}")
-            return ""
+            return 0, None
+
+        if body is not None:
+            await invoke_callback(self.on_html, url, bytes(body), charset)
+        return status, links
+
+    def _page_links(self, page: ExtractedLinks, current_url: str) -> List[str]:
+        """Normalized same-domain links of a page (honours <base href>)"""
+        base = urljoin(current_url, page.base_href) if page.base_href else current_url
+        links = []
+        for href in page.hrefs:
+            normalized = self._normalize_url(href, base)
+            if normalized:
+                links.append(normalized)
+        return links
 
     async def _process_page(self, session: aiohttp.ClientSession, current_url: str, depth: int) -> List[Tuple[str, int]]:
         """
@@ -75,63 +248,110 @@ class AsyncCrawler:
         if depth >= self.max_depth:
             return []
 
-        html = await self._fetch(session, current_url)
-        if not html:
+        status, page = await self._fetch(session, current_url)
+        if self.on_page:
+            await invoke_callback(self.on_page, current_url, status, page)
+        if not page:
             return []
 
-        soup = BeautifulSoup(html, "html.parser")
-        new_links = []
-        
-        # Extract links
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            normalized = self._normalize_url(href, current_url)
-
-            if normalized:
-                new_links.append((normalized, depth + 1))
-                
-        return new_links
+        return [(link, depth + 1) for link in self._page_links(page, current_url)]
 
     async def crawl(self) -> Set[str]:
         """
-        Starts the BFS crawl using a concurrent batched approach.
+        Crawls breadth-first with `concurrency` workers sharing one frontier, seeded
+        with the homepage and the site's sitemaps; robots.txt rules are honoured.
+        `max_pages` caps the pages fetched: only URLs within `max_depth` are
+        queued, at most max_pages * SITEMAP_SHARE of them from sitemaps. Once
+        the cap is reached no new URLs are queued, but the frontier is drained:
+        queued pages and fetches in progress are finished. Only `time_budget`
+        (when set) cuts the crawl short.
         Returns the set of visited URLs.
         """
-        queue = deque([(self.base_url, 0)]) # Tuple (url, depth)
+        frontier: asyncio.Queue = asyncio.Queue()  # Tuple (url, depth), FIFO -> BFS
         self.visited.add(self.base_url)
-        
+        self._seen_keys.add(url_key(self.base_url))
+        frontier.put_nowait((self.base_url, 0))
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_concurrency)
         # Use a single session for all requests
-        async with aiohttp.ClientSession() as session:
-            while queue and len(self.visited) < self.max_pages:
-                
-                # Create a batch of tasks
-                batch = []
-                while queue and len(batch) < self.concurrency:
-                    batch.append(queue.popleft()) # FIFO -> BFS
-                
-                if not batch:
-                    break
-                    
-                # Run batch in parallel
-                tasks = [self._process_page(session, url, depth) for url, depth in batch]
-                results = await asyncio.gather(*tasks)
-                
-                # Process results
-                for result_links in results:
-                    for url, depth in result_links:
-                        if url not in self.visited:
-                            if len(self.visited) >= self.max_pages:
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": CRAWLER_USER_AGENT},
+            trace_configs=[polite_trace_config()],
+        ) as session:
+            await self._load_robots(session)
+
+            def enqueue(link: str, depth: int) -> bool:
+                """False once the page cap is reached"""
+                if len(self.visited) >= self.max_pages or depth >= self.max_depth:
+                    # Pages beyond max_depth would never be fetched: they don't take a slot
+                    return len(self.visited) < self.max_pages
+                key = url_key(link)
+                if key not in self._seen_keys and link not in self.disallowed and self._allowed(link):
+                    self._seen_keys.add(key)
+                    self.visited.add(link)
+                    frontier.put_nowait((link, depth))
+                return len(self.visited) < self.max_pages
+
+            seeds_left = int(self.max_pages * self.SITEMAP_SHARE)
+
+            async def add_seed(link: str) -> bool:
+                # Sitemap pages count as linked from the homepage
+                nonlocal seeds_left
+                if seeds_left <= 0:
+                    return False
+                known = len(self.visited)
+                can_take_more = enqueue(link, 1)
+                seeds_left -= len(self.visited) - known
+                return can_take_more and seeds_left > 0
+
+            async def worker():
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        new_links = await self._process_page(session, url, depth)
+                        if depth < self.max_depth:
+                            self.pages_crawled += 1
+                        for link, link_depth in new_links:
+                            if not enqueue(link, link_depth):
                                 break
-                            self.visited.add(url)
-                            queue.append((url, depth))
-                        
-                        if len(self.visited) >= self.max_pages:
-                            break
-                    if len(self.visited) >= self.max_pages:
-                        break
-                        
+                        await self._report(url, frontier.qsize())
+                    except Exception as e:
+                        logger.warning(f"Crawl worker failed on {url}: {e}")
+                    finally:
+                        frontier.task_done()
+
+            async def run():
+                # Seeding runs alongside the first fetches; the frontier can only
+                # be considered drained once it is finished
+                await self._seed_from_sitemaps(session, add_seed)
+                await frontier.join()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.wait_for(run(), self.time_budget)
+            except asyncio.TimeoutError:
+                logger.info(f"Crawl time budget exhausted for {self.base_url}: {self.pages_crawled} pages crawled")
+            finally:
+                # Workers are idle on an empty frontier, unless the time budget ran out
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
         return self.visited
 
+    async def _report(self, url: str, queued: int):
+        if not self.on_progress:
+            return
+        event = {
+            "url": url,
+            "pages_crawled": self.pages_crawled,
+            "pages_discovered": len(self.visited),
+            "queued": queued,
+            "max_pages": self.max_pages,
+        }
+        await invoke_callback(self.on_progress, event)
+
 if __name__ == "__main__":
     pass
     # Test simple
@@ -0,0 +1,450 @@
+"""
+CVE Index Service
+Compact on-disk vulnerability index built from offline NVD / OSV feeds.
+
+Versions are parsed once at build time into fixed-width sortable keys and stored
+as half-open [lo, hi) ranges in SQLite. At query time, the ranges of a product are
+loaded once into an array-backed interval tree (sorted by lo, augmented with max hi),
+so a lookup is a bisect plus a pruned walk: O(log n + k).
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import struct
+import zipfile
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from packaging.version import InvalidVersion, Version
+
+logger = logging.getLogger(__name__)
+
+# Release components kept in a key; longer versions are truncated
+_RELEASE_PARTS = 6
+_KEY_FORMAT = f">{_RELEASE_PARTS}IBI"
+MIN_KEY = b"\x00" * struct.calcsize(_KEY_FORMAT)
+MAX_KEY = b"\xff" * struct.calcsize(_KEY_FORMAT)
+
+# Pre-release ordering: dev < a < b < rc < final < post
+_PHASES = {"dev": 0, "a": 1, "b": 2, "rc": 3, "final": 4, "post": 5}
+
+# Feed product identifiers -> normalized technology names (as detected by Wappalyzer)
+PRODUCT_ALIASES = {
+    "apache:http_server": "apache",
+    "apachehttpserver": "apache",
+    "f5:nginx": "nginx",
+    "igor_sysoev:nginx": "nginx",
+    "getbootstrap:bootstrap": "bootstrap",
+    "twitter:bootstrap": "bootstrap",
+    "joomla:joomla!": "joomla",
+    "joomla!": "joomla",
+    "vuejs:vue.js": "vuejs",
+    "vue": "vuejs",
+    "facebook:react": "react",
+    "angularjs:angular.js": "angularjs",
+    "microsoft:internet_information_services": "iis",
+    "microsoftiis": "iis",
+    "wordpress-core": "wordpress",
+}
+
+_SEVERITIES = {"CRITICAL", "HIGH", "MEDIUM", "LOW"}
+
+
+def normalize_product(name: str) -> str:
+    """Case/punctuation-insensitive product key ("Vue.js" -> "vuejs")."""
+    lowered = name.strip().lower()
+    if lowered in PRODUCT_ALIASES:
+        return PRODUCT_ALIASES[lowered]
+    key = re.sub(r"[^a-z0-9]", "", lowered)
+    return PRODUCT_ALIASES.get(key, key)
+
+
+def version_key(version: str) -> Optional[bytes]:
+    """
+    Encode a version as a fixed-width, bytewise-sortable key.
+    Returns None when nothing version-like can be extracted.
+    """
+    if not version:
+        return None
+    try:
+        parsed = Version(version.strip().lstrip("vV"))
+    except InvalidVersion:
+        match = re.search(r"\d+(\.\d+)*", version)
+        if not match:
+            return None
+        parsed = Version(match.group(0))
+
+    release = (tuple(parsed.release) + (0,) * _RELEASE_PARTS)[:_RELEASE_PARTS]
+    if parsed.pre is not None:
+        phase, number = _PHASES.get(parsed.pre[0], 4), parsed.pre[1]
+    elif parsed.dev is not None:
+        phase, number = _PHASES["dev"], parsed.dev
+    elif parsed.post is not None:
+        phase, number = _PHASES["post"], parsed.post
+    else:
+        phase, number = _PHASES["final"], 0
+
+    release = tuple(min(part, 0xFFFFFFFF) for part in release)
+    return struct.pack(_KEY_FORMAT, *release, phase, min(number, 0xFFFFFFFF))
+
+
+def key_after(key: bytes) -> bytes:
+    """Smallest key strictly greater than `key` (turns inclusive bounds into half-open ones)."""
+    return key + b"\x00"
+
+
+class _ProductIntervals:
+    """
+    Array-backed interval tree for one product.
+    Ranges are sorted by lo; an implicit segment tree holds the max hi of each subtree.
+    """
+
+    def __init__(self, rows: List[Tuple[bytes, bytes, int]]):
+        rows.sort()
+        self.los = [r[0] for r in rows]
+        self.his = [r[1] for r in rows]
+        self.ids = [r[2] for r in rows]
+
+        size = 1
+        while size < max(1, len(rows)):
+            size <<= 1
+        self.size = size
+        self.max_hi = [MIN_KEY] * (2 * size)
+        for i, hi in enumerate(self.his):
+            self.max_hi[size + i] = hi
+        for node in range(size - 1, 0, -1):
+            self.max_hi[node] = max(self.max_hi[2 * node], self.max_hi[2 * node + 1])
+
+    def stab(self, key: bytes) -> List[int]:
+        """Ids of all ranges with lo <= key < hi."""
+        limit = bisect_right(self.los, key)  # candidates: [0, limit)
+        found = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, left, right = stack.pop()
+            if left >= limit or self.max_hi[node] <= key:
+                continue
+            if right - left == 1:
+                found.append(self.ids[left])
+                continue
+            mid = (left + right) // 2
+            stack.append((2 * node + 1, mid, right))
+            stack.append((2 * node, left, mid))
+        return found
+
+
+class CVEIndex:
+    """Read side of the index. Per-product interval trees are cached (LRU)."""
+
+    CACHE_SIZE = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._trees: "OrderedDict[str, _ProductIntervals]" = OrderedDict()
+        self._vulns: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def open(cls, path: str) -> Optional["CVEIndex"]:
+        """Open an existing index, or return None when it hasn't been built."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning(f"CVE index at {path} could not be opened: {e}")
+            return None
+
+    def _tree(self, product: str) -> _ProductIntervals:
+        tree = self._trees.get(product)
+        if tree is not None:
+            self._trees.move_to_end(product)
+            return tree
+
+        rows = self._conn.execute(
+            "SELECT lo, hi, vuln_id FROM ranges WHERE product = ?", (product,)
+        ).fetchall()
+        tree = _ProductIntervals([(bytes(lo), bytes(hi), vid) for lo, hi, vid in rows])
+        self._trees[product] = tree
+        if len(self._trees) > self.CACHE_SIZE:
+            self._trees.popitem(last=False)
+        return tree
+
+    def _vuln(self, vuln_id: int) -> Dict[str, Any]:
+        vuln = self._vulns.get(vuln_id)
+        if vuln is None:
+            cve, severity, desc, source = self._conn.execute(
+                "SELECT cve, severity, description, source FROM vulns WHERE id = ?", (vuln_id,)
+            ).fetchone()
+            vuln = {"cve": cve, "severity": severity, "desc": desc, "source": source}
+            self._vulns[vuln_id] = vuln
+        return vuln
+
+    def lookup(self, tech_name: str, version: str) -> List[Dict[str, Any]]:
+        key = version_key(version)
+        if key is None:
+            return []
+        ids = self._tree(normalize_product(tech_name)).stab(key)
+        return [self._vuln(vid) for vid in sorted(set(ids))]
+
+    def stats(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+
+class CVEIndexBuilder:
+    """
+    Write side: ingests NVD (1.1 / 2.0 JSON) and OSV documents into a fresh index file.
+    The file is built next to the target and atomically swapped in on finalize().
+    """
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.building"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE vulns (id INTEGER PRIMARY KEY, cve TEXT UNIQUE, severity TEXT, description TEXT, source TEXT);
+            CREATE TABLE ranges (product TEXT, lo BLOB, hi BLOB, vuln_id INTEGER);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._vuln_ids: Dict[str, int] = {}
+        self._pending: List[Tuple[str, bytes, bytes, int]] = []
+        self.range_count = 0
+
+    # ── Low level ──
+
+    def _vuln_id(self, cve: str, severity: str, desc: str, source: str) -> int:
+        vid = self._vuln_ids.get(cve)
+        if vid is None:
+            cursor = self.conn.execute(
+                "INSERT INTO vulns (cve, severity, description, source) VALUES (?, ?, ?, ?)",
+                (cve, severity, (desc or "")[:300], source),
+            )
+            vid = cursor.lastrowid
+            self._vuln_ids[cve] = vid
+        return vid
+
+    def add_range(self, product: str, lo: bytes, hi: bytes, vuln_id: int):
+        if lo >= hi:
+            return
+        self._pending.append((normalize_product(product), lo, hi, vuln_id))
+        if len(self._pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self.conn.executemany("INSERT INTO ranges VALUES (?, ?, ?, ?)", self._pending)
+            self.range_count += len(self._pending)
+            self._pending = []
+
+    # ── NVD ──
+
+    def ingest_nvd(self, doc: Dict[str, Any]):
+        if "vulnerabilities" in doc:  # NVD API / feed 2.0
+            for item in doc["vulnerabilities"]:
+                cve = item.get("cve", {})
+                desc = next((d["value"] for d in cve.get("descriptions", []) if d.get("lang") == "en"), "")
+                matches = [
+                    m for config in cve.get("configurations", [])
+                    for node in config.get("nodes", [])
+                    for m in node.get("cpeMatch", [])
+                ]
+                self._ingest_nvd_cve(cve.get("id"), self._nvd_severity(cve.get("metrics", {})), desc, matches, "criteria")
+        elif "CVE_Items" in doc:  # Legacy 1.1 feeds
+            for item in doc["CVE_Items"]:
+                meta = item.get("cve", {})
+                cve_id = meta.get("CVE_data_meta", {}).get("ID")
+                desc = next((d["value"] for d in meta.get("description", {}).get("description_data", [])), "")
+                impact = item.get("impact", {})
+                severity = (
+                    impact.get("baseMetricV3", {}).get("cvssV3", {}).get("baseSeverity")
+                    or impact.get("baseMetricV2", {}).get("severity")
+                    or "MEDIUM"
+                )
+                matches = list(self._walk_nodes_v11(item.get("configurations", {}).get("nodes", [])))
+                self._ingest_nvd_cve(cve_id, severity, desc, matches, "cpe23Uri")
+
+    @staticmethod
+    def _walk_nodes_v11(nodes: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for node in nodes:
+            yield from node.get("cpe_match", [])
+            yield from CVEIndexBuilder._walk_nodes_v11(node.get("children", []))
+
+    @staticmethod
+    def _nvd_severity(metrics: Dict[str, Any]) -> str:
+        for key in ("cvssMetricV31", "cvssMetricV30"):
+            for metric in metrics.get(key, []):
+                severity = metric.get("cvssData", {}).get("baseSeverity")
+                if severity:
+                    return severity.upper()
+        for metric in metrics.get("cvssMetricV2", []):
+            if metric.get("baseSeverity"):
+                return metric["baseSeverity"].upper()
+        return "MEDIUM"
+
+    def _ingest_nvd_cve(self, cve_id: Optional[str], severity: str, desc: str, matches: List[Dict[str, Any]], cpe_field: str):
+        if not cve_id or not matches:
+            return
+        severity = severity.upper() if severity.upper() in _SEVERITIES else "MEDIUM"
+        vid = None
+        for match in matches:
+            if not match.get("vulnerable", True):
+                continue
+            parts = match.get(cpe_field, "").split(":")
+            # cpe:2.3:a:vendor:product:version:...
+            if len(parts) < 6 or parts[2] != "a":
+                continue
+            vendor, product, exact = parts[3], parts[4], parts[5]
+
+            lo, hi = self._nvd_bounds(match, exact)
+            if lo is None:
+                continue
+            if vid is None:
+                vid = self._vuln_id(cve_id, severity, desc, "nvd")
+            alias = f"{vendor}:{product}"
+            self.add_range(alias if alias in PRODUCT_ALIASES else product, lo, hi, vid)
+
+    @staticmethod
+    def _nvd_bounds(match: Dict[str, Any], exact: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        bound_fields = ("versionStartIncluding", "versionStartExcluding", "versionEndIncluding", "versionEndExcluding")
+        if not any(match.get(f) for f in bound_fields):
+            if exact in ("*", "-", ""):
+                return None, None  # no version information
+            key = version_key(exact)
+            return (key, key_after(key)) if key else (None, None)
+
+        lo, hi = MIN_KEY, MAX_KEY
+        if match.get("versionStartIncluding"):
+            lo = version_key(match["versionStartIncluding"]) or MIN_KEY
+        elif match.get("versionStartExcluding"):
+            key = version_key(match["versionStartExcluding"])
+            lo = key_after(key) if key else MIN_KEY
+        if match.get("versionEndExcluding"):
+            hi = version_key(match["versionEndExcluding"]) or MAX_KEY
+        elif match.get("versionEndIncluding"):
+            key = version_key(match["versionEndIncluding"])
+            hi = key_after(key) if key else MAX_KEY
+        return lo, hi
+
+    # ── OSV ──
+
+    def ingest_osv(self, doc: Dict[str, Any]):
+        vuln_id = doc.get("id")
+        if not vuln_id:
+            return
+        cve_id = next((a for a in doc.get("aliases", []) if a.startswith("CVE-")), vuln_id)
+        severity = str(doc.get("database_specific", {}).get("severity", "MEDIUM")).upper()
+        if severity == "MODERATE":
+            severity = "MEDIUM"
+        if severity not in _SEVERITIES:
+            severity = "MEDIUM"
+        desc = doc.get("summary") or doc.get("details", "")
+
+        vid = None
+        for affected in doc.get("affected", []):
+            name = affected.get("package", {}).get("name", "")
+            if not name:
+                continue
+            product = name.split("/")[-1]
+
+            intervals = []
+            for rng in affected.get("ranges", []):
+                if rng.get("type") not in ("SEMVER", "ECOSYSTEM"):
+                    continue
+                intervals.extend(self._osv_intervals(rng.get("events", [])))
+            if not intervals:
+                # Explicit version lists only when no ranges are given
+                for version in affected.get("versions", []):
+                    key = version_key(version)
+                    if key:
+                        intervals.append((key, key_after(key)))
+
+            for lo, hi in intervals:
+                if vid is None:
+                    vid = self._vuln_id(cve_id, severity, desc, "osv")
+                self.add_range(product, lo, hi, vid)
+
+    @staticmethod
+    def _osv_intervals(events: List[Dict[str, str]]) -> Iterator[Tuple[bytes, bytes]]:
+        lo = None
+        for event in events:
+            if "introduced" in event:
+                lo = MIN_KEY if event["introduced"] in ("0", "") else version_key(event["introduced"])
+            elif "fixed" in event and lo is not None:
+                hi = version_key(event["fixed"])
+                if hi:
+                    yield lo, hi
+                lo = None
+            elif "last_affected" in event and lo is not None:
+                hi = version_key(event["last_affected"])
+                if hi:
+                    yield lo, key_after(hi)
+                lo = None
+        if lo is not None:
+            yield lo, MAX_KEY
+
+    # ── Files ──
+
+    def ingest_document(self, doc: Any):
+        """Dispatch a decoded JSON document to the right feed parser."""
+        if isinstance(doc, list):
+            for item in doc:
+                self.ingest_document(item)
+        elif isinstance(doc, dict):
+            if "vulnerabilities" in doc or "CVE_Items" in doc:
+                self.ingest_nvd(doc)
+            elif "affected" in doc:
+                self.ingest_osv(doc)
+
+    def ingest_file(self, path: str):
+        """Import a .json / .json.gz / .jsonl file or an OSV .zip dump."""
+        for doc in _iter_documents(path):
+            self.ingest_document(doc)
+        logger.info(f"📥 CVE index: ingested {path} ({len(self._vuln_ids)} vulns so far)")
+
+    def finalize(self) -> Dict[str, int]:
+        self._flush()
+        self.conn.execute("CREATE INDEX ix_ranges_product ON ranges (product)")
+        stats = {"vulns": len(self._vuln_ids), "ranges": self.range_count}
+        self.conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("built_at", datetime.utcnow().isoformat()),
+            ("vulns", str(stats["vulns"])),
+            ("ranges", str(stats["ranges"])),
+        ])
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
+        return stats
+
+
+def _iter_documents(path: str) -> Iterable[Any]:
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.endswith(".json"):
+                    with archive.open(member) as fh:
+                        yield json.load(fh)
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        if ".jsonl" in path:
+            for line in io.TextIOWrapper(fh, encoding="utf-8"):
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield json.load(fh)
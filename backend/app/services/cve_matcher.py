@@ -2,10 +2,13 @@
 CVE Matcher Service
 Checks detected technologies against a local database of known vulnerabilities.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from packaging.version import parse as parse_version, Version
 import logging
 
+from ..config import get_settings
+from .cve_index import CVEIndex, normalize_product, version_key, key_after
+
 logger = logging.getLogger(__name__)
 
 class CVEMatcher:
@@ -60,41 +63,69 @@ class CVEMatcher:
         "Apache": "2.4.58"
     }
 
+    # Curated DB with versions parsed once: normalized tech -> [(lo_key, hi_key, vuln)]
+    _compiled: Optional[Dict[str, List[Tuple[bytes, bytes, Dict[str, Any]]]]] = None
+
+    # Offline NVD/OSV index (built by scripts/import_cve_feed.py), opened lazily
+    _index: Optional[CVEIndex] = None
+    _index_checked: bool = False
+
+    @classmethod
+    def _compiled_db(cls) -> Dict[str, List[Tuple[bytes, bytes, Dict[str, Any]]]]:
+        if cls._compiled is None:
+            compiled = {}
+            for tech, vulns in cls.VULN_DB.items():
+                entries = []
+                for vuln in vulns:
+                    lo = version_key(vuln["min"])
+                    hi = version_key(vuln["max"])
+                    # EOL entries include their upper bound
+                    if vuln.get("cve") == "EOL":
+                        hi = key_after(hi)
+                    entries.append((lo, hi, vuln))
+                compiled[normalize_product(tech)] = entries
+            cls._compiled = compiled
+        return cls._compiled
+
+    @classmethod
+    def _get_index(cls) -> Optional[CVEIndex]:
+        if not cls._index_checked:
+            cls._index_checked = True
+            cls._index = CVEIndex.open(get_settings().cve_index_path)
+            if cls._index:
+                logger.info(f"🛡️ CVE index loaded: {cls._index.stats()}")
+        return cls._index
+
     @classmethod
     def check_vulnerabilities(cls, tech_name: str, version: str) -> List[Dict[str, Any]]:
         """
         Check if a specific version of a technology has known vulnerabilities.
+        Uses the curated list plus the offline CVE index when it has been built.
         """
-        if not version or tech_name not in cls.VULN_DB:
+        if not version:
             return []
-            
+
         detected_vulns = []
         try:
             # Clean version string (remove 'v', build numbers if complex)
-            clean_ver = cls._clean_version(version)
-            current_ver = parse_version(clean_ver)
-            
-            for vuln in cls.VULN_DB[tech_name]:
-                # Handle EOL checks
-                if vuln.get("cve") == "EOL":
-                    # Simple range check
-                    min_v = parse_version(vuln["min"])
-                    max_v = parse_version(vuln["max"])
-                    if min_v <= current_ver <= max_v:
-                        detected_vulns.append(vuln)
-                    continue
+            current_key = version_key(cls._clean_version(version))
+            if current_key is None:
+                return []
 
-                # Standard CVE checks
-                min_v = parse_version(vuln["min"])
-                max_v = parse_version(vuln["max"])
-                
-                if min_v <= current_ver < max_v:
+            for lo, hi, vuln in cls._compiled_db().get(normalize_product(tech_name), []):
+                if lo <= current_key < hi:
                     detected_vulns.append(vuln)
-                    
+
+            index = cls._get_index()
+            if index:
+                known = {v["cve"] for v in detected_vulns}
+                for vuln in index.lookup(tech_name, cls._clean_version(version)):
+                    if vuln["cve"] not in known:
+                        detected_vulns.append(vuln)
+
         except Exception as e:
             logger.debug(f"Version match failed for {tech_name} {version}: {e}")
-            pass
-            
+
         return detected_vulns
 
     @classmethod
@@ -0,0 +1,132 @@
+"""
+DKIM Selector Catalogue
+Selectors cannot be listed through DNS: discovery probes <selector>._domainkey.<domain>
+for likely names. This module orders the candidates: selectors of the providers a
+domain's SPF includes point to first, then selectors used by mail providers and
+email platforms, then generic naming schemes (numbered, dated, key sizes).
+"""
+from typing import Dict, Iterable, List, Tuple
+
+# SPF include (domain or parent domain) -> (provider, its DKIM selectors)
+SPF_INCLUDE_PROVIDERS: Dict[str, Tuple[str, List[str]]] = {
+    "spf.protection.outlook.com": ("Microsoft 365", ["selector1", "selector2"]),
+    "_spf.google.com": ("Google Workspace", ["google", "google2048"]),
+    "servers.mcsv.net": ("Mailchimp", ["k1", "k2", "k3"]),
+    "mandrillapp.com": ("Mandrill", ["mandrill", "mte1", "mte2"]),
+    "sendgrid.net": ("SendGrid", ["s1", "s2", "smtpapi"]),
+    "mailgun.org": ("Mailgun", ["k1", "mx", "smtp", "mailo", "krs", "pic"]),
+    "amazonses.com": ("Amazon SES", ["amazonses"]),
+    "mailjet.com": ("Mailjet", ["mailjet"]),
+    "sendinblue.com": ("Brevo", ["mail", "brevo1", "brevo2"]),
+    "brevo.com": ("Brevo", ["brevo1", "brevo2", "mail"]),
+    "_spf.salesforce.com": ("Salesforce", ["sf1", "sf2"]),
+    "zoho.com": ("Zoho Mail", ["zmail", "zoho"]),
+    "zoho.eu": ("Zoho Mail", ["zmail", "zoho"]),
+    "messagingengine.com": ("Fastmail", ["fm1", "fm2", "fm3", "mesmtp"]),
+    "protonmail.ch": ("Proton Mail", ["protonmail", "protonmail2", "protonmail3"]),
+    "mtasv.net": ("Postmark", ["pm", "pm-bounces"]),
+    "mktomail.com": ("Marketo", ["m1", "m2"]),
+    "hubspotemail.net": ("HubSpot", ["hs1", "hs2"]),
+    "constantcontact.com": ("Constant Contact", ["ctct1", "ctct2"]),
+    "mail.zendesk.com": ("Zendesk", ["zendesk1", "zendesk2"]),
+    "everlytic.net": ("Everlytic", ["everlytickey1", "everlytickey2", "eversrv"]),
+    "mxroute.com": ("MXroute", ["x"]),
+    "_spf.elasticemail.com": ("Elastic Email", ["api"]),
+    "mailerlite.com": ("MailerLite", ["ml", "ml2", "litesrv"]),
+    "_spf.mx.cloudflare.net": ("Cloudflare Email Routing", ["cf2024-1"]),
+    "icloud.com": ("iCloud Mail", ["sig1"]),
+    "ionos.com": ("IONOS", ["s1-ionos", "s2-ionos"]),
+    "ionos.fr": ("IONOS", ["s1-ionos", "s2-ionos"]),
+    "yandex.net": ("Yandex 360", ["mail"]),
+    "mailchannels.net": ("MailChannels", ["mailchannels"]),
+    "smtp.com": ("SMTP.com", ["smtpcomcustomers"]),
+    "spf.emailsrvr.com": ("Rackspace Email", ["rackspace"]),
+    "turbo-smtp.com": ("turboSMTP", ["turbo-smtp"]),
+    "mailup.it": ("MailUp", ["mailup"]),
+    "sparkpostmail.com": ("SparkPost", ["scph0316", "scph1220", "sparkpost"]),
+    "freshdesk.com": ("Freshdesk", ["fd", "fd2"]),
+    "intercom.io": ("Intercom", ["intercom", "ic"]),
+    "helpscoutemail.com": ("Help Scout", ["strong1", "strong2"]),
+    "customeriomail.com": ("Customer.io", ["cio", "cio1"]),
+    "klaviyomail.com": ("Klaviyo", ["kl", "kl2"]),
+    "mailpoet.com": ("MailPoet", ["mailpoet1", "mailpoet2"]),
+    "convertkit.com": ("Kit (ConvertKit)", ["ck", "ck2"]),
+    "emarsys.net": ("Emarsys", ["emarsys", "emarsys2007"]),
+    "exacttarget.com": ("Salesforce Marketing Cloud", ["200608", "10dkim1"]),
+    "cust-spf.exacttarget.com": ("Salesforce Marketing Cloud", ["200608", "10dkim1"]),
+    "_spf.qualtrics.com": ("Qualtrics", ["qualtrics"]),
+    "mailgun.net": ("Mailgun", ["k1", "mx", "smtp", "mailo"]),
+    "ovh.com": ("OVHcloud", ["ovh", "ovhmo"]),
+    "gandi.net": ("Gandi", ["gm1", "gm2", "gandi"]),
+    "secureserver.net": ("GoDaddy", ["k1", "default"]),
+}
+
+# Selectors seen in the wild for mail providers and sending platforms, most common first
+PROVIDER_SELECTORS = [
+    "google", "selector1", "selector2", "default", "k1", "k2", "k3", "s1", "s2", "mail",
+    "dkim", "smtp", "mandrill", "mte1", "mte2", "mxvault", "everlytickey1", "everlytickey2",
+    "eversrv", "dk", "sig1", "pm", "mailjet", "zendesk1", "zendesk2", "amazonses", "cm",
+    "sm", "ctct1", "ctct2", "hs1", "hs2", "krs", "m1", "m2", "protonmail", "protonmail2",
+    "protonmail3", "fm1", "fm2", "fm3", "mesmtp", "zoho", "zmail", "mailo", "mx", "pic",
+    "smtpapi", "sf1", "sf2", "api", "x", "fd", "fd2", "google2048", "brevo1", "brevo2",
+    "mailchimp", "mc", "mcdkim", "sendgrid", "sg", "spop1024", "s1024", "s2048", "s4096",
+    "email", "emails", "mailer", "mailing", "newsletter", "news", "marketing", "mkt",
+    "bulk", "bounce", "bounces", "em", "mg", "mailgun", "postmark", "pm-bounces",
+    "sparkpost", "scph0316", "scph1220", "sp", "mailup", "sib", "sendinblue", "mailerlite",
+    "ml", "ml2", "litesrv", "klaviyo", "kl", "kl2", "mailpoet", "mailpoet1", "mailpoet2",
+    "ck", "ck2", "convertkit", "activecampaign", "dkim-ac", "acdkim", "cio", "cio1",
+    "intercom", "ic", "strong1", "strong2", "helpscout", "freshdesk", "qualtrics",
+    "emarsys", "emarsys2007", "200608", "10dkim1", "cf2024-1", "s1-ionos", "s2-ionos",
+    "ionos", "1and1", "ovh", "ovhmo", "gandi", "gm1", "gm2", "rackspace", "smtpcomcustomers",
+    "mailchannels", "turbo-smtp", "yandex", "ya", "mail-ru", "mailru", "qq", "aliyun",
+    "alibaba", "netease", "163", "titan", "titan1", "zimbra", "mailcow", "dkim-mailcow",
+    "postfix", "exim", "mta", "mta1", "mta2", "relay", "out", "outbound", "smtpout",
+    "smtp1", "smtp2", "mx1", "mx2", "server", "server1", "host", "web", "www", "cpanel",
+    "plesk", "directadmin", "hostinger", "hostgator", "bluehost", "dreamhost", "namecheap",
+    "privateemail", "godaddy", "secureserver", "wix", "squarespace", "shopify", "shopify2",
+    "shopify3", "wordpress", "jetpack", "mailpro", "sendy", "mautic", "acumbamail",
+    "getresponse", "gr", "moosend", "omnisend", "drip", "aweber", "benchmark", "campaign",
+    "cmail1", "cmail2", "createsend", "createsend1", "createsend2", "dyn", "socketlabs",
+    "mailersend", "mlsend", "mlsend2", "resend", "loops", "postal", "pepipost", "netcore",
+    "zeptomail", "zepto", "sendpulse", "sp1", "sp2", "unisender", "dotdigital", "dd",
+    "marketo", "mkto", "pardot", "hubspot", "hubspot1", "hubspot2", "eloqua", "elq",
+    "responsys", "rsys", "epsilon", "braze", "iterable", "mparticle", "sailthru", "cordial",
+    "listrak", "bronto", "selligent", "acoustic", "silverpop", "spop", "mailkit",
+    "office365", "o365", "outlook", "microsoft", "exchange", "gsuite", "workspace", "gmail",
+    "apple", "icloud", "fastmail", "proton", "tutanota", "mailbox", "posteo", "runbox",
+]
+
+# Generic naming schemes, after the provider ones
+_NUMBERED = ("s", "k", "key", "dkim", "selector", "sel", "sig", "mail", "default", "m", "d")
+_YEARS = range(2015, 2027)
+GENERIC_SELECTORS = (
+    [f"{prefix}{number}" for number in range(1, 7) for prefix in _NUMBERED]
+    + [str(year) for year in _YEARS]
+    + [f"dkim{year}" for year in _YEARS]
+    + [f"s{year}" for year in _YEARS]
+    + ["rsa", "rsa1", "rsa2", "rsa2048", "ed25519", "ed", "ec", "primary", "secondary",
+       "main", "prod", "production", "new", "old", "2k", "4k", "1024", "2048", "4096"]
+)
+
+
+def _unique(selectors: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(selectors))
+
+
+ALL_SELECTORS = _unique(PROVIDER_SELECTORS + GENERIC_SELECTORS)
+
+
+def providers_for_includes(includes: Iterable[str]) -> List[Tuple[str, List[str]]]:
+    """(provider, selectors) of the known senders among SPF include domains"""
+    found = {}
+    for include in includes:
+        include = include.rstrip(".").lower()
+        for suffix, (provider, selectors) in SPF_INCLUDE_PROVIDERS.items():
+            if include == suffix or include.endswith(f".{suffix}"):
+                found.setdefault(provider, selectors)
+    return list(found.items())
+
+
+def candidate_selectors(inferred: Iterable[str], limit: int) -> List[str]:
+    """Inferred selectors first, then the catalogue, `limit` names at most"""
+    return _unique(list(inferred) + ALL_SELECTORS)[:limit]
@@ -0,0 +1,225 @@
+"""
+Async DNS Engine
+Non-blocking DNS queries (dns.asyncresolver) shared by every DNS-based check.
+
+- Each query has its own timeout and never blocks the event loop.
+- Answers are cached in-process for their TTL (clamped to MIN_TTL..MAX_TTL);
+  NXDOMAIN / empty answers for the zone's negative TTL (SOA minimum, RFC 2308),
+  failures (SERVFAIL, timeout) briefly. The cache is an LRU bounded to MAX_ENTRIES.
+- Concurrent queries for the same name and type share one request, and the
+  number of queries on the wire at once is capped per event loop.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+
+class DNSAnswer:
+    """Outcome of one query: records as text (TXT strings joined), or why there are none"""
+
+    OK = "ok"
+    NXDOMAIN = "nxdomain"  # The name does not exist
+    NODATA = "nodata"  # The name exists, without records of this type
+    TIMEOUT = "timeout"
+    ERROR = "error"  # SERVFAIL, refused, no reachable nameserver...
+
+    __slots__ = ("name", "rdtype", "status", "records", "ttl")
+
+    def __init__(self, name: str, rdtype: str, status: str, records: Sequence[str] = (), ttl: int = 0):
+        self.name = name
+        self.rdtype = rdtype
+        self.status = status
+        self.records = list(records)
+        self.ttl = ttl
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.OK
+
+    def __repr__(self) -> str:
+        return f"DNSAnswer({self.name} {self.rdtype} {self.status} {self.records})"
+
+
+def _rdata_text(rdata) -> str:
+    strings = getattr(rdata, "strings", None)
+    if strings is not None:
+        # A TXT record may be split into several character-strings
+        return b"".join(strings).decode("utf-8", errors="replace")
+    return rdata.to_text()
+
+
+def _negative_ttl(response) -> Optional[int]:
+    """TTL of a negative answer: min(SOA TTL, SOA MINIMUM) from the authority section"""
+    if response is None:
+        return None
+    for rrset in response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+            return min(rrset.ttl, rrset[0].minimum)
+    return None
+
+
+class DNSEngine:
+    QUERY_TIMEOUT = 3.0  # Per query, retries included
+    MIN_TTL = 30
+    MAX_TTL = 3600
+    NEGATIVE_TTL = 300  # When the zone gives no SOA
+    FAILURE_TTL = 60
+    MAX_ENTRIES = 20000
+    MAX_CONCURRENCY = 64  # Queries on the wire at once, per event loop
+
+    _resolver: Optional[dns.asyncresolver.Resolver] = None
+    # (name, rdtype) -> (expires_at, answer)
+    _cache: "OrderedDict[Tuple[str, str], Tuple[float, DNSAnswer]]" = OrderedDict()
+    # loop -> {(name, rdtype): future}
+    _inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], asyncio.Future]]" = weakref.WeakKeyDictionary()
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+    stats: Dict[str, int] = {"queries": 0, "hits": 0, "coalesced": 0}
+
+    @classmethod
+    def configure(
+        cls,
+        nameservers: Optional[List[str]] = None,
+        port: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Override the system resolver settings (custom nameservers, scripts); clears the cache"""
+        resolver = dns.asyncresolver.Resolver()
+        if nameservers:
+            resolver.nameservers = nameservers
+        if port:
+            resolver.port = port
+        if timeout:
+            cls.QUERY_TIMEOUT = timeout
+        if max_concurrency:
+            cls.MAX_CONCURRENCY = max_concurrency
+            cls._semaphores = weakref.WeakKeyDictionary()
+        cls._resolver = resolver
+        cls.clear_cache()
+
+    @classmethod
+    def clear_cache(cls):
+        cls._cache.clear()
+
+    @classmethod
+    def _get_resolver(cls) -> dns.asyncresolver.Resolver:
+        if cls._resolver is None:
+            cls._resolver = dns.asyncresolver.Resolver()  # /etc/resolv.conf
+        return cls._resolver
+
+    @classmethod
+    def _semaphore(cls) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = cls._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = cls._semaphores[loop] = asyncio.Semaphore(cls.MAX_CONCURRENCY)
+        return semaphore
+
+    @classmethod
+    def cached(cls, name: str, rdtype: str = "A") -> Optional[DNSAnswer]:
+        key = (name.rstrip(".").lower(), rdtype.upper())
+        entry = cls._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del cls._cache[key]
+            return None
+        cls._cache.move_to_end(key)
+        return entry[1]
+
+    @classmethod
+    def _store(cls, answer: DNSAnswer):
+        if answer.ttl <= 0:
+            return
+        key = (answer.name, answer.rdtype)
+        cls._cache[key] = (time.monotonic() + answer.ttl, answer)
+        cls._cache.move_to_end(key)
+        while len(cls._cache) > cls.MAX_ENTRIES:
+            cls._cache.popitem(last=False)
+
+    @classmethod
+    async def query(cls, name: str, rdtype: str = "A") -> DNSAnswer:
+        """Cached answer, or one query shared by all concurrent callers; never raises DNS errors"""
+        name, rdtype = name.rstrip(".").lower(), rdtype.upper()
+        cached = cls.cached(name, rdtype)
+        if cached is not None:
+            cls.stats["hits"] += 1
+            return cached
+
+        key = (name, rdtype)
+        loop = asyncio.get_running_loop()
+        inflight = cls._inflight.setdefault(loop, {})
+        shared = inflight.get(key)
+        if shared is not None:
+            cls.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise  # This caller itself was cancelled
+                return await cls.query(name, rdtype)
+
+        future = loop.create_future()
+        inflight[key] = future
+        try:
+            async with cls._semaphore():
+                answer = await cls._resolve(name, rdtype)
+            cls._store(answer)
+            future.set_result(answer)
+            return answer
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved: no "exception never retrieved" when nobody shared it
+            raise
+        finally:
+            inflight.pop(key, None)
+
+    @classmethod
+    async def query_many(cls, queries: Iterable[Tuple[str, str]]) -> List[DNSAnswer]:
+        """Answers of (name, rdtype) queries issued concurrently, in the same order"""
+        return list(await asyncio.gather(*(cls.query(name, rdtype) for name, rdtype in queries)))
+
+    @classmethod
+    async def _resolve(cls, name: str, rdtype: str) -> DNSAnswer:
+        cls.stats["queries"] += 1
+        try:
+            result = await cls._get_resolver().resolve(
+                name, rdtype, lifetime=cls.QUERY_TIMEOUT, raise_on_no_answer=False, search=False
+            )
+        except dns.resolver.NXDOMAIN as e:
+            response = e.responses().get(e.qnames()[0]) if e.qnames() else None
+            ttl = _negative_ttl(response)
+            return DNSAnswer(name, rdtype, DNSAnswer.NXDOMAIN, ttl=cls._clamp(ttl, cls.NEGATIVE_TTL))
+        except dns.exception.Timeout:
+            return DNSAnswer(name, rdtype, DNSAnswer.TIMEOUT, ttl=cls.FAILURE_TTL)
+        except (dns.exception.DNSException, OSError) as e:
+            logger.debug(f"DNS query {name} {rdtype} failed: {e}")
+            return DNSAnswer(name, rdtype, DNSAnswer.ERROR, ttl=cls.FAILURE_TTL)
+
+        if result.rrset is None:
+            ttl = _negative_ttl(result.response)
+            return DNSAnswer(name, rdtype, DNSAnswer.NODATA, ttl=cls._clamp(ttl, cls.NEGATIVE_TTL))
+        return DNSAnswer(
+            name, rdtype, DNSAnswer.OK,
+            records=[_rdata_text(rdata) for rdata in result.rrset],
+            ttl=cls._clamp(result.rrset.ttl, cls.MIN_TTL),
+        )
+
+    @classmethod
+    def _clamp(cls, ttl: Optional[int], default: int) -> int:
+        if ttl is None:
+            return default
+        return max(cls.MIN_TTL, min(ttl, cls.MAX_TTL))
@@ -1,149 +1,228 @@
 """
 DNS & Email Deliverability Analyzer
-Checks SPF and DMARC records to evaluate email security.
+Checks SPF, DMARC, DKIM and MX records to evaluate email security.
+All lookups go through the async DNS engine: issued concurrently, cached, never blocking the loop.
 """
-import dns.resolver
+from typing import Optional
 from urllib.parse import urlparse
 from ..models.schemas import DNSHealthResult
+from .dns_engine import DNSAnswer, DNSEngine
+from .email_auth import DKIM_QUERY_BUDGET, SPF_LOOKUP_LIMIT, SPF_VOID_LOOKUP_LIMIT, SPFExpansion, expand_and_discover, providers, spf_records
+
+# Higher is worse
+_SPF_SEVERITY = {"missing": 3, "critical": 2, "warning": 1, "valid": 0}
 
 class DNSAnalyzer:
-    def __init__(self):
-        pass
+    # A record this close to the lookup limit breaks with the next include
+    SPF_LOOKUP_WARNING = 8
+    _FAILED = (DNSAnswer.TIMEOUT, DNSAnswer.ERROR)
+
+    def __init__(self, dkim_budget: int = DKIM_QUERY_BUDGET):
+        # Selector probes per domain (bulk audits trade catalogue depth for throughput)
+        self.dkim_budget = dkim_budget
 
     async def analyze(self, url: str) -> DNSHealthResult:
+        # Extract clean domain
+        # e.g. https://www.example.com/foo -> www.example.com
+        hostname = urlparse(url).netloc.split(':')[0]
+
+        # Simple heuristic: if www. probably check root domain for email compliance
+        # but keep hostname for IP check
+        email_domain = hostname
+        if email_domain.startswith("www.") and email_domain.count('.') == 2:
+            email_domain = email_domain[4:]
+
+        return await self.analyze_domain(email_domain, hostname)
+
+    async def analyze_domain(self, email_domain: str, hostname: Optional[str] = None) -> DNSHealthResult:
+        """Email checks of a bare domain; the server IP is looked up on hostname (default: the domain)"""
         result = DNSHealthResult()
-        
+
         try:
-            # Extract clean domain
-            # e.g. https://www.example.com/foo -> www.example.com
-            hostname = urlparse(url).netloc.split(':')[0]
-            
-            # Simple heuristic: if www. probably check root domain for email compliance
-            # but keep hostname for IP check
-            email_domain = hostname
-            if email_domain.startswith("www.") and email_domain.count('.') == 2:
-                email_domain = email_domain[4:]
-                
+            hostname = hostname or email_domain
             result.domain = email_domain
-            
-            # 1. Get Server IP (from hostname)
-            try:
-                answers = dns.resolver.resolve(hostname, 'A')
-                if answers:
-                     result.server_ip = answers[0].to_text()
-            except:
-                pass # Not critical
+
+            # Server IP (from hostname), SPF (TXT on the domain), DMARC (_dmarc.domain),
+            # the DKIM key tree (_domainkey.domain) and mail servers, all at once
+            a_answer, txt_answer, dmarc_answer, domainkey_answer, mx_answer = await DNSEngine.query_many([
+                (hostname, "A"), (email_domain, "TXT"), (f"_dmarc.{email_domain}", "TXT"),
+                (f"_domainkey.{email_domain}", "TXT"), (email_domain, "MX"),
+            ])
+
+            # 1. Get Server IP
+            if a_answer.ok and a_answer.records:
+                result.server_ip = a_answer.records[0]  # Not critical when missing
 
             # 2. SPF Check
-            try:
-                # SPF is a TXT record on the domain
-                spf_answers = dns.resolver.resolve(email_domain, 'TXT')
-                for rdata in spf_answers:
-                    txt = rdata.to_text().strip('"')
-                    # Handle multiple strings in one record
-                    if hasattr(rdata, 'strings'):
-                        txt = "".join([s.decode('utf-8') for s in rdata.strings])
-                    
-                    if "v=spf1" in txt:
-                        result.spf.present = True
-                        result.spf.record = txt
-                        
-                        if "-all" in txt:
-                            result.spf.status = "valid" # Strict Fail (Secure)
-                        elif "~all" in txt:
-                            result.spf.status = "warning" # Soft Fail (Common but less strict)
-                            result.spf.warnings.append("Politique ~all (SoftFail) détectée. '-all' est recommandé pour une sécurité maximale.")
-                        elif "+all" in txt:
-                             result.spf.status = "critical"
-                             result.spf.warnings.append("Politique +all DANGEREUSE : autorise n'importe qui à envoyer des emails en votre nom.")
-                        else:
-                             result.spf.status = "warning"
-                             result.spf.warnings.append("Pas de mécanisme de fin (-all ou ~all).")
-                        break
-                
-                if not result.spf.present:
-                    result.spf.status = "missing"
-                    result.spf.warnings.append("Enregistrement SPF introuvable.")
-            except:
-                result.spf.status = "missing"
-                result.spf.warnings.append("Enregistrement SPF introuvable (Erreur DNS).")
-            
+            self._check_spf(result, txt_answer)
+
             # 3. DMARC Check
-            try:
-                # DMARC is at _dmarc.domain.com
-                dmarc_answers = dns.resolver.resolve(f"_dmarc.{email_domain}", 'TXT')
-                for rdata in dmarc_answers:
-                     txt = rdata.to_text().strip('"')
-                     if hasattr(rdata, 'strings'):
-                        txt = "".join([s.decode('utf-8') for s in rdata.strings])
-
-                     if "v=DMARC1" in txt.upper() or "v=dmarc1" in txt:
-                         result.dmarc.present = True
-                         result.dmarc.record = txt
-                         
-                         if "p=reject" in txt:
-                             result.dmarc.policy = "reject"
-                             result.dmarc.status = "valid"
-                         elif "p=quarantine" in txt:
-                             result.dmarc.policy = "quarantine"
-                             result.dmarc.status = "valid"
-                         elif "p=none" in txt:
-                             result.dmarc.policy = "none"
-                             result.dmarc.status = "warning" # Observation only
-                         else:
-                             result.dmarc.policy = "unknown"
-                             result.dmarc.status = "warning"
-                         
-                         break
-                
-                if not result.dmarc.present:
-                     result.dmarc.status = "missing"
-            except:
-                 result.dmarc.status = "missing"
+            self._check_dmarc(result, dmarc_answer)
+
+            self._check_mx(result, mx_answer)
+            if txt_answer.status in self._FAILED and mx_answer.status in self._FAILED:
+                # Unreachable nameservers: "missing" records would be a false diagnosis
+                result.error = f"DNS lookups failed ({txt_answer.status})"
+
+            # SPF include chain, then DKIM selectors of the providers it names
+            expansion, discovery = await expand_and_discover(
+                email_domain, result.spf.record, domainkey=domainkey_answer, budget=self.dkim_budget
+            )
+            if expansion is not None:
+                self._check_spf_lookups(result, expansion)
 
             # 4. DKIM Check (Heuristic)
-            # DKIM requires knowing the "selector". We can't know it for sure, 
-            # but we can try common ones.
-            common_selectors = ["default", "google", "mail", "k1", "smtp", "sig1"]
-            result.dkim.selectors_checked = common_selectors
-            
-            for selector in common_selectors:
-                try:
-                    dkim_domain = f"{selector}._domainkey.{email_domain}"
-                    dns.resolver.resolve(dkim_domain, 'TXT')
-                    # If we find it, it exists!
-                    result.dkim.selectors_found.append(selector)
-                    result.dkim.present = True
-                except:
-                    pass
-            
+            # DKIM requires knowing the "selector". We can't know it for sure, but we can
+            # try the ones of the providers found in SPF, then hundreds of common ones.
+            result.dkim.providers = providers(result.spf.includes)
+            result.dkim.selectors_checked = discovery.checked
+            result.dkim.selectors_found = discovery.found
+            result.dkim.present = bool(discovery.found)
+
             if result.dkim.present:
                 result.dkim.status = "found"
                 result.dkim.note = f"Detected active DKIM selectors: {', '.join(result.dkim.selectors_found)}"
             else:
                 result.dkim.status = "missing" # likely just unknown selector
-                result.dkim.note = "No common DKIM selectors found. Please verify manually in your email provider settings."
-
-            # Scoring Logic
-            score = 100
-            
-            # SPF (Weight 50)
-            if result.spf.status == "missing": score -= 50
-            elif result.spf.status == "critical": score -= 50
-            elif result.spf.status == "warning": score -= 20 # ~all is okay but not perfect
-            
-            # DMARC (Weight 40)
-            if result.dmarc.status == "missing": score -= 40
-            elif result.dmarc.status == "warning": score -= 20 # p=none is weak
-            
-            # Bonus/Malus
-            # If both missing, score 10 max
-            if result.spf.status == "missing" and result.dmarc.status == "missing":
-                score = 0
-            
-            result.score = max(0, score)
+                result.dkim.note = (
+                    f"No DKIM key found among {len(discovery.checked)} known selectors. "
+                    "Please verify manually in your email provider settings."
+                )
+
+            result.score = self._score(result)
 
         except Exception as e:
             result.error = f"Analysis failed: {str(e)}"
-            
+
         return result
+
+    @staticmethod
+    def _check_spf(result: DNSHealthResult, answer: DNSAnswer):
+        # SPF is a TXT record on the domain
+        for txt in answer.records:
+            if "v=spf1" in txt:
+                result.spf.present = True
+                result.spf.record = txt
+
+                if "-all" in txt:
+                    result.spf.status = "valid" # Strict Fail (Secure)
+                elif "~all" in txt:
+                    result.spf.status = "warning" # Soft Fail (Common but less strict)
+                    result.spf.warnings.append("Politique ~all (SoftFail) détectée. '-all' est recommandé pour une sécurité maximale.")
+                elif "+all" in txt:
+                     result.spf.status = "critical"
+                     result.spf.warnings.append("Politique +all DANGEREUSE : autorise n'importe qui à envoyer des emails en votre nom.")
+                else:
+                     result.spf.status = "warning"
+                     result.spf.warnings.append("Pas de mécanisme de fin (-all ou ~all).")
+                break
+
+        if len(spf_records(answer)) > 1:
+            DNSAnalyzer._downgrade_spf(result, "critical")
+            result.spf.warnings.append("Plusieurs enregistrements SPF publiés : la vérification échoue (PermError), un seul est autorisé.")
+
+        if not result.spf.present:
+            result.spf.status = "missing"
+            if answer.status in (DNSAnswer.TIMEOUT, DNSAnswer.ERROR):
+                result.spf.warnings.append("Enregistrement SPF introuvable (Erreur DNS).")
+            else:
+                result.spf.warnings.append("Enregistrement SPF introuvable.")
+
+    def _check_spf_lookups(self, result: DNSHealthResult, expansion: SPFExpansion):
+        result.spf.dns_lookups = expansion.lookups
+        result.spf.includes = expansion.includes
+        if expansion.over_limit:
+            self._downgrade_spf(result, "critical")
+            result.spf.warnings.append(
+                f"Le SPF nécessite {expansion.lookups} requêtes DNS (limite : {SPF_LOOKUP_LIMIT}) : "
+                "les serveurs de réception renvoient une erreur (PermError) et le SPF est ignoré."
+            )
+        elif expansion.lookups >= self.SPF_LOOKUP_WARNING:
+            self._downgrade_spf(result, "warning")
+            result.spf.warnings.append(
+                f"Le SPF utilise {expansion.lookups}/{SPF_LOOKUP_LIMIT} requêtes DNS : "
+                "proche de la limite, un include de plus peut le rendre invalide."
+            )
+
+        for include in expansion.missing:
+            self._downgrade_spf(result, "critical")
+            result.spf.warnings.append(f"include:{include} ne publie aucun enregistrement SPF (PermError).")
+        if expansion.void_lookups > SPF_VOID_LOOKUP_LIMIT:
+            self._downgrade_spf(result, "warning")
+            result.spf.warnings.append(
+                f"{expansion.void_lookups} includes sans réponse DNS (limite : {SPF_VOID_LOOKUP_LIMIT}) : PermError possible."
+            )
+        if expansion.looped:
+            self._downgrade_spf(result, "critical")
+            result.spf.warnings.append("Boucle d'includes SPF : un domaine s'inclut lui-même (PermError).")
+        if expansion.truncated:
+            result.spf.warnings.append("Chaîne d'includes SPF trop longue : analyse interrompue.")
+
+    @staticmethod
+    def _downgrade_spf(result: DNSHealthResult, status: str):
+        if _SPF_SEVERITY.get(status, 0) > _SPF_SEVERITY.get(result.spf.status, 0):
+            result.spf.status = status
+
+    @staticmethod
+    def _check_dmarc(result: DNSHealthResult, answer: DNSAnswer):
+        # DMARC is at _dmarc.domain.com
+        for txt in answer.records:
+             if "V=DMARC1" in txt.upper():
+                 result.dmarc.present = True
+                 result.dmarc.record = txt
+
+                 if "p=reject" in txt:
+                     result.dmarc.policy = "reject"
+                     result.dmarc.status = "valid"
+                 elif "p=quarantine" in txt:
+                     result.dmarc.policy = "quarantine"
+                     result.dmarc.status = "valid"
+                 elif "p=none" in txt:
+                     result.dmarc.policy = "none"
+                     result.dmarc.status = "warning" # Observation only
+                 else:
+                     result.dmarc.policy = "unknown"
+                     result.dmarc.status = "warning"
+
+                 break
+
+        if not result.dmarc.present:
+             result.dmarc.status = "missing"
+
+    @staticmethod
+    def _check_mx(result: DNSHealthResult, answer: DNSAnswer):
+        # Records read "preference host."; a single "0 ." is a null MX (RFC 7505)
+        records = []
+        for record in answer.records:
+            preference, _, host = record.partition(" ")
+            records.append((int(preference) if preference.isdigit() else 0, host.rstrip(".") or "."))
+        records.sort()
+        result.mx.records = [f"{preference} {host}" for preference, host in records]
+        result.mx.present = bool(records)
+        if records == [(0, ".")]:
+            result.mx.status = "null"
+        elif records:
+            result.mx.status = "valid"
+        else:
+            result.mx.status = "missing"
+
+    @staticmethod
+    def _score(result: DNSHealthResult) -> int:
+        # Scoring Logic
+        score = 100
+
+        # SPF (Weight 50)
+        if result.spf.status == "missing": score -= 50
+        elif result.spf.status == "critical": score -= 50
+        elif result.spf.status == "warning": score -= 20 # ~all is okay but not perfect
+
+        # DMARC (Weight 40)
+        if result.dmarc.status == "missing": score -= 40
+        elif result.dmarc.status == "warning": score -= 20 # p=none is weak
+
+        # Bonus/Malus
+        # If both missing, score 10 max
+        if result.spf.status == "missing" and result.dmarc.status == "missing":
+            score = 0
+
+        return max(0, score)
@@ -0,0 +1,184 @@
+"""
+Email Authentication Lookups
+SPF include-chain expansion and DKIM selector discovery, on the async DNS engine.
+
+- expand_spf(): follows include:/redirect= level by level (each level's records
+  fetched concurrently), counting the DNS-querying terms against the RFC 7208
+  limit of 10 and the "void" lookups (no record) against the limit of 2.
+- discover_dkim(): probes the selectors inferred from SPF includes, then (if none
+  answers) a catalogue of several hundred, concurrently under a query budget.
+  An NXDOMAIN on _domainkey.<domain> means no selector exists below it (RFC 8020):
+  only the selectors inferred from SPF are then tried. Every NXDOMAIN is kept in
+  the engine cache for the zone's negative TTL, so re-scans of a domain and
+  bulk audits of domains sharing a provider cost nothing.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from .dkim_selectors import candidate_selectors, providers_for_includes
+from .dns_engine import DNSAnswer, DNSEngine
+
+SPF_LOOKUP_LIMIT = 10  # RFC 7208 4.6.4
+SPF_VOID_LOOKUP_LIMIT = 2
+# Terms that cost a DNS lookup
+_LOOKUP_MECHANISMS = {"include", "a", "mx", "ptr", "exists", "redirect"}
+_TERM_NAME = re.compile(r"^[+\-~?]?([a-z0-9\-]+)(?:[:/=](.*))?$", re.IGNORECASE)
+MAX_SPF_RECORDS = 40  # Expansion stops here whatever the chain (loops, runaway nesting)
+
+DKIM_QUERY_BUDGET = 300
+
+
+def spf_records(answer: DNSAnswer) -> List[str]:
+    return [record for record in answer.records if record.strip().lower().startswith("v=spf1")]
+
+
+class SPFExpansion:
+    __slots__ = ("lookups", "void_lookups", "includes", "missing", "truncated", "looped")
+
+    def __init__(self):
+        self.lookups = 0
+        self.void_lookups = 0
+        self.includes: List[str] = []  # Every include:/redirect= domain, breadth-first
+        self.missing: List[str] = []  # Included domains without an SPF record (PermError)
+        self.truncated = False
+        self.looped = False  # A domain includes itself, directly or not (PermError)
+
+    @property
+    def over_limit(self) -> bool:
+        return self.lookups > SPF_LOOKUP_LIMIT
+
+
+def _lookup_terms(record: str):
+    """(mechanism, target domain or None) of the terms costing a DNS lookup"""
+    for term in record.split()[1:]:
+        match = _TERM_NAME.match(term)
+        if not match:
+            continue
+        name = match.group(1).lower()
+        if name not in _LOOKUP_MECHANISMS:
+            continue
+        target = match.group(2) if name in ("include", "redirect") else None
+        if target and "%" not in target:
+            target = target.rstrip(".").lower()
+        else:
+            target = None  # a/mx/ptr/exists, or a macro only the receiver can expand
+        yield name, target
+
+
+async def expand_spf(domain: str, record: str) -> SPFExpansion:
+    """
+    Fetch every record of the include chain once, level by level, then count
+    lookups as a receiver evaluating it would: an included domain costs its
+    own lookups again each time it is included.
+    """
+    expansion = SPFExpansion()
+    domain = domain.rstrip(".").lower()
+    records: Dict[str, str] = {domain: record}
+    level = [record]
+    while level:
+        targets = []
+        for current in level:
+            for _, target in _lookup_terms(current):
+                if target and target not in records and target not in targets:
+                    targets.append(target)
+
+        if len(records) + len(targets) > MAX_SPF_RECORDS:
+            targets = targets[:max(0, MAX_SPF_RECORDS - len(records))]
+            expansion.truncated = True
+        expansion.includes.extend(targets)
+
+        answers = await DNSEngine.query_many([(target, "TXT") for target in targets])
+        level = []
+        for target, answer in zip(targets, answers):
+            found = spf_records(answer)
+            records[target] = found[0] if found else ""
+            if found:
+                level.append(found[0])
+            else:
+                expansion.missing.append(target)
+                if answer.status in (DNSAnswer.NXDOMAIN, DNSAnswer.NODATA):
+                    expansion.void_lookups += 1
+
+    counted: Dict[str, int] = {}
+
+    def count(name: str, path: Set[str]) -> int:
+        if name in path:
+            expansion.looped = True
+            return 0
+        if name not in counted:
+            total = 0
+            for _, target in _lookup_terms(records.get(name, "")):
+                total += 1 + (count(target, path | {name}) if target is not None else 0)
+            counted[name] = total
+        return counted[name]
+
+    expansion.lookups = count(domain, set())
+    return expansion
+
+
+class DKIMDiscovery:
+    __slots__ = ("found", "checked", "budget", "_checked")
+
+    def __init__(self, budget: int):
+        self.found: List[str] = []
+        self.checked: List[str] = []
+        self.budget = budget
+        self._checked: Set[str] = set()
+
+    async def probe(self, domain: str, selectors: Iterable[str]):
+        """Query not-yet-checked selectors concurrently, within the remaining budget"""
+        pending = [selector for selector in dict.fromkeys(selectors) if selector not in self._checked]
+        pending = pending[:max(0, self.budget - len(self.checked))]
+        if not pending:
+            return
+        self.checked.extend(pending)
+        self._checked.update(pending)
+        answers = await DNSEngine.query_many([(f"{selector}._domainkey.{domain}", "TXT") for selector in pending])
+        for selector, answer in zip(pending, answers):
+            # A DKIM key record carries p= (empty for a revoked key); anything else
+            # (wildcard TXT, verification tokens) is not a selector
+            if any("p=" in record for record in answer.records):
+                self.found.append(selector)
+
+
+async def discover_dkim(
+    domain: str, inferred: Iterable[str] = (), budget: int = DKIM_QUERY_BUDGET,
+    domainkey: Optional[DNSAnswer] = None
+) -> DKIMDiscovery:
+    """
+    Probe inferred selectors, then the catalogue unless one of them answered.
+    `domainkey` is the answer for _domainkey.<domain> when already fetched
+    alongside other queries.
+    """
+    discovery = DKIMDiscovery(budget)
+    inferred = list(inferred)
+    if domainkey is None:
+        domainkey = await DNSEngine.query(f"_domainkey.{domain}", "TXT")
+    await discovery.probe(domain, inferred)
+    # No catalogue when the key tree does not exist: inferred selectors were only
+    # cheap insurance against servers answering NXDOMAIN for empty non-terminals
+    if not discovery.found and domainkey.status != DNSAnswer.NXDOMAIN:
+        await discovery.probe(domain, candidate_selectors(inferred, budget))
+    return discovery
+
+
+def inferred_selectors(includes: Iterable[str]) -> List[str]:
+    return [selector for _, selectors in providers_for_includes(includes) for selector in selectors]
+
+
+def providers(includes: Iterable[str]) -> List[str]:
+    return [provider for provider, _ in providers_for_includes(includes)]
+
+
+async def expand_and_discover(
+    domain: str, spf_record: Optional[str], domainkey: Optional[DNSAnswer] = None, budget: int = DKIM_QUERY_BUDGET
+):
+    """
+    SPF expansion, then DKIM discovery guided by every provider found along the
+    include chain (a couple of round trips that usually spare the catalogue probe).
+    Returns (SPFExpansion or None, DKIMDiscovery).
+    """
+    expansion = await expand_spf(domain, spf_record) if spf_record else None
+    includes = expansion.includes if expansion else []
+    discovery = await discover_dkim(domain, inferred_selectors(includes), budget=budget, domainkey=domainkey)
+    return expansion, discovery
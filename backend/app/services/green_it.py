@@ -2,14 +2,14 @@
 Green IT / Eco-Index Analyzer Service
 Estimates CO2 impact based on resource weight.
 """
-import httpx
 import asyncio
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from typing import Set, Tuple, Optional
+from typing import Tuple, Optional
 
 from ..config import get_settings
+from ..core.executor import CPUExecutor
+from ..core.politeness import polite_client
 from ..models.schemas import GreenResult
+from .cpu_tasks import extract_resources
 
 class GreenITAnalyzer:
     def __init__(self):
@@ -22,7 +22,7 @@ class GreenITAnalyzer:
         result = GreenResult()
         
         try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=15.0, verify=False, headers=self.headers) as client:
+            async with polite_client(follow_redirects=True, timeout=15.0, verify=False, headers=self.headers) as client:
                 # 1. Fetch Main Page
                 try:
                     if html_content:
@@ -39,9 +39,8 @@ class GreenITAnalyzer:
                     result.error = f"Failed to fetch page: {str(e)}"
                     return result
 
-                # 2. Extract Resources
-                soup = BeautifulSoup(html, "html.parser")
-                resources = self._extract_resources(soup, url)
+                # 2. Extract Resources (parsed in the CPU pool)
+                resources = await CPUExecutor.run("parse", extract_resources, html, url)
                 
                 # 3. Get Sizes Concurrently
                 total_bytes = html_size
@@ -83,38 +82,6 @@ class GreenITAnalyzer:
             
         return result
 
-    def _extract_resources(self, soup, base_url) -> Set[str]:
-        urls = set()
-        
-        # Images
-        for img in soup.find_all("img", src=True):
-            src = img.get("src")
-            if src and not src.startswith("data:"):
-                urls.add(urljoin(base_url, src))
-                
-        # Scripts
-        for script in soup.find_all("script", src=True):
-            src = script.get("src")
-            if src:
-                urls.add(urljoin(base_url, src))
-                
-        # Styles
-        for link in soup.find_all("link", rel="stylesheet", href=True):
-            href = link.get("href")
-            if href:
-                urls.add(urljoin(base_url, href))
-                
-        # Media (Video/Audio)
-        for source in soup.find_all("source", src=True):
-            src = source.get("src")
-            if src:
-                urls.add(urljoin(base_url, src))
-                
-        # Iframe sources? usually other pages, but contribute to load.
-        # Often external, complicated. Let's stick to core assets.
-
-        return urls
-
     def _calculate_grade(self, co2: float) -> Tuple[str, int]:
         # A: < 0.5g
         # B: 0.5 - 1
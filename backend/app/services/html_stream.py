@@ -0,0 +1,195 @@
+"""
+Streaming HTML Link Extraction
+Pulls link targets out of an HTML response chunk by chunk (lxml pull parser)
+instead of building a full DOM, so memory stays flat on multi-megabyte pages.
+
+Collected: <a>/<area> href with anchor text and page zone (nav vs content),
+src of images/scripts/media/iframes, <link rel=canonical>, hreflang alternates
+and <base href>. Optionally, a SimHash signature of the main-content text
+(near-duplicate detection). Elements are discarded as soon as they are closed.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from .near_duplicates import SimHashBuilder
+
+logger = logging.getLogger(__name__)
+
+# Page regions whose links are navigation rather than content
+NAV_TAGS = {"nav", "header", "footer", "aside"}
+SRC_TAGS = {"img", "script", "source", "iframe", "video", "audio", "embed"}
+# Elements whose own text is not page content
+NON_TEXT_TAGS = {"script", "style", "noscript", "template", "title", "head"}
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+ANCHOR_TEXT_LIMIT = 100
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";", 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+class ExtractedLinks:
+    """Raw (unresolved) link values found in a page, in document order"""
+
+    __slots__ = ("anchors", "resources", "canonical", "hreflang", "base_href", "truncated", "unchanged", "simhash")
+
+    def __init__(self):
+        self.anchors: List[Tuple[str, str, str]] = []  # (href, anchor_text, zone: "nav" | "content")
+        self.resources: List[str] = []
+        self.canonical: Optional[str] = None
+        self.hreflang: Dict[str, str] = {}
+        self.base_href: Optional[str] = None
+        self.truncated = False  # Body cap reached before the end of the document
+        self.unchanged = False  # Same page as the previous scan (304 or identical content hash)
+        self.simhash: Optional[int] = None  # Content signature, when requested and the page has enough text
+
+    @property
+    def hrefs(self) -> List[str]:
+        return [href for href, _, _ in self.anchors]
+
+    def to_data(self) -> dict:
+        return {
+            "a": self.anchors,
+            "r": self.resources,
+            "c": self.canonical,
+            "h": self.hreflang,
+            "b": self.base_href,
+            "t": self.truncated,
+            "s": self.simhash,
+        }
+
+    @classmethod
+    def from_data(cls, data: dict) -> "ExtractedLinks":
+        links = cls()
+        links.anchors = [tuple(anchor) for anchor in data.get("a", [])]
+        links.resources = data.get("r", [])
+        links.canonical = data.get("c")
+        links.hreflang = data.get("h", {})
+        links.base_href = data.get("b")
+        links.truncated = data.get("t", False)
+        links.simhash = data.get("s")
+        return links
+
+
+class StreamingLinkExtractor:
+    """
+    Incremental extractor: feed() raw body chunks, then close() for the result.
+    """
+
+    def __init__(self, encoding: Optional[str] = None, signature: bool = False):
+        try:
+            self._parser = etree.HTMLPullParser(events=("start", "end"), encoding=encoding)
+        except LookupError:
+            # Unknown charset in Content-Type: let libxml2 sniff it
+            self._parser = etree.HTMLPullParser(events=("start", "end"))
+        self.result = ExtractedLinks()
+        self._nav_depth = 0
+        self._anchor_depth = 0
+        self._pending_anchor: Optional[str] = None
+        # Text outside navigation zones, folded into a SimHash as it streams by
+        self._text = SimHashBuilder() if signature else None
+
+    def feed(self, chunk: bytes):
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> ExtractedLinks:
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Truncated or empty documents: keep what was collected
+        self._drain()
+        if self._text is not None:
+            self.result.simhash = self._text.finish()
+        return self.result
+
+    def _drain(self):
+        for action, elem in self._parser.read_events():
+            tag = elem.tag
+            if not isinstance(tag, str):
+                continue  # Comments / processing instructions
+            if action == "start":
+                self._on_start(tag, elem)
+            else:
+                self._on_end(tag, elem)
+
+    def _on_start(self, tag: str, elem):
+        if self._text is not None:
+            self._text_before(elem)
+        if tag in NAV_TAGS:
+            self._nav_depth += 1
+        elif tag in ("a", "area"):
+            href = (elem.get("href") or "").strip()
+            if tag == "a":
+                self._anchor_depth += 1
+                self._pending_anchor = href or None
+            elif href:
+                self.result.anchors.append((href, elem.get("alt", "")[:ANCHOR_TEXT_LIMIT], self._zone()))
+        elif tag in SRC_TAGS:
+            src = (elem.get("src") or "").strip()
+            if src and not src.startswith("data:"):
+                self.result.resources.append(src)
+        elif tag == "link":
+            rel = (elem.get("rel") or "").lower().split()
+            href = (elem.get("href") or "").strip()
+            if href and "canonical" in rel and self.result.canonical is None:
+                self.result.canonical = href
+            elif href and "alternate" in rel and elem.get("hreflang"):
+                self.result.hreflang[elem.get("hreflang").strip().lower()] = href
+        elif tag == "base" and self.result.base_href is None:
+            self.result.base_href = (elem.get("href") or "").strip() or None
+
+    def _on_end(self, tag: str, elem):
+        if self._text is not None:
+            self._text_at_end(tag, elem)
+        if tag in NAV_TAGS:
+            self._nav_depth = max(0, self._nav_depth - 1)
+        elif tag == "a":
+            self._anchor_depth = max(0, self._anchor_depth - 1)
+            if self._pending_anchor:
+                text = " ".join("".join(elem.itertext()).split())[:ANCHOR_TEXT_LIMIT]
+                self.result.anchors.append((self._pending_anchor, text, self._zone()))
+            self._pending_anchor = None
+
+        if self._anchor_depth == 0:
+            # Drop the finished subtree and already-processed siblings
+            # (the tail is kept: it is text of the parent, read when the parent closes)
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+    # Text is read in document order, each node once, as soon as it is complete:
+    # a parent's leading text when its first child opens, a sibling's tail when
+    # the next sibling opens, the rest when the enclosing element closes.
+    def _text_before(self, elem):
+        previous = elem.getprevious()
+        if previous is not None:
+            self._add_text(previous.tail)
+            return
+        parent = elem.getparent()
+        if parent is not None and parent.tag not in NON_TEXT_TAGS:
+            self._add_text(parent.text)
+
+    def _text_at_end(self, tag: str, elem):
+        if len(elem):
+            self._add_text(elem[-1].tail)
+        elif tag not in NON_TEXT_TAGS:
+            self._add_text(elem.text)
+
+    def _add_text(self, text: Optional[str]):
+        if text and not self._nav_depth:
+            self._text.feed(text)
+
+    def _zone(self) -> str:
+        return "nav" if self._nav_depth else "content"
+
+
+def extract_links_from_html(html: str) -> ExtractedLinks:
+    """Whole-document convenience wrapper (already-downloaded or rendered HTML)"""
+    extractor = StreamingLinkExtractor(encoding="utf-8")
+    extractor.feed(html.encode("utf-8", errors="replace"))
+    return extractor.close()
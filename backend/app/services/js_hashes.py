@@ -0,0 +1,206 @@
+"""
+JavaScript Library Hash Identification
+Identifies bundled or renamed JS libraries by content hash (retire.js style).
+
+Script assets are streamed and hashed chunk by chunk (never buffered whole),
+then looked up in a local known-library hash index. Digests are cached per
+asset URL together with the ETag, so re-scans only send conditional requests.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..config import get_settings
+from ..core.cache import get_redis
+from ..core.executor import CPUExecutor
+from ..core.politeness import polite_client
+from .cpu_tasks import extract_script_sources
+
+logger = logging.getLogger(__name__)
+
+
+class JSHashIndex:
+    """Read side of the known-library hash index (SQLite, built by scripts/import_js_hashes.py)."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    @classmethod
+    def open(cls, path: str) -> Optional["JSHashIndex"]:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning(f"JS hash index at {path} could not be opened: {e}")
+            return None
+
+    def lookup(self, *digests: str) -> Optional[Dict[str, str]]:
+        for digest in digests:
+            if not digest:
+                continue
+            row = self._conn.execute(
+                "SELECT library, version FROM hashes WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row:
+                return {"library": row[0], "version": row[1]}
+        return None
+
+
+class JSHashIndexBuilder:
+    """Write side: accepts (digest, library, version) triples, SHA-1 or SHA-256 hex."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.building"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.execute("CREATE TABLE hashes (digest TEXT PRIMARY KEY, library TEXT, version TEXT)")
+        self.count = 0
+
+    def add(self, digest: str, library: str, version: str):
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO hashes VALUES (?, ?, ?)", (digest.lower(), library, version)
+        )
+        self.count += cursor.rowcount
+
+    def ingest_retire_repository(self, path: str):
+        """retire.js jsrepository.json: {library: {"extractors": {"hashes": {sha1: version}}}}"""
+        with open(path, "r", encoding="utf-8") as fh:
+            repository = json.load(fh)
+        for library, definition in repository.items():
+            for digest, version in definition.get("extractors", {}).get("hashes", {}).items():
+                self.add(digest, library, version)
+
+    def ingest_directory(self, root: str):
+        """Hash local library files laid out as <root>/<library>/<version>/**/*.js"""
+        for library in sorted(os.listdir(root)):
+            library_dir = os.path.join(root, library)
+            if not os.path.isdir(library_dir):
+                continue
+            for version in sorted(os.listdir(library_dir)):
+                for dirpath, _, filenames in os.walk(os.path.join(library_dir, version)):
+                    for filename in filenames:
+                        if filename.endswith(".js"):
+                            sha1, sha256 = hashlib.sha1(), hashlib.sha256()
+                            with open(os.path.join(dirpath, filename), "rb") as fh:
+                                for chunk in iter(lambda: fh.read(65536), b""):
+                                    sha1.update(chunk)
+                                    sha256.update(chunk)
+                            self.add(sha256.hexdigest(), library, version)
+                            self.add(sha1.hexdigest(), library, version)
+
+    def finalize(self) -> int:
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
+        return self.count
+
+
+class ScriptHashIdentifier:
+    """Fetches a page's script assets, hashes them and matches them against the index."""
+
+    MAX_SCRIPTS = 30
+    CONCURRENCY = 6
+    MAX_SCRIPT_BYTES = 5 * 1024 * 1024
+    CACHE_TTL = 7 * 86400
+    CACHE_PREFIX = "jshash:"
+
+    _index: Optional[JSHashIndex] = None
+    _index_checked: bool = False
+
+    def __init__(self):
+        self.settings = get_settings()
+
+    @classmethod
+    def get_index(cls) -> Optional[JSHashIndex]:
+        if not cls._index_checked:
+            cls._index_checked = True
+            cls._index = JSHashIndex.open(get_settings().js_hash_index_path)
+        return cls._index
+
+    async def identify(self, url: str, html: str) -> List[Dict[str, Any]]:
+        """
+        Returns one entry per identified asset:
+        {"library", "version", "url", "sha256"}
+        """
+        index = self.get_index()
+        if index is None:
+            return []
+
+        sources = await CPUExecutor.run("parse", extract_script_sources, html, url)
+        sources = sources[:self.MAX_SCRIPTS]
+        if not sources:
+            return []
+
+        sem = asyncio.Semaphore(self.CONCURRENCY)
+        async with polite_client(
+            timeout=self.settings.request_timeout,
+            follow_redirects=True,
+            verify=False,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; SiteAuditorBot/1.0)"}
+        ) as client:
+            async def hash_one(src: str) -> Optional[Dict[str, Any]]:
+                async with sem:
+                    digests = await self._digests(client, src)
+                if not digests:
+                    return None
+                match = index.lookup(digests["sha256"], digests["sha1"])
+                if not match:
+                    return None
+                return {**match, "url": src, "sha256": digests["sha256"]}
+
+            results = await asyncio.gather(*(hash_one(src) for src in sources), return_exceptions=True)
+
+        return [r for r in results if isinstance(r, dict)]
+
+    async def _digests(self, client: httpx.AsyncClient, src: str) -> Optional[Dict[str, str]]:
+        """SHA-1 + SHA-256 of an asset, revalidated by ETag against the cache."""
+        redis = get_redis()
+        cache_key = f"{self.CACHE_PREFIX}{src}"
+        cached = None
+        if redis is not None:
+            try:
+                raw = await redis.get(cache_key)
+                cached = json.loads(raw) if raw else None
+            except Exception:
+                redis = None  # Cache unavailable, hash without it
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        try:
+            async with client.stream("GET", src, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    return cached
+                if response.status_code >= 400:
+                    return None
+
+                sha1, sha256 = hashlib.sha1(), hashlib.sha256()
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self.MAX_SCRIPT_BYTES:
+                        return None
+                    sha1.update(chunk)
+                    sha256.update(chunk)
+                etag = response.headers.get("etag")
+        except httpx.HTTPError:
+            return cached
+
+        digests = {"sha1": sha1.hexdigest(), "sha256": sha256.hexdigest(), "etag": etag}
+        if redis is not None and etag:
+            try:
+                await redis.set(cache_key, json.dumps(digests), ex=self.CACHE_TTL)
+            except Exception:
+                pass
+        return digests
@@ -0,0 +1,378 @@
+"""
+Large-Site Crawl Service
+50k-500k page crawls that run as Celery jobs and survive worker restarts.
+
+All crawl state lives in Redis under `crawl:{crawl_id}:*`, so the worker's own
+memory stays flat whatever the site size:
+- frontier: FIFO list, popped with LMOVE into a processing list (reliable queue)
+- visited: Bloom filter on a Redis bitmap (~14 bits per URL at a 0.1% error rate)
+- stats / pages: counters and the crawled page log
+
+Resuming a crawl id moves the pages that were in flight back onto the frontier.
+"""
+import asyncio
+import hashlib
+import inspect
+import logging
+import math
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from ..core.cache import get_redis
+from ..core.politeness import polite_trace_config
+from .crawler import AsyncCrawler, ProgressCallback, invoke_callback
+from .robots import CRAWLER_USER_AGENT
+from .url_canon import url_key
+
+logger = logging.getLogger(__name__)
+
+# Keep crawl results around after completion so the page log can be browsed
+RESULT_TTL = 7 * 86400
+
+# Run lock: refreshed at every checkpoint, so it only outlives a dead worker briefly
+LOCK_TTL = 60
+
+
+class CrawlAlreadyRunning(Exception):
+    """Another worker holds this crawl (e.g. a broker redelivery of a long job)"""
+
+
+class RedisFrontier:
+    """FIFO frontier with a processing list: popped items are only dropped once acknowledged"""
+
+    def __init__(self, redis, crawl_id: str):
+        self.redis = redis
+        self.queue_key = f"crawl:{crawl_id}:frontier"
+        self.processing_key = f"crawl:{crawl_id}:processing"
+
+    @staticmethod
+    def _encode(url: str, depth: int) -> str:
+        return f"{depth}\t{url}"
+
+    @staticmethod
+    def _decode(raw) -> Tuple[str, int]:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        depth, url = raw.split("\t", 1)
+        return url, int(depth)
+
+    async def push(self, items: List[Tuple[str, int]]):
+        if items:
+            await self.redis.rpush(self.queue_key, *(self._encode(url, depth) for url, depth in items))
+
+    async def pop(self) -> Optional[Tuple[str, int]]:
+        raw = await self.redis.lmove(self.queue_key, self.processing_key, "LEFT", "RIGHT")
+        return self._decode(raw) if raw is not None else None
+
+    async def ack(self, url: str, depth: int):
+        await self.redis.lrem(self.processing_key, 1, self._encode(url, depth))
+
+    async def requeue_in_flight(self) -> int:
+        """Resume: pages popped by a worker that died go back to the head of the queue"""
+        moved = 0
+        while await self.redis.lmove(self.processing_key, self.queue_key, "RIGHT", "LEFT") is not None:
+            moved += 1
+        return moved
+
+    async def size(self) -> int:
+        return await self.redis.llen(self.queue_key)
+
+
+class RedisBloomVisited:
+    """
+    Bloom filter over a Redis bitmap.
+    URLs are reduced to a 128-bit BLAKE2 fingerprint; the k bit positions come from
+    double hashing its two 64-bit halves. Adding is atomic (Lua), so concurrent
+    workers never both claim the same URL.
+    """
+
+    _ADD_SCRIPT = """
+local added = 0
+for i = 1, #ARGV do
+    if redis.call('SETBIT', KEYS[1], ARGV[i], 1) == 0 then
+        added = 1
+    end
+end
+return added
+"""
+
+    def __init__(self, redis, crawl_id: str, capacity: int, error_rate: float = 0.001):
+        self.redis = redis
+        self.key = f"crawl:{crawl_id}:bloom"
+        capacity = max(capacity, 1000)
+        self.num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._add = redis.register_script(self._ADD_SCRIPT)
+
+    def _offsets(self, url: str) -> List[int]:
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    async def add(self, url: str) -> bool:
+        """True if the URL was not seen before (false positives skip ~error_rate of new URLs)"""
+        return bool(await self._add(keys=[self.key], args=self._offsets(url)))
+
+
+class LargeSiteCrawler(AsyncCrawler):
+    """AsyncCrawler with Redis-backed frontier/visited state, checkpointed and resumable by crawl id"""
+
+    CONCURRENCY = 20
+    PER_HOST_CONCURRENCY = 10
+    CHECKPOINT_INTERVAL = 10.0  # seconds
+    IDLE_POLL = 0.1
+    SEED_BATCH = 500
+    MAX_CRAWL_DELAY = 60.0  # Background jobs can afford to honour slow Crawl-delays
+
+    def __init__(
+        self,
+        crawl_id: str,
+        base_url: str,
+        max_pages: int = 50000,
+        max_depth: int = 10,
+        concurrency: int = CONCURRENCY,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        crawl_delay: float = 0.0,
+        on_progress: Optional[ProgressCallback] = None,
+        on_checkpoint: Optional[Callable[[Dict[str, int]], Any]] = None,
+    ):
+        super().__init__(
+            base_url,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            concurrency=concurrency,
+            per_host_concurrency=per_host_concurrency,
+            crawl_delay=crawl_delay,
+            on_progress=on_progress,
+        )
+        self.crawl_id = crawl_id
+        self.on_checkpoint = on_checkpoint
+        self.redis = get_redis()
+        if self.redis is None:
+            raise RuntimeError("Large-site crawls require Redis (REDIS_URL)")
+
+        self.frontier = RedisFrontier(self.redis, crawl_id)
+        self.visited_filter = RedisBloomVisited(self.redis, crawl_id, capacity=max_pages)
+        self.stats_key = f"crawl:{crawl_id}:stats"
+        self.pages_key = f"crawl:{crawl_id}:pages"
+        self.cancel_key = f"crawl:{crawl_id}:cancel"
+        self.lock_key = f"crawl:{crawl_id}:lock"
+        self.lock_token = uuid.uuid4().hex
+
+    @staticmethod
+    async def request_cancel(crawl_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.set(f"crawl:{crawl_id}:cancel", "1", ex=RESULT_TTL)
+
+    @staticmethod
+    async def clear_cancel(crawl_id: str):
+        redis = get_redis()
+        if redis is not None:
+            await redis.delete(f"crawl:{crawl_id}:cancel")
+
+    @staticmethod
+    async def read_pages(crawl_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Crawled page log: [{"url", "status", "depth"}] in crawl order"""
+        redis = get_redis()
+        if redis is None:
+            return []
+        rows = await redis.lrange(f"crawl:{crawl_id}:pages", offset, offset + limit - 1)
+        pages = []
+        for raw in rows:
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8")
+            status, depth, url = raw.split("\t", 2)
+            pages.append({"url": url, "status": int(status), "depth": int(depth)})
+        return pages
+
+    async def stats(self) -> Dict[str, int]:
+        raw = await self.redis.hgetall(self.stats_key)
+        stats = {
+            (k.decode() if isinstance(k, bytes) else k): int(v)
+            for k, v in raw.items()
+        }
+        stats.setdefault("pages_crawled", 0)
+        stats.setdefault("pages_discovered", 0)
+        stats.setdefault("error_pages", 0)
+        stats["queued"] = await self.frontier.size()
+        return stats
+
+    async def _prepare(self, session: aiohttp.ClientSession) -> bool:
+        """Seed a new crawl or requeue in-flight pages of an interrupted one. Returns True when resuming."""
+        resuming = not await self.redis.hsetnx(self.stats_key, "pages_discovered", 1)
+        if resuming:
+            moved = await self.frontier.requeue_in_flight()
+            logger.info(f"Resuming crawl {self.crawl_id}: {moved} in-flight pages requeued")
+        else:
+            await self.visited_filter.add(url_key(self.base_url))
+            await self.frontier.push([(self.base_url, 0)])
+
+        if not await self.redis.hget(self.stats_key, "seeded"):
+            # Also re-run after a crash mid-seeding: the visited filter drops repeats
+            batch: List[Tuple[str, int]] = []
+
+            async def add_seed(link: str) -> bool:
+                claimed = await self._claim(link)
+                if claimed is None:
+                    return False
+                if claimed:
+                    # Sitemap pages count as linked from the homepage
+                    batch.append((link, 1))
+                    if len(batch) >= self.SEED_BATCH:
+                        await self.frontier.push(batch)
+                        batch.clear()
+                return True
+
+            await self._seed_from_sitemaps(session, add_seed)
+            await self.frontier.push(batch)
+            await self.redis.hset(self.stats_key, "seeded", 1)
+        return resuming
+
+    def _allowed(self, url: str) -> bool:
+        # No per-URL bookkeeping of disallowed pages at this scale
+        return self.robots is None or self.robots.allowed(url)
+
+    async def _claim(self, link: str) -> Optional[bool]:
+        """True if the page is new and queued for crawl, False if known or disallowed, None once the cap is reached"""
+        if not self._allowed(link) or not await self.visited_filter.add(url_key(link)):
+            return False
+        # Claim a page slot atomically; over the cap the URL is dropped
+        if await self.redis.hincrby(self.stats_key, "pages_discovered", 1) > self.max_pages:
+            await self.redis.hincrby(self.stats_key, "pages_discovered", -1)
+            return None
+        return True
+
+    async def _crawl_page(self, session: aiohttp.ClientSession, url: str, depth: int):
+        if depth >= self.max_depth:
+            # Beyond max depth: known but not fetched (same as the scan crawler)
+            return
+
+        status, page = await self._fetch(session, url)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(self.stats_key, "pages_crawled", 1)
+        if status == 0 or status >= 400:
+            pipe.hincrby(self.stats_key, "error_pages", 1)
+        pipe.rpush(self.pages_key, f"{status}\t{depth}\t{url}")
+        await pipe.execute()
+
+        if not page:
+            return
+
+        candidates = set(self._page_links(page, url))
+
+        new_links = []
+        for link in candidates:
+            claimed = await self._claim(link)
+            if claimed is None:
+                break
+            if claimed:
+                new_links.append((link, depth + 1))
+        await self.frontier.push(new_links)
+
+    async def _checkpoint(self):
+        stats = await self.stats()
+        if self.on_checkpoint:
+            outcome = self.on_checkpoint(stats) if inspect.iscoroutinefunction(self.on_checkpoint) \
+                else asyncio.to_thread(self.on_checkpoint, stats)
+            await outcome
+        return stats
+
+    async def crawl(self) -> Dict[str, int]:
+        """
+        Runs (or resumes) the crawl until the frontier is exhausted, the page cap is
+        reached or a cancel is requested. Returns the final stats.
+        """
+        if not await self.redis.set(self.lock_key, self.lock_token, nx=True, ex=LOCK_TTL):
+            raise CrawlAlreadyRunning(self.crawl_id)
+        try:
+            return await self._run()
+        finally:
+            if await self.redis.get(self.lock_key) in (self.lock_token, self.lock_token.encode()):
+                await self.redis.delete(self.lock_key)
+
+    async def _run(self) -> Dict[str, int]:
+        in_flight = 0
+        stop = asyncio.Event()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_concurrency)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": CRAWLER_USER_AGENT},
+            trace_configs=[polite_trace_config()],
+        ) as session:
+            await self._load_robots(session)
+            await self._prepare(session)
+
+            async def worker():
+                nonlocal in_flight
+                while not stop.is_set():
+                    # Counted from before the pop so an idle worker never sees a
+                    # popped-but-unprocessed page as "nothing left to do"
+                    in_flight += 1
+                    item = None
+                    try:
+                        item = await self.frontier.pop()
+                        if item is not None:
+                            url, depth = item
+                            try:
+                                await self._crawl_page(session, url, depth)
+                                self.pages_crawled += 1
+                                await self._report(url, await self.frontier.size())
+                            except Exception as e:
+                                logger.warning(f"Crawl {self.crawl_id} failed on {url}: {e}")
+                            # Not acked when cancelled: the page stays in processing for resume
+                            await self.frontier.ack(url, depth)
+                    finally:
+                        in_flight -= 1
+
+                    if item is None:
+                        if in_flight == 0 and await self.frontier.size() == 0:
+                            # Nothing queued and nobody can add more: done
+                            stop.set()
+                            return
+                        await asyncio.sleep(self.IDLE_POLL)
+
+            async def checkpointer():
+                while not stop.is_set():
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.CHECKPOINT_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    try:
+                        await self.redis.expire(self.lock_key, LOCK_TTL)
+                        if await self.redis.exists(self.cancel_key):
+                            stop.set()
+                        await self._checkpoint()
+                    except Exception as e:
+                        logger.warning(f"Crawl {self.crawl_id} checkpoint failed: {e}")
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            monitor = asyncio.create_task(checkpointer())
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                stop.set()
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await monitor
+
+        stats = await self.stats()
+        if stats["queued"] == 0:
+            await self._finish()
+        return stats
+
+    async def _finish(self):
+        """Drop the frontier state, keep counters and the page log for a while"""
+        await self.redis.delete(self.frontier.queue_key, self.frontier.processing_key, self.visited_filter.key)
+        await self.redis.expire(self.stats_key, RESULT_TTL)
+        await self.redis.expire(self.pages_key, RESULT_TTL)
+
+    async def _report(self, url: str, queued: int):
+        if not self.on_progress:
+            return
+        await invoke_callback(self.on_progress, {"url": url, "pages_crawled": self.pages_crawled, "queued": queued, "max_pages": self.max_pages})
@@ -0,0 +1,189 @@
+"""
+Link Verdict Cache
+Shares broken-link check results across scans (social profiles, CDNs and image hosts
+are linked from almost every site an agency audits).
+
+Verdicts are stored in Redis by normalized URL with a TTL per outcome, and
+concurrent checks of the same URL share a single in-flight request: within a
+process through a shared future, across workers through a short Redis lock.
+
+HeadSupportCache remembers hosts that answer HEAD with 405/501, so their links
+are checked with a single ranged GET instead of HEAD followed by GET.
+"""
+import asyncio
+import json
+import logging
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Optional
+
+from ..core.cache import get_redis
+from .url_canon import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+Verdict = Dict[str, object]  # {"status_code": int, "error_type": Optional[str], "checked_at": float}
+
+
+class LinkVerdictCache:
+    PREFIX = "linkverdict:"
+    LOCK_PREFIX = "linkverdict:lock:"
+
+    # TTL per outcome (seconds)
+    TTL_OK = 24 * 3600
+    TTL_NOT_FOUND = 6 * 3600
+    TTL_TRANSIENT = 10 * 60
+    TTL_DNS_FAILURE = 3600  # Negative caching for unresolvable hosts
+
+    # Cross-worker in-flight sharing
+    LOCK_TTL = 20
+    LOCK_WAIT = 12.0
+    LOCK_POLL = 0.25
+
+    # loop -> {cache_key: future}
+    _inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """
+        Shared URL identity (case, ports, tracking params). Not url_key(): a
+        www. or trailing-slash variant can be broken while the other works.
+        """
+        return canonicalize_url(url) or url.strip()
+
+    @classmethod
+    def ttl_for(cls, verdict: Verdict) -> int:
+        error_type = verdict.get("error_type")
+        status_code = verdict.get("status_code") or 0
+        if error_type == "dns_error":
+            return cls.TTL_DNS_FAILURE
+        if error_type or status_code >= 500 or status_code == 429:
+            return cls.TTL_TRANSIENT
+        if status_code in (404, 410):
+            return cls.TTL_NOT_FOUND
+        return cls.TTL_OK
+
+    @classmethod
+    async def get(cls, url: str) -> Optional[Verdict]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(cls.PREFIX + cls.cache_key(url))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"Link cache read failed: {e}")
+            return None
+
+    @classmethod
+    async def set(cls, url: str, verdict: Verdict):
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(cls.PREFIX + cls.cache_key(url), json.dumps(verdict), ex=cls.ttl_for(verdict))
+        except Exception as e:
+            logger.debug(f"Link cache write failed: {e}")
+
+    @classmethod
+    async def resolve(cls, url: str, probe: Callable[[], Awaitable[Verdict]]) -> Verdict:
+        """
+        Cached verdict for `url`, or run `probe()` once for all concurrent callers.
+        If that check is abandoned (its scan was cancelled) or fails, the
+        callers waiting on it run their own instead of sharing its error.
+        """
+        cached = await cls.get(url)
+        if cached is not None:
+            return cached
+
+        key = cls.cache_key(url)
+        loop = asyncio.get_running_loop()
+        inflight = cls._inflight.setdefault(loop, {})
+        while key in inflight:
+            # Shielded: this caller being cancelled must not cancel the check for the others
+            verdict = await asyncio.shield(inflight[key])
+            if verdict is not None:
+                return verdict
+
+        future = loop.create_future()
+        inflight[key] = future
+        verdict = None
+        try:
+            verdict = await cls._resolve_across_workers(url, key, probe)
+            return verdict
+        finally:
+            # None (no exception) tells the waiters to check the link themselves
+            inflight.pop(key, None)
+            future.set_result(verdict)
+
+    @classmethod
+    async def _resolve_across_workers(cls, url: str, key: str, probe: Callable[[], Awaitable[Verdict]]) -> Verdict:
+        redis = get_redis()
+        lock_key = cls.LOCK_PREFIX + key
+        have_lock = False
+        if redis is not None:
+            try:
+                have_lock = bool(await redis.set(lock_key, "1", nx=True, ex=cls.LOCK_TTL))
+            except Exception:
+                redis = None
+
+        if redis is not None and not have_lock:
+            # Another worker is checking this URL: wait for its verdict
+            deadline = time.monotonic() + cls.LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(cls.LOCK_POLL)
+                cached = await cls.get(url)
+                if cached is not None:
+                    return cached
+
+        try:
+            verdict = await probe()
+            verdict.setdefault("checked_at", time.time())
+            await cls.set(url, verdict)
+            return verdict
+        finally:
+            if have_lock:
+                try:
+                    await redis.delete(lock_key)
+                except Exception:
+                    pass
+
+
+class HeadSupportCache:
+    """Per-host "HEAD unsupported" flag, learned from checks and shared through Redis"""
+
+    PREFIX = "linkhead:"
+    TTL = 7 * 24 * 3600
+    LOCAL_TTL = 600  # In-process answers, so hot hosts skip the Redis round trip
+
+    # host -> (expires_at, unsupported)
+    _local: Dict[str, tuple] = {}
+
+    @classmethod
+    async def unsupported(cls, host: str) -> bool:
+        host = host.lower()
+        cached = cls._local.get(host)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        flag = False
+        redis = get_redis()
+        if redis is not None:
+            try:
+                flag = bool(await redis.exists(cls.PREFIX + host))
+            except Exception as e:
+                logger.debug(f"HEAD support cache read failed: {e}")
+        cls._local[host] = (time.monotonic() + cls.LOCAL_TTL, flag)
+        return flag
+
+    @classmethod
+    async def mark_unsupported(cls, host: str):
+        host = host.lower()
+        cls._local[host] = (time.monotonic() + cls.TTL, True)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(cls.PREFIX + host, "1", ex=cls.TTL)
+        except Exception as e:
+            logger.debug(f"HEAD support cache write failed: {e}")
@@ -0,0 +1,147 @@
+"""
+Site Link Graph
+Compact outlink graph filled while crawling, so every link of every crawled page
+can be checked without refetching anything.
+
+URLs and anchor texts are interned to integer IDs (one per canonical URL: www.
+and trailing-slash variants are checked as distinct targets) and edges live in
+parallel typed arrays: a few bytes per link instead of a tuple of strings. The
+reverse (target -> sources) index is built on demand.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .url_canon import canonicalize_url
+
+
+class LinkGraph:
+    """Directed page -> target graph with anchor texts and crawl statuses"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}  # canonical URL -> node id
+        self.urls: List[str] = []  # node id -> URL (first spelling seen)
+        self._text_ids: Dict[str, int] = {"": 0}
+        self.texts: List[str] = [""]
+        # Edge i: _sources[i] --(texts[_anchors[i]])--> _targets[i]
+        self._sources = array("I")
+        self._targets = array("I")
+        self._anchors = array("I")
+        self._target_order = array("I")  # Unique targets, first-seen order
+        self._is_target = bytearray()
+        self._in_content = bytearray()  # 1 if some page links to the node from its main content
+        self._from_unchanged = bytearray()  # 1 if linked from a page unchanged since the previous scan
+        self.statuses: Dict[int, int] = {}  # Crawled nodes: id -> HTTP status (0 = unreachable)
+        self.pages = 0
+        self.unchanged_pages = 0
+        # CSR reverse index: edges of target t are _reverse[_offsets[t]:_offsets[t + 1]]
+        self._offsets: Optional[array] = None
+        self._reverse: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._targets)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return canonicalize_url(url) or url.strip()
+
+    def intern(self, url: str) -> int:
+        key = self._key(url)
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self.urls)
+            self.urls.append(url)
+            self._is_target.append(0)
+            self._in_content.append(0)
+            self._from_unchanged.append(0)
+        return node
+
+    def _intern_text(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self.texts)
+            self.texts.append(text)
+        return text_id
+
+    def add_page(
+        self, page_url: str, links: Iterable[Tuple[str, str, str]], status: int = 200, unchanged: bool = False
+    ):
+        """
+        Record a crawled page and its (url, anchor_text, zone) outlinks, zone being
+        "content" or "nav"; repeated targets keep their first anchor.
+        """
+        source = self.intern(page_url)
+        self.statuses[source] = status
+        self.pages += 1
+        if unchanged:
+            self.unchanged_pages += 1
+        seen = set()
+        for url, anchor_text, zone in links:
+            target = self.intern(url)
+            if zone == "content":
+                self._in_content[target] = 1
+            if unchanged:
+                self._from_unchanged[target] = 1
+            if target in seen or target == source:
+                continue
+            seen.add(target)
+            self._sources.append(source)
+            self._targets.append(target)
+            self._anchors.append(self._intern_text(anchor_text or ""))
+            if not self._is_target[target]:
+                self._is_target[target] = 1
+                self._target_order.append(target)
+        self._offsets = self._reverse = None
+
+    def record_status(self, url: str, status: int):
+        """Status of a URL fetched by the crawler without being parsed (non-HTML, error page)"""
+        self.statuses[self.intern(url)] = status
+
+    def targets(self) -> List[int]:
+        return list(self._target_order)
+
+    def node(self, url: str) -> Optional[int]:
+        return self._ids.get(self._key(url))
+
+    def linked_from_content(self, node: int) -> bool:
+        return bool(self._in_content[node])
+
+    def linked_from_unchanged(self, node: int) -> bool:
+        return bool(self._from_unchanged[node])
+
+    def status(self, node: int) -> Optional[int]:
+        return self.statuses.get(node)
+
+    def in_degree(self, node: int) -> int:
+        self._build_reverse()
+        return self._offsets[node + 1] - self._offsets[node]
+
+    def sources(self, node: int, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(page_url, anchor_text) of the pages linking to `node`, in crawl order"""
+        self._build_reverse()
+        start, end = self._offsets[node], self._offsets[node + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [
+            (self.urls[self._sources[edge]], self.texts[self._anchors[edge]])
+            for edge in self._reverse[start:end]
+        ]
+
+    def _build_reverse(self):
+        if self._offsets is not None:
+            return
+        # Counting sort of edge indices by target: O(nodes + edges), stable
+        offsets = array("I", bytes(4 * (len(self.urls) + 1)))
+        for target in self._targets:
+            offsets[target + 1] += 1
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+        cursor = array("I", offsets)
+        reverse = array("I", bytes(4 * len(self._targets)))
+        for edge, target in enumerate(self._targets):
+            reverse[cursor[target]] = edge
+            cursor[target] += 1
+        self._offsets, self._reverse = offsets, reverse
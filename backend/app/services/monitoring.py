@@ -6,6 +6,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlmodel import Session, select
 from ..database import engine
+from ..core.executor import CPUExecutor
 from ..models.monitor import Monitor
 from ..models.user import User
 from ..models.audit import Audit
@@ -95,7 +96,8 @@ async def check_monitors():
                 # Note: this is a heavy task, in production we might offload to Celery
                 # But for now we await it (APScheduler runs in event loop so it's non-blocking for other requests, 
                 # but might block other jobs if not careful. Analyzing URL takes time).
-                response, screenshot_bytes = await process_url(monitor.url)
+                # Incremental: pages unchanged since the last check are not re-crawled in full
+                response, screenshot_bytes = await process_url(monitor.url, incremental=True)
                 current_score = int(response.global_score) or 0
                 
                 # Logic: Compare Scores (Delta Check)
@@ -127,8 +129,8 @@ async def check_monitors():
                             diff_rel_path = f"static/screenshots/{monitor.user_id}/{site_hash}/{diff_filename}"
                             abs_diff = get_screenshot_path(diff_rel_path)
                             
-                            # Run comparison
-                            diff_result = compare_images(abs_old, abs_new, abs_diff)
+                            # Run comparison (CPU-bound, off the event loop)
+                            diff_result = await CPUExecutor.run("image_diff", compare_images, abs_old, abs_new, abs_diff)
                             
                             if diff_result.get("percentage", 0) > 5.0:
                                 logger.warning(f"🎨 Watchdog: Visual Regression Detected! ({diff_result['percentage']}%)")
@@ -0,0 +1,159 @@
+"""
+Near-Duplicate Content Detection
+64-bit SimHash signatures of page text, clustered with LSH banding.
+
+- SimHashBuilder: fed text incrementally (during the streaming parse), hashes
+  word 3-shingles and folds them into a 64-bit signature on finish().
+- NearDuplicateIndex: signatures are cut into `max_distance + 2` blocks; two
+  signatures within `max_distance` bits have at least two identical blocks
+  (pigeonhole), so one table per pair of blocks, keyed on those two blocks,
+  is guaranteed to put them in the same bucket. Only bucket mates are compared:
+  near-linear instead of the n^2 pairwise scan, with small buckets since keys
+  span two blocks. Matches are merged into clusters with a union-find.
+"""
+import hashlib
+import re
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+MIN_WORDS = 20  # Below this a page is too thin to say anything about its text
+_WORD = re.compile(r"\w+", re.UNICODE)
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+
+
+def _feature_hash(feature: str) -> int:
+    # Stable across processes (unlike hash()): signatures can be stored and compared later
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class SimHashBuilder:
+    """Incremental SimHash over word shingles of the text fed so far"""
+
+    __slots__ = ("_hashes", "_window", "words")
+
+    def __init__(self):
+        self._hashes: List[int] = []
+        self._window: List[str] = []
+        self.words = 0
+
+    def feed(self, text: str):
+        for word in _WORD.findall(text.lower()):
+            self.words += 1
+            self._window.append(word)
+            if len(self._window) > SHINGLE_SIZE:
+                del self._window[0]
+            if len(self._window) == SHINGLE_SIZE:
+                self._hashes.append(_feature_hash(" ".join(self._window)))
+
+    def finish(self) -> Optional[int]:
+        """Signature, or None for pages with too little text"""
+        if self.words < MIN_WORDS or not self._hashes:
+            return None
+        hashes = np.fromiter(self._hashes, dtype=np.uint64, count=len(self._hashes))
+        # Per bit: +1 for each shingle hash having it set, -1 otherwise
+        ones = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).sum(axis=0)
+        bits = (ones * 2 > len(hashes)).astype(np.uint64)
+        self._hashes = []
+        return int((bits << _BIT_POSITIONS).sum())
+
+
+def simhash(text: str) -> Optional[int]:
+    builder = SimHashBuilder()
+    builder.feed(text)
+    return builder.finish()
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        parent = self.parent.setdefault(item, item)
+        while parent != self.parent[parent]:
+            self.parent[parent] = self.parent[self.parent[parent]]
+            parent = self.parent[parent]
+        self.parent[item] = parent
+        return parent
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+class NearDuplicateIndex:
+    """Clusters of items whose SimHash signatures are within `max_distance` bits"""
+
+    # Items compared per bucket: a huge bucket (shared template text) must not
+    # degrade into a pairwise scan; cluster members are already linked transitively
+    MAX_BUCKET_SCAN = 64
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        blocks = max_distance + 2
+        block_bits = 64 // blocks
+        block_mask = (1 << block_bits) - 1
+        # (table number, mask selecting its two blocks)
+        self._tables = [
+            (number, (block_mask << (first * block_bits)) | (block_mask << (second * block_bits)))
+            for number, (first, second) in enumerate(combinations(range(blocks), 2))
+        ]
+        self._keys: List[Hashable] = []
+        self._positions: Dict[Hashable, int] = {}
+        self._signatures: List[int] = []
+        self._buckets = defaultdict(list)  # (table, masked signature) -> item indexes
+        self._groups = _UnionFind()
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, signature: int):
+        index = len(self._keys)
+        self._keys.append(key)
+        self._positions[key] = index
+        self._signatures.append(signature)
+        self._groups.find(index)
+
+        matched_roots = set()
+        for table, mask in self._tables:
+            bucket = self._buckets[(table, signature & mask)]
+            for other in bucket[-self.MAX_BUCKET_SCAN:]:
+                root = self._groups.find(other)
+                if root in matched_roots:
+                    continue
+                self.comparisons += 1
+                if hamming_distance(signature, self._signatures[other]) <= self.max_distance:
+                    self._groups.union(index, other)
+                    matched_roots.add(root)
+            bucket.append(index)
+
+    def add_many(self, items: Iterable[tuple]):
+        for key, signature in items:
+            self.add(key, signature)
+
+    def clusters(self, min_size: int = 2) -> List[List[Hashable]]:
+        """Groups of near-duplicate keys, largest first, keys in insertion order"""
+        groups = defaultdict(list)
+        for index in range(len(self._keys)):
+            groups[self._groups.find(index)].append(index)
+        clusters = [
+            [self._keys[index] for index in members]
+            for members in groups.values()
+            if len(members) >= min_size
+        ]
+        clusters.sort(key=len, reverse=True)
+        return clusters
+
+    def max_cluster_distance(self, keys: List[Hashable]) -> int:
+        """Largest distance from the first member, as a rough cluster tightness"""
+        signatures = [self._signatures[self._positions[key]] for key in keys]
+        return max(hamming_distance(signatures[0], other) for other in signatures[1:])
@@ -0,0 +1,151 @@
+"""
+Page Fingerprint Store
+Per-site memory of the previous scan, used by monitors to re-scan incrementally.
+
+For each crawled page: ETag, Last-Modified, content hash, status, the links it
+contained and its on-page SEO findings; for each checked link target: its last verdict. The next scan sends
+conditional requests with the validators and, for pages that did not change
+(304, or same content hash), reuses the stored links and findings instead of
+re-parsing, and working link targets instead of re-checking them.
+
+Everything lives in two Redis hashes per site, entries zlib-compressed JSON.
+"""
+import json
+import logging
+import time
+import zlib
+from typing import Dict, Optional
+
+from ..core.cache import get_redis
+from .html_stream import ExtractedLinks
+from .url_canon import canonicalize_url, url_key
+
+logger = logging.getLogger(__name__)
+
+
+class PageFingerprint:
+    __slots__ = ("etag", "last_modified", "content_hash", "status", "links", "seo")
+
+    def __init__(
+        self,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        status: int = 200,
+        links: Optional[ExtractedLinks] = None,
+        seo: Optional[dict] = None,
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.status = status
+        self.links = links
+        self.seo = seo  # cpu_tasks.audit_page() findings
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def dumps(self) -> bytes:
+        return zlib.compress(json.dumps({
+            "e": self.etag,
+            "m": self.last_modified,
+            "h": self.content_hash,
+            "s": self.status,
+            "l": self.links.to_data() if self.links else None,
+            "o": self.seo,
+        }, separators=(",", ":")).encode())
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "PageFingerprint":
+        data = json.loads(zlib.decompress(raw))
+        links = ExtractedLinks.from_data(data["l"]) if data.get("l") else None
+        return cls(data.get("e"), data.get("m"), data.get("h"), data.get("s", 200), links, data.get("o"))
+
+
+class PageFingerprintStore:
+    """Fingerprints and link verdicts of one site, loaded before and saved after a scan"""
+
+    PREFIX = "pagefp:"
+    TTL = 30 * 24 * 3600  # Refreshed by every scan: covers weekly/monthly monitors
+    VERDICT_MAX_AGE = 7 * 24 * 3600  # Older verdicts are checked again even for unchanged pages
+
+    def __init__(self, site_url: str):
+        self.pages_key = f"{self.PREFIX}{url_key(site_url)}"
+        self.links_key = f"{self.pages_key}:links"
+        self._pages: Dict[str, PageFingerprint] = {}
+        self._verdicts: Dict[str, dict] = {}
+        self._dirty_pages: Dict[str, PageFingerprint] = {}
+        self._dirty_verdicts: Dict[str, dict] = {}
+        self.loaded = False
+
+    async def load(self) -> bool:
+        """Read the previous scan's data; False if there is none (or no Redis)"""
+        redis = get_redis()
+        if redis is None:
+            return False
+        try:
+            pages = await redis.hgetall(self.pages_key)
+            verdicts = await redis.hgetall(self.links_key)
+        except Exception as e:
+            logger.debug(f"Fingerprint store read failed: {e}")
+            return False
+
+        for key, raw in pages.items():
+            try:
+                self._pages[key.decode()] = PageFingerprint.loads(raw)
+            except (ValueError, zlib.error):
+                continue  # Corrupt or older format: page is simply fetched in full
+        for key, raw in verdicts.items():
+            try:
+                self._verdicts[key.decode()] = json.loads(raw)
+            except ValueError:
+                continue
+        self.loaded = bool(self._pages)
+        return self.loaded
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        # Exact canonical URL: www. and trailing-slash variants are fetched and checked separately
+        return canonicalize_url(url) or url.strip()
+
+    def page(self, url: str) -> Optional[PageFingerprint]:
+        return self._pages.get(self._url_key(url))
+
+    def put_page(self, url: str, fingerprint: PageFingerprint):
+        key = self._url_key(url)
+        self._pages[key] = self._dirty_pages[key] = fingerprint
+
+    def verdict(self, url: str) -> Optional[dict]:
+        """Previous verdict of a link target if it is recent enough to reuse"""
+        verdict = self._verdicts.get(self._url_key(url))
+        if verdict and time.time() - verdict.get("checked_at", 0) < self.VERDICT_MAX_AGE:
+            return verdict
+        return None
+
+    def put_verdict(self, url: str, verdict: dict):
+        verdict = {**verdict, "checked_at": verdict.get("checked_at") or time.time()}
+        key = self._url_key(url)
+        self._verdicts[key] = self._dirty_verdicts[key] = verdict
+
+    async def save(self):
+        redis = get_redis()
+        if redis is None or not (self._dirty_pages or self._dirty_verdicts):
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            if self._dirty_pages:
+                pipe.hset(self.pages_key, mapping={key: fp.dumps() for key, fp in self._dirty_pages.items()})
+            if self._dirty_verdicts:
+                pipe.hset(self.links_key, mapping={key: json.dumps(v) for key, v in self._dirty_verdicts.items()})
+            pipe.expire(self.pages_key, self.TTL)
+            pipe.expire(self.links_key, self.TTL)
+            await pipe.execute()
+            self._dirty_pages.clear()
+            self._dirty_verdicts.clear()
+        except Exception as e:
+            logger.debug(f"Fingerprint store write failed: {e}")
@@ -0,0 +1,115 @@
+"""
+robots.txt Policy Cache
+Per-origin parsed robots.txt (Disallow, Crawl-delay, Sitemap entries) for the crawlers.
+
+Parsed policies are kept in-process for a while; the raw file is shared between
+workers through Redis so each origin is fetched at most once per TTL.
+Status handling follows RFC 9309: 4xx = no restrictions, 5xx / unreachable = full disallow.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from ..core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Product token matched against User-agent groups
+CRAWLER_AGENT = "SiteAuditorBot"
+CRAWLER_USER_AGENT = f"Mozilla/5.0 (compatible; {CRAWLER_AGENT}/1.0)"
+
+
+class RobotsPolicy:
+    """Answers allow/deny, crawl-delay and sitemap questions for one origin"""
+
+    def __init__(self, origin: str, status: int, body: str = ""):
+        self.origin = origin
+        self.status = status
+        self._parser = RobotFileParser(f"{origin}/robots.txt")
+        self._parser.parse(body.splitlines())
+        if 400 <= status < 500:
+            self._parser.allow_all = True
+        elif status == 0 or status >= 500:
+            self._parser.disallow_all = True
+
+    def allowed(self, url: str) -> bool:
+        return self._parser.can_fetch(CRAWLER_AGENT, url)
+
+    @property
+    def crawl_delay(self) -> Optional[float]:
+        delay = self._parser.crawl_delay(CRAWLER_AGENT)
+        return float(delay) if delay is not None else None
+
+    @property
+    def sitemaps(self) -> List[str]:
+        return self._parser.site_maps() or []
+
+
+class RobotsCache:
+    """Process-wide cache of RobotsPolicy by origin ("https://host[:port]")"""
+
+    TTL = 3600
+    ERROR_TTL = 600  # Unreachable robots.txt (full disallow) is retried sooner
+    MAX_BYTES = 512 * 1024  # RFC 9309: parse at least the first 500 KiB
+    PREFIX = "robots:"
+
+    _policies: Dict[str, Tuple[float, RobotsPolicy]] = {}
+
+    @classmethod
+    def _ttl(cls, status: int) -> int:
+        return cls.ERROR_TTL if status == 0 or status >= 500 else cls.TTL
+
+    @classmethod
+    async def get(cls, session: aiohttp.ClientSession, origin: str) -> RobotsPolicy:
+        cached = cls._policies.get(origin)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        status, body = await cls._load(session, origin)
+        policy = RobotsPolicy(origin, status, body)
+        cls._policies[origin] = (time.monotonic() + cls._ttl(status), policy)
+        return policy
+
+    @classmethod
+    async def _load(cls, session: aiohttp.ClientSession, origin: str) -> Tuple[int, str]:
+        redis = get_redis()
+        key = cls.PREFIX + origin
+        if redis is not None:
+            try:
+                raw = await redis.get(key)
+                if raw:
+                    data = json.loads(raw)
+                    return data["status"], data["body"]
+            except Exception as e:
+                logger.debug(f"robots.txt cache read failed: {e}")
+                redis = None
+
+        status, body = await cls._fetch(session, origin)
+        if redis is not None:
+            try:
+                await redis.set(key, json.dumps({"status": status, "body": body}), ex=cls._ttl(status))
+            except Exception:
+                pass
+        return status, body
+
+    @classmethod
+    async def _fetch(cls, session: aiohttp.ClientSession, origin: str) -> Tuple[int, str]:
+        try:
+            async with session.get(
+                f"{origin}/robots.txt",
+                timeout=aiohttp.ClientTimeout(total=10),
+                ssl=False,
+                headers={"User-Agent": CRAWLER_USER_AGENT},
+            ) as response:
+                if response.status != 200:
+                    return response.status, ""
+                body = await response.content.read(cls.MAX_BYTES)
+                return 200, body.decode("utf-8", errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.info(f"robots.txt unreachable for {origin}: {e}")
+            return 0, ""
@@ -0,0 +1,181 @@
+"""
+Shared Scan Cache
+Recent results of competitor scans, shared by every comparison: the market
+leaders of a sector are compared against by many customers, and a scan of
+the same site with the same options within the hour is not run again.
+
+Results are stored in Redis by normalized URL, language and feature set.
+Concurrent comparisons scanning the same competitor share a single scan:
+within a process through a shared future, across workers through a Redis
+lock whose holder publishes the result for the others.
+
+Customer targets are never served from here: their own site is always scanned live.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
+from typing import AsyncIterator, Callable, Dict, Optional, Sequence
+
+from ..core.cache import get_redis
+from ..models import AnalyzeResponse
+from .url_canon import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Starts a scan: an NDJSON event stream ending with a "complete" (or "error") event
+ScanStream = Callable[[], AsyncIterator[str]]
+
+
+def _event(data: Dict) -> str:
+    return json.dumps(data) + "\n"
+
+
+class SharedScanCache:
+    PREFIX = "scanresult:"
+    LOCK_PREFIX = "scanresult:lock:"
+
+    TTL = 3600
+
+    # Cross-worker sharing: a full scan can take a few minutes
+    LOCK_TTL = 300
+    LOCK_WAIT = 240.0
+    LOCK_POLL = 2.0
+
+    # loop -> {cache_key: future of the result (None when the scan failed)}
+    _inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+    stats: Dict[str, int] = {"scans": 0, "hits": 0, "shared": 0}
+
+    @staticmethod
+    def cache_key(url: str, lang: str, features: Sequence[str]) -> str:
+        # Exact canonical URL: www. and trailing-slash variants can be different sites/pages
+        options = hashlib.blake2b(",".join(sorted(features)).encode(), digest_size=6).hexdigest()
+        return f"{canonicalize_url(url) or url.strip()}|{lang}|{options}"
+
+    @classmethod
+    async def get(cls, key: str) -> Optional[AnalyzeResponse]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(cls.PREFIX + key)
+            return AnalyzeResponse.model_validate_json(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"Scan cache read failed: {e}")
+            return None
+
+    @classmethod
+    async def set(cls, key: str, response: AnalyzeResponse):
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(cls.PREFIX + key, response.model_dump_json(), ex=cls.TTL)
+        except Exception as e:
+            logger.debug(f"Scan cache write failed: {e}")
+
+    @classmethod
+    async def stream(cls, url: str, lang: str, features: Sequence[str], scan: ScanStream) -> AsyncIterator[str]:
+        """
+        Events of a scan of `url`: a recent shared result when there is one,
+        else the events of `scan()` (run once for all concurrent callers).
+        """
+        key = cls.cache_key(url, lang, features)
+        cached = await cls.get(key)
+        if cached is not None:
+            cls.stats["hits"] += 1
+            yield cls._reused(cached, "Recent result reused")
+            yield _event({"type": "complete", "data": cached.model_dump(mode="json")})
+            return
+
+        loop = asyncio.get_running_loop()
+        inflight = cls._inflight.setdefault(loop, {})
+        shared = inflight.get(key)
+        if shared is not None:
+            cls.stats["shared"] += 1
+            yield _event({"type": "log", "step": "init", "message": "Same site being scanned for another comparison, waiting for its result..."})
+            async for event in cls._shared_result(shared):
+                yield event
+            return
+
+        future = loop.create_future()
+        inflight[key] = future
+        result: Optional[AnalyzeResponse] = None
+        try:
+            owner = await cls._lock(key)
+            if not owner:
+                yield _event({"type": "log", "step": "init", "message": "Same site being scanned by another worker, waiting for its result..."})
+                result = await cls._wait_for_other_worker(key)
+                if result is not None:
+                    cls.stats["shared"] += 1
+                    yield cls._reused(result, "Result shared with another worker")
+                    yield _event({"type": "complete", "data": result.model_dump(mode="json")})
+                    return
+
+            cls.stats["scans"] += 1
+            try:
+                async for chunk in scan():
+                    if result is None and '"complete"' in chunk:
+                        data = json.loads(chunk)
+                        if data.get("type") == "complete":
+                            result = AnalyzeResponse(**data["data"])
+                            await cls.set(key, result)
+                    yield chunk
+            finally:
+                if owner:
+                    await cls._unlock(key)
+        finally:
+            inflight.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _reused(result: AnalyzeResponse, reason: str) -> str:
+        age = max(0, int((time.time() - result.analyzed_at.timestamp()) // 60))
+        return _event({"type": "log", "step": "init", "message": f"♻️ {reason} (analyzed {age} min ago)."})
+
+    @classmethod
+    async def _shared_result(cls, shared: asyncio.Future) -> AsyncIterator[str]:
+        result = await asyncio.shield(shared)
+        if result is None:
+            yield _event({"type": "error", "message": "The shared scan of this site did not complete."})
+            return
+        yield _event({"type": "complete", "data": result.model_dump(mode="json")})
+
+    @classmethod
+    async def _lock(cls, key: str) -> bool:
+        """True when this worker should run the scan (lock taken, or no Redis)"""
+        redis = get_redis()
+        if redis is None:
+            return True
+        try:
+            return bool(await redis.set(cls.LOCK_PREFIX + key, "1", nx=True, ex=cls.LOCK_TTL))
+        except Exception:
+            return True
+
+    @classmethod
+    async def _unlock(cls, key: str):
+        redis = get_redis()
+        try:
+            await redis.delete(cls.LOCK_PREFIX + key)
+        except Exception as e:
+            logger.debug(f"Scan cache unlock failed (it will expire): {e}")
+
+    @classmethod
+    async def _wait_for_other_worker(cls, key: str) -> Optional[AnalyzeResponse]:
+        """The other worker's result, or None once it gave up (lock released without result) or LOCK_WAIT passed"""
+        redis = get_redis()
+        deadline = time.monotonic() + cls.LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(cls.LOCK_POLL)
+            cached = await cls.get(key)
+            if cached is not None:
+                return cached
+            try:
+                if not await redis.exists(cls.LOCK_PREFIX + key):
+                    return await cls.get(key)
+            except Exception:
+                return None
+        return None
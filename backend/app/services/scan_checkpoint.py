@@ -0,0 +1,128 @@
+"""
+Scan Checkpoint
+Per-analyzer results of a background (Celery) scan, saved in Redis as each
+analyzer completes. A scan interrupted by a restart is re-enqueued (see
+TaskRecoveryService) and resumes with only the analyzers it is missing.
+
+A run lock, refreshed while the scan runs, makes the task idempotent: a
+broker redelivery (acks_late) or a re-enqueue of a scan that is still running
+elsewhere is dropped instead of running it twice.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from ..core.cache import get_redis
+from ..models import (
+    BrokenLinksResult,
+    DNSHealthResult,
+    GDPRResult,
+    GreenResult,
+    SecurityResult,
+    SEOResult,
+    SMOResult,
+    TechStackResult,
+)
+
+logger = logging.getLogger(__name__)
+
+# Internal analyzer name (as in process_url_stream) -> result model
+RESULT_TYPES = {
+    "seo": SEOResult,
+    "security": SecurityResult,
+    "tech": TechStackResult,
+    "links": BrokenLinksResult,
+    "gdpr": GDPRResult,
+    "smo": SMOResult,
+    "green": GreenResult,
+    "dns": DNSHealthResult,
+}
+
+
+class ScanAlreadyRunning(Exception):
+    """Another worker holds this scan (a broker redelivery, or a re-enqueue of a scan still running)"""
+
+
+class ScanCheckpoint:
+    PREFIX = "scancheckpoint:"
+
+    # Checkpoints of scans never resumed expire after a day
+    TTL = 86400
+    # Run lock: refreshed every HEARTBEAT seconds, so it only outlives a dead worker briefly
+    LOCK_TTL = 60
+    HEARTBEAT = 20
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.key = f"{self.PREFIX}{task_id}"
+        self.lock_key = f"{self.PREFIX}{task_id}:lock"
+        self.lock_token = uuid.uuid4().hex
+
+    async def save(self, name: str, data: Dict[str, Any]):
+        """Record one analyzer's result (best effort: a lost checkpoint only means a re-run)"""
+        redis = get_redis()
+        if redis is None or name not in RESULT_TYPES:
+            return
+        try:
+            await redis.hset(self.key, name, json.dumps(data))
+            await redis.expire(self.key, self.TTL)
+        except Exception as e:
+            logger.debug(f"Scan checkpoint save failed for {self.task_id}: {e}")
+
+    async def load(self) -> Dict[str, Any]:
+        """Results saved so far, by analyzer name, as result models (unreadable entries are dropped)"""
+        redis = get_redis()
+        if redis is None:
+            return {}
+        results = {}
+        for raw_name, raw in (await redis.hgetall(self.key)).items():
+            name = raw_name.decode() if isinstance(raw_name, bytes) else raw_name
+            result_cls = RESULT_TYPES.get(name)
+            if result_cls is None:
+                continue
+            try:
+                results[name] = result_cls(**json.loads(raw))
+            except Exception as e:
+                logger.warning(f"Scan checkpoint {self.task_id}: Dropping unreadable {name} result ({e})")
+        return results
+
+    async def clear(self):
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(self.key)
+        except Exception as e:
+            logger.debug(f"Scan checkpoint clear failed for {self.task_id}: {e}")
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        """Run lock for the scan's duration; raises ScanAlreadyRunning if another worker has it"""
+        redis = get_redis()
+        if redis is None:
+            yield
+            return
+        if not await redis.set(self.lock_key, self.lock_token, nx=True, ex=self.LOCK_TTL):
+            raise ScanAlreadyRunning(self.task_id)
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.HEARTBEAT)
+                try:
+                    await redis.expire(self.lock_key, self.LOCK_TTL)
+                except Exception as e:
+                    logger.debug(f"Scan lock refresh failed for {self.task_id}: {e}")
+
+        refresher = asyncio.create_task(heartbeat())
+        try:
+            yield
+        finally:
+            refresher.cancel()
+            try:
+                if await redis.get(self.lock_key) in (self.lock_token, self.lock_token.encode()):
+                    await redis.delete(self.lock_key)
+            except Exception as e:
+                logger.debug(f"Scan lock release failed for {self.task_id}: {e}")
@@ -0,0 +1,105 @@
+"""
+Scan Event Channel
+Live progress of background (Celery) scans: the worker publishes the scan's
+events (logs, per-analyzer results, completion) to a Redis channel per task,
+and keeps the last REPLAY of them in a list, so a client subscribing late or
+reconnecting gets what it missed before the live events.
+
+Events are numbered per task (`seq`): a subscriber skips live events it
+already got from the replay, and SSE clients resume from Last-Event-ID.
+"""
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Events that end a scan's stream
+TERMINAL_EVENTS = ("complete", "error")
+
+# Numbers the event, appends it to the capped replay list and publishes it, atomically
+_PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local message = '{"seq":' .. seq .. ',"event":' .. ARGV[1] .. '}'
+redis.call('RPUSH', KEYS[2], message)
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('PUBLISH', KEYS[3], message)
+return seq
+"""
+
+
+class ScanEventChannel:
+    PREFIX = "scanevents:"
+
+    REPLAY = 200
+    TTL = 3600
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.seq_key = f"{self.PREFIX}{task_id}:seq"
+        self.replay_key = f"{self.PREFIX}{task_id}:replay"
+        self.channel = f"{self.PREFIX}{task_id}"
+
+    async def publish(self, event: Dict[str, Any]) -> Optional[int]:
+        """Sequence number of the published event (None without Redis: progress is best effort)"""
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            return await redis.eval(
+                _PUBLISH_SCRIPT, 3, self.seq_key, self.replay_key, self.channel,
+                json.dumps(event), self.REPLAY, self.TTL
+            )
+        except Exception as e:
+            logger.debug(f"Scan event publish failed for {self.task_id}: {e}")
+            return None
+
+    async def subscribe(self, after: int = 0, idle: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Events numbered above `after` (the replay, then live ones) as
+        {"seq": n, "event": {...}}, until a terminal event. Yields None after
+        `idle` seconds without events, so the caller can send a keepalive or
+        check the task's stored status.
+        """
+        redis = get_redis()
+        pubsub = redis.pubsub()
+        # Subscribe before reading the replay: an event published in between is in both, never in neither
+        await pubsub.subscribe(self.channel)
+        try:
+            last = after
+            for raw in await redis.lrange(self.replay_key, 0, -1):
+                message = json.loads(raw)
+                if message["seq"] <= last:
+                    continue
+                last = message["seq"]
+                yield message
+                if message["event"].get("type") in TERMINAL_EVENTS:
+                    return
+
+            idle_since = time.monotonic()
+            while True:
+                received = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if received is None:
+                    if time.monotonic() - idle_since >= idle:
+                        idle_since = time.monotonic()
+                        yield None
+                    continue
+                message = json.loads(received["data"])
+                if message["seq"] <= last:
+                    continue
+                last = message["seq"]
+                idle_since = time.monotonic()
+                yield message
+                if message["event"].get("type") in TERMINAL_EVENTS:
+                    return
+        finally:
+            try:
+                await pubsub.unsubscribe(self.channel)
+                await pubsub.reset()
+            except Exception:
+                pass
@@ -6,7 +6,8 @@ import asyncio
 import time
 import json
 from datetime import datetime
-from typing import List, Optional, AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 import httpx
 import logging
 from .rendering import RenderingService
@@ -16,6 +17,8 @@ logger = logging.getLogger(__name__)
 from ..models import (
     AnalyzeResponse, 
     AuditStatus,
+    ComparisonResponse,
+    RankEntry,
     SEOResult,
     SecurityResult,
     TechStackResult,
@@ -34,8 +37,17 @@ from .gdpr import GDPRAnalyzer
 from .smo import SMOAnalyzer
 from .green_it import GreenITAnalyzer
 from .dns_health import DNSAnalyzer
+from .site_crawl import SiteCrawl
+from .scan_cache import SharedScanCache
+from ..core.politeness import polite_client
 
-async def process_url(url: str, lang: str = "en", allowed_features: List[str] = None) -> tuple[AnalyzeResponse, Optional[bytes]]:
+async def process_url(
+    url: str,
+    lang: str = "en",
+    allowed_features: List[str] = None,
+    incremental: bool = False,
+    mode: str = "full"
+) -> tuple[AnalyzeResponse, Optional[bytes]]:
     """
     Process a single URL (Wrapper around stream).
     Returns (Result, ScreenshotBytes)
@@ -43,7 +55,11 @@ async def process_url(url: str, lang: str = "en", allowed_features: List[str] =
     final_result = None
     screenshot_bytes = None
     
-    async for chunk in process_url_stream(url, lang, allowed_features):
+    if mode == "quick":
+        stream = process_quick_stream(url, lang, allowed_features)
+    else:
+        stream = process_url_stream(url, lang, allowed_features, incremental=incremental)
+    async for chunk in stream:
         try:
             data = json.loads(chunk)
             if data.get("type") == "complete":
@@ -60,11 +76,24 @@ async def process_url(url: str, lang: str = "en", allowed_features: List[str] =
     return final_result, screenshot_bytes
 
 
-async def process_url_stream(url: str, lang: str = "en", allowed_features: List[str] = None) -> AsyncGenerator[str, None]:
+async def process_url_stream(
+    url: str,
+    lang: str = "en",
+    allowed_features: List[str] = None,
+    incremental: bool = False,
+    precomputed: Optional[Dict[str, Any]] = None,
+    partial_results: bool = False
+) -> AsyncGenerator[str, None]:
     """
     Generator that streams analysis progress and final result.
     Yields JSON strings (NDJSON format).
+    `incremental` (re-scans of monitored sites) lets the crawl skip pages
+    unchanged since the previous scan. `precomputed` results (by analyzer
+    name, from a quick scan) are reused instead of running those analyzers.
+    With `partial_results`, each analyzer's result is also yielded as it
+    completes ("partial" events).
     """
+    precomputed = precomputed or {}
     start_time = time.time()
     
     # Default to all if not specified (backward compatibility/admin)
@@ -103,7 +132,7 @@ async def process_url_stream(url: str, lang: str = "en", allowed_features: List[
         yield json.dumps({"type": "log", "step": "network", "message": "Checking site accessibility..."}) + "\n"
         
         # Use a shared client for pre-flight to avoid overhead
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True, verify=False) as client:
+        async with polite_client(timeout=10.0, follow_redirects=True, verify=False) as client:
             try:
                  # Check if site is reachable
                  try:
@@ -162,29 +191,45 @@ async def process_url_stream(url: str, lang: str = "en", allowed_features: List[
         # 4. Prepare Parallel Tasks
         yield json.dumps({"type": "log", "step": "analysis", "message": "Running specialized scanners..."}) + "\n"
         
+        # Single fan-in queue: analyzer results and crawl progress arrive in completion order
+        events: asyncio.Queue = asyncio.Queue()
+
         async def run_wrapper(name, coro):
             try:
                 res = await coro
-                return name, res
             except Exception as e:
-                return name, e
+                res = e
+            await events.put(("result", name, res))
+
+        def crawl_progress(progress: dict):
+            events.put_nowait(("progress", "links", progress))
 
         tasks = []
+
+        # One crawl feeds the broken-links check, the duplicate-content check and the on-page audit
+        site_crawl = None
+        if "links_scan" in allowed_features or "seo_scan" in allowed_features:
+            site_crawl = SiteCrawl(
+                url, on_progress=crawl_progress, incremental=incremental,
+                audit_pages="seo_scan" in allowed_features
+            )
         
         for feature_key, analyzer_cls, internal_name in potential_analyzers:
+            if internal_name in precomputed:
+                continue
             if feature_key in allowed_features:
                 # Lazy Instantiation here!
                 analyzer = analyzer_cls()
                 
                 coro = None
                 if internal_name == "seo":
-                    coro = analyzer.analyze(url, lang, html_content=rendered_html)
+                    coro = analyzer.analyze(url, lang, html_content=rendered_html, site_crawl=site_crawl)
                 elif internal_name == "security":
                     coro = analyzer.analyze(url)
                 elif internal_name == "tech":
                     coro = analyzer.analyze(url, html_content=rendered_html, headers=headers)
                 elif internal_name == "links":
-                    coro = analyzer.analyze(url, html_content=rendered_html)
+                    coro = analyzer.analyze(url, html_content=rendered_html, site_crawl=site_crawl)
                 elif internal_name == "gdpr":
                     coro = analyzer.analyze(url)
                 elif internal_name == "smo":
@@ -200,20 +245,43 @@ async def process_url_stream(url: str, lang: str = "en", allowed_features: List[
                  yield json.dumps({"type": "log", "step": internal_name, "message": f"⏭️ {internal_name.upper()} skipped (Plan limit)."}) + "\n"
 
         
-        results_map = {}
+        results_map = dict(precomputed)
         
         # 5. Run and yield as completed
         if tasks:
-            for future in asyncio.as_completed(tasks):
-                 name, result = await future
-                 results_map[name] = result
-                 
-                 # Yield progress log
-                 clean_name = name.upper() if len(name) < 4 else name.title()
-                 if isinstance(result, Exception):
-                     yield json.dumps({"type": "log", "step": name, "message": f"❌ {clean_name} failed."}) + "\n"
-                 else:
-                     yield json.dumps({"type": "log", "step": name, "message": f"✅ {clean_name} completed."}) + "\n"
+            running = [asyncio.create_task(t) for t in tasks]
+            remaining = len(running)
+            try:
+                while remaining:
+                    kind, name, payload = await events.get()
+
+                    if kind == "progress":
+                        yield json.dumps({
+                            "type": "progress",
+                            "step": name,
+                            "message": f"Crawled {payload['pages_crawled']} pages ({payload['pages_discovered']}/{payload['max_pages']} discovered)",
+                            "data": payload
+                        }) + "\n"
+                        continue
+
+                    remaining -= 1
+                    results_map[name] = payload
+
+                    # Yield progress log
+                    clean_name = name.upper() if len(name) < 4 else name.title()
+                    if isinstance(payload, Exception):
+                        yield json.dumps({"type": "log", "step": name, "message": f"❌ {clean_name} failed."}) + "\n"
+                    else:
+                        yield json.dumps({"type": "log", "step": name, "message": f"✅ {clean_name} completed."}) + "\n"
+                        if partial_results:
+                            yield json.dumps({"type": "partial", "step": name, "data": payload.model_dump(mode='json')}) + "\n"
+            finally:
+                # Client went away mid-stream: don't leave analyzers running
+                for task in running:
+                    if not task.done():
+                        task.cancel()
+                if site_crawl is not None:
+                    site_crawl.cancel()
         else:
              yield json.dumps({"type": "log", "step": "analysis", "message": "No scanners selected."}) + "\n"
 
@@ -278,6 +346,173 @@ async def process_url_stream(url: str, lang: str = "en", allowed_features: List[
         raise e
 
 
+# Quick scans: one static fetch shared by the cheap checks, each bounded at 1.5s:
+# about two seconds on a responsive site, three at most
+QUICK_FETCH_TIMEOUT = 1.5
+QUICK_ANALYZER_BUDGET = 1.5
+# DKIM selectors probed by the quick DNS check: the inferred ones and a few common ones
+QUICK_DKIM_BUDGET = 20
+# Not measured by a quick scan: left out of its provisional score
+QUICK_PENDING_CATEGORIES = ("gdpr", "green_it")
+
+
+async def process_quick_stream(
+    url: str,
+    lang: str = "en",
+    allowed_features: List[str] = None,
+    upgrade: bool = False
+) -> AsyncGenerator[str, None]:
+    """
+    Quick scan: the page is fetched once (no browser, no PageSpeed, no crawl)
+    and shared by the cheap checks: security headers and TLS, DNS, meta tags
+    and Open Graph tags. Yields the result with a provisional global score.
+
+    With `upgrade`, that result is yielded as a "provisional" event and the
+    full scan follows in the same stream (reusing the social results),
+    ending with its "complete" event.
+    """
+    start_time = time.time()
+    if allowed_features is None:
+        allowed_features = ["basic_scan", "seo_scan", "tech_scan", "links_scan", "smo_scan", "dns_scan", "security_scan", "gdpr_scan", "green_scan", "deep_scan"]
+
+    yield json.dumps({"type": "log", "step": "init", "message": f"Starting quick analysis for {url}..."}) + "\n"
+
+    try:
+        async with polite_client(
+            timeout=QUICK_FETCH_TIMEOUT, follow_redirects=True, verify=False,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; SiteAuditorBot/1.0)"}
+        ) as client:
+            response = await client.get(url)
+        html = response.text
+        headers = dict(response.headers)
+    except Exception as e:
+        logger.error(f"Quick scan fetch failed for {url}: {e}")
+        yield json.dumps({"type": "error", "message": f"Could not connect to {url}. The site may not exist or is unreachable."}) + "\n"
+        return
+
+    yield json.dumps({"type": "log", "step": "network", "message": f"Page fetched ({response.status_code})."}) + "\n"
+
+    quick_analyzers = [
+        ("seo_scan", "seo", lambda: SEOAnalyzer().analyze_static(url, html)),
+        ("security_scan", "security", lambda: SecurityAnalyzer().analyze_quick(url, headers)),
+        ("dns_scan", "dns", lambda: DNSAnalyzer(dkim_budget=QUICK_DKIM_BUDGET).analyze(url)),
+        ("smo_scan", "smo", lambda: SMOAnalyzer().analyze(url, html_content=html)),
+    ]
+    running = {
+        asyncio.create_task(start()): name
+        for feature_key, name, start in quick_analyzers if feature_key in allowed_features
+    }
+
+    results_map: Dict[str, Any] = {}
+    errors = []
+    if running:
+        done, pending = await asyncio.wait(running, timeout=QUICK_ANALYZER_BUDGET)
+        for task in pending:
+            task.cancel()
+            errors.append(f"{running[task].upper()} did not finish within the quick scan budget")
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            name = running[task]
+            try:
+                results_map[name] = task.result()
+            except Exception as e:
+                errors.append(f"{name.upper()} analysis failed: {str(e)}")
+        for name in sorted(results_map):
+            clean_name = name.upper() if len(name) < 4 else name.title()
+            yield json.dumps({"type": "log", "step": name, "message": f"✅ {clean_name} completed."}) + "\n"
+
+    def get_res(key, default_cls):
+        res = results_map.get(key)
+        return res if res is not None else default_cls(error="Not part of the quick scan")
+
+    quick_response = AnalyzeResponse(
+        url=url,
+        analyzed_at=datetime.utcnow(),
+        status=AuditStatus.COMPLETED,
+        seo=get_res("seo", SEOResult),
+        security=get_res("security", SecurityResult),
+        tech_stack=TechStackResult(error="Not part of the quick scan"),
+        broken_links=BrokenLinksResult(error="Not part of the quick scan"),
+        gdpr=GDPRResult(error="Not part of the quick scan"),
+        smo=get_res("smo", SMOResult),
+        green_it=GreenResult(error="Not part of the quick scan"),
+        dns_health=get_res("dns", DNSHealthResult),
+        scan_duration_seconds=round(time.time() - start_time, 2),
+        scan_mode="quick",
+        errors=errors
+    )
+    quick_response.calculate_global_score(pending=QUICK_PENDING_CATEGORIES)
+
+    yield json.dumps({
+        "type": "provisional" if upgrade else "complete",
+        "data": quick_response.model_dump(mode='json')
+    }) + "\n"
+    if not upgrade:
+        return
+
+    # Upgrade: the full scan, without repeating the checks that don't depend on browser rendering
+    # (DNS is run again: the quick one probed only QUICK_DKIM_BUDGET DKIM selectors)
+    precomputed = {}
+    if "smo" in results_map and "deep_scan" not in allowed_features:
+        precomputed["smo"] = results_map["smo"]
+    yield json.dumps({"type": "log", "step": "init", "message": "Provisional score sent, running the full analysis..."}) + "\n"
+    async for chunk in process_url_stream(url, lang, allowed_features, precomputed=precomputed):
+        yield chunk
+
+
+async def merge_streams(
+    streams: Sequence[AsyncIterator[str]],
+    concurrency: Optional[int] = None
+) -> AsyncGenerator[Tuple[int, Optional[Dict[str, Any]]], None]:
+    """
+    Events of several NDJSON scan streams, as they arrive, through one fan-in queue.
+    Yields (stream index, event); event None marks the end of that stream.
+    At most `concurrency` streams run at once (the others start as slots free up).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(concurrency or len(streams) or 1)
+
+    async def pump(index: int, stream: AsyncIterator[str]):
+        error_sent = False
+        try:
+            async with semaphore:
+                async for chunk in stream:
+                    try:
+                        event = json.loads(chunk)
+                    except ValueError:
+                        continue
+                    error_sent = error_sent or event.get("type") == "error"
+                    await queue.put((index, event))
+        except Exception as e:
+            # process_url_stream reports its failure as an event before raising it
+            if not error_sent:
+                await queue.put((index, {"type": "error", "message": str(e)}))
+        finally:
+            await queue.put((index, None))
+
+    pumps = [asyncio.create_task(pump(index, stream)) for index, stream in enumerate(streams)]
+    try:
+        running = len(pumps)
+        while running:
+            index, event = await queue.get()
+            if event is None:
+                running -= 1
+            yield index, event
+    finally:
+        for task in pumps:
+            task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+
+
+def competitor_stream(url: str, lang: str = "en", allowed_features: List[str] = None) -> AsyncIterator[str]:
+    """Scan of a competitor site: a recent result shared between comparisons when there is one"""
+    return SharedScanCache.stream(
+        url, lang, allowed_features or [],
+        lambda: process_url_stream(url, lang, allowed_features)
+    )
+
+
 async def process_battle_stream(
     url: str, 
     competitor_url: str, 
@@ -288,96 +523,28 @@ async def process_battle_stream(
     Stream battle mode analysis (Target vs Competitor).
     Runs two streams concurrently and merges logs.
     """
-    import asyncio
-    
-    # queues to hold chunks from each stream
-    q_target = asyncio.Queue()
-    q_competitor = asyncio.Queue()
-    
-    async def consume_stream(stream, queue, label):
-        try:
-            async for chunk in stream:
-                await queue.put((label, chunk))
-        except Exception as e:
-            await queue.put((label, json.dumps({"type": "error", "message": str(e)}) + "\n"))
-        finally:
-            await queue.put(None) # Sentinel
+    labels = ("Target", "Competitor")
+    results: List[Optional[AnalyzeResponse]] = [None, None]
 
-    # Start producers
-    stream_target = process_url_stream(url, lang, allowed_features)
-    stream_competitor = process_url_stream(competitor_url, lang, allowed_features)
-    
-    t1 = asyncio.create_task(consume_stream(stream_target, q_target, "Target"))
-    t2 = asyncio.create_task(consume_stream(stream_competitor, q_competitor, "Competitor"))
-    
-    target_done = False
-    competitor_done = False
-    
-    target_result = None
-    competitor_result = None
-    
     yield json.dumps({"type": "log", "step": "init", "message": "⚔️ Starting Battle Mode..."}) + "\n"
 
-    while not (target_done and competitor_done):
-        # We want to yield logs as they come in.
-        # We'll race getting from both queues.
-        
-        get_t = asyncio.create_task(q_target.get()) if not target_done else None
-        get_c = asyncio.create_task(q_competitor.get()) if not competitor_done else None
-        
-        wait_list = [t for t in [get_t, get_c] if t is not None]
-        
-        if not wait_list:
-            break
-            
-        done, pending = await asyncio.wait(wait_list, return_when=asyncio.FIRST_COMPLETED)
-        
-        for task in done:
-            if task == get_t:
-                res = task.result()
-                if res is None:
-                    target_done = True
-                else:
-                    label, chunk = res
-                    # Parse chunk to verify type
-                    try:
-                        data = json.loads(chunk)
-                        if data["type"] == "log":
-                            # Prefix log message
-                            data["message"] = f"[{label}] {data['message']}"
-                            yield json.dumps(data) + "\n"
-                        elif data["type"] == "complete":
-                            target_result = AnalyzeResponse(**data["data"])
-                        elif data["type"] == "error":
-                            yield chunk # Propagate error
-                    except:
-                        pass # Ignore parse errors
-            
-            elif task == get_c:
-                res = task.result()
-                if res is None:
-                    competitor_done = True
-                else:
-                    label, chunk = res
-                    try:
-                        data = json.loads(chunk)
-                        if data["type"] == "log":
-                            data["message"] = f"[{label}] {data['message']}"
-                            yield json.dumps(data) + "\n"
-                        elif data["type"] == "complete":
-                            competitor_result = AnalyzeResponse(**data["data"])
-                        elif data["type"] == "error":
-                            yield chunk
-                    except:
-                        pass
-
-        # clean up pending? actually we should probably cancel them or re-use them
-        # but for simplicity in this loop we just cancel and re-create next iteration
-        # This is slightly inefficient but safe. 
-        # Better: keep the pending tasks for next iteration.
-        for task in pending:
-            task.cancel()
-    
+    streams = [
+        process_url_stream(url, lang, allowed_features),
+        competitor_stream(competitor_url, lang, allowed_features),
+    ]
+    async for index, event in merge_streams(streams):
+        if event is None:
+            continue
+        if event["type"] == "log":
+            event["message"] = f"[{labels[index]}] {event['message']}"
+            yield json.dumps(event) + "\n"
+        elif event["type"] == "complete":
+            results[index] = AnalyzeResponse(**event["data"])
+        elif event["type"] == "error":
+            yield json.dumps(event) + "\n"
+
+    target_result, competitor_result = results
+
     # Both done. Compare results.
     if target_result and competitor_result:
         yield json.dumps({"type": "log", "step": "finalize", "message": "🏆 Calculating winner..."}) + "\n"
@@ -401,3 +568,85 @@ async def process_battle_stream(
         }) + "\n"
     else:
         yield json.dumps({"type": "error", "message": "Battle failed: One or both scans did not complete."}) + "\n"
+
+
+# Competitors per comparison, and scans of one comparison running at once
+MAX_COMPETITORS = 10
+COMPARISON_CONCURRENCY = 4
+
+
+def rank_sites(responses: Sequence[AnalyzeResponse]) -> Tuple[Dict[str, List[RankEntry]], List[Dict[str, int]]]:
+    """
+    Per category, the sites with a score, best first (tied scores share a rank: 1, 2, 2, 4).
+    Also returns each site's rank per category, in the order of `responses`.
+    """
+    all_scores = [response.category_scores() for response in responses]
+    rankings: Dict[str, List[RankEntry]] = {}
+    ranks: List[Dict[str, int]] = [{} for _ in responses]
+    for category in all_scores[0] if all_scores else ():
+        scored = sorted(
+            ((scores[category], index) for index, scores in enumerate(all_scores) if scores[category] is not None),
+            key=lambda item: -item[0]
+        )
+        entries = []
+        for position, (score, index) in enumerate(scored):
+            rank = entries[-1].rank if entries and entries[-1].score == score else position + 1
+            entries.append(RankEntry(url=responses[index].url, score=score, rank=rank))
+            ranks[index][category] = rank
+        rankings[category] = entries
+    return rankings, ranks
+
+
+async def process_comparison_stream(
+    url: str,
+    competitor_urls: List[str],
+    lang: str = "en",
+    allowed_features: List[str] = None
+) -> AsyncGenerator[str, None]:
+    """
+    Stream a comparison of the target with up to MAX_COMPETITORS competitors.
+    All scans share one fan-in queue (log and progress events carry the "site"
+    index: 0 is the target); competitor results are shared between comparisons.
+    Rankings are computed once every scan is over.
+    """
+    sites = [url] + list(competitor_urls)
+    labels = ["Target"] + [urlparse(site).netloc or site for site in competitor_urls]
+    results: List[Optional[AnalyzeResponse]] = [None] * len(sites)
+
+    yield json.dumps({
+        "type": "log", "step": "init",
+        "message": f"📊 Comparing {url} with {len(competitor_urls)} competitors..."
+    }) + "\n"
+
+    streams = [process_url_stream(url, lang, allowed_features)] + [
+        competitor_stream(site, lang, allowed_features) for site in competitor_urls
+    ]
+    async for index, event in merge_streams(streams, concurrency=COMPARISON_CONCURRENCY):
+        if event is None:
+            continue
+        if event["type"] in ("log", "error"):
+            event["message"] = f"[{labels[index]}] {event['message']}"
+            event["site"] = index
+            yield json.dumps(event) + "\n"
+        elif event["type"] == "progress":
+            event["site"] = index
+            yield json.dumps(event) + "\n"
+        elif event["type"] == "complete":
+            results[index] = AnalyzeResponse(**event["data"])
+
+    target = results[0]
+    if target is None:
+        yield json.dumps({"type": "error", "message": "Comparison failed: the target scan did not complete."}) + "\n"
+        return
+
+    yield json.dumps({"type": "log", "step": "finalize", "message": "🏆 Ranking sites..."}) + "\n"
+    completed = [result for result in results if result is not None]
+    rankings, ranks = rank_sites(completed)
+    comparison = ComparisonResponse(
+        target=target,
+        competitors=completed[1:],
+        failed=[site for site, result in zip(sites[1:], results[1:]) if result is None],
+        rankings=rankings,
+        target_ranks=ranks[0],
+    )
+    yield json.dumps({"type": "complete", "data": comparison.model_dump(mode='json')}) + "\n"
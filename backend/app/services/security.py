@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urlparse
 from OpenSSL import crypto
 from ..config import get_settings
+from ..core.politeness import polite_client
 from ..models import (
     SecurityResult, SecurityHeader, SSLInfo, ExposedFile,
     SeverityLevel
@@ -174,12 +175,28 @@ class SecurityAnalyzer:
         
         return result
     
+    async def analyze_quick(self, url: str, response_headers: Dict[str, str]) -> SecurityResult:
+        """
+        Headers of an already fetched page and TLS only, without probing for
+        exposed files (quick scans)
+        """
+        result = SecurityResult()
+        
+        try:
+            result.headers = self._evaluate_headers(response_headers)
+            result.ssl = await self._check_ssl(urlparse(url).netloc)
+            result.score = self._calculate_score(result)
+        except Exception as e:
+            result.error = f"Security analysis error: {str(e)}"
+        
+        return result
+    
     async def _check_headers(self, url: str) -> List[SecurityHeader]:
         """Check security headers"""
         headers_result = []
         
         try:
-            async with httpx.AsyncClient(
+            async with polite_client(
                 timeout=self.settings.request_timeout,
                 follow_redirects=True,
                 verify=False  # We'll check SSL separately
@@ -192,43 +209,7 @@ class SecurityAnalyzer:
                     response = await client.get(url)
                     response_headers = dict(response.headers)
                 
-                # Check each security header
-                for header_name, header_info in self.SECURITY_HEADERS.items():
-                    header_value = None
-                    present = False
-                    
-                    # Case-insensitive header lookup
-                    for key, value in response_headers.items():
-                        if key.lower() == header_name.lower():
-                            header_value = value
-                            present = True
-                            break
-                    
-                    severity = SeverityLevel.OK if present else header_info["severity_missing"]
-                    
-                    headers_result.append(SecurityHeader(
-                        name=header_name,
-                        value=header_value,
-                        present=present,
-                        severity=severity,
-                        description=header_info["description"],
-                        recommendation=None if present else header_info["recommendation"]
-                    ))
-                
-                # Check for information disclosure headers
-                info_disclosure_headers = ["Server", "X-Powered-By", "X-AspNet-Version"]
-                for header_name in info_disclosure_headers:
-                    for key, value in response_headers.items():
-                        if key.lower() == header_name.lower():
-                            headers_result.append(SecurityHeader(
-                                name=header_name,
-                                value=value,
-                                present=True,
-                                severity=SeverityLevel.LOW,
-                                description=f"Information disclosure: {header_name} header reveals server info",
-                                recommendation=f"Consider removing or obscuring the {header_name} header"
-                            ))
-                            break
+                headers_result = self._evaluate_headers(response_headers)
                 
         except httpx.TimeoutException:
             pass  # Headers check failed, but we continue
@@ -237,6 +218,50 @@ class SecurityAnalyzer:
         
         return headers_result
     
+    def _evaluate_headers(self, response_headers: Dict[str, str]) -> List[SecurityHeader]:
+        """Security headers and information disclosure of a response's headers"""
+        headers_result = []
+        
+        # Check each security header
+        for header_name, header_info in self.SECURITY_HEADERS.items():
+            header_value = None
+            present = False
+            
+            # Case-insensitive header lookup
+            for key, value in response_headers.items():
+                if key.lower() == header_name.lower():
+                    header_value = value
+                    present = True
+                    break
+            
+            severity = SeverityLevel.OK if present else header_info["severity_missing"]
+            
+            headers_result.append(SecurityHeader(
+                name=header_name,
+                value=header_value,
+                present=present,
+                severity=severity,
+                description=header_info["description"],
+                recommendation=None if present else header_info["recommendation"]
+            ))
+        
+        # Check for information disclosure headers
+        info_disclosure_headers = ["Server", "X-Powered-By", "X-AspNet-Version"]
+        for header_name in info_disclosure_headers:
+            for key, value in response_headers.items():
+                if key.lower() == header_name.lower():
+                    headers_result.append(SecurityHeader(
+                        name=header_name,
+                        value=value,
+                        present=True,
+                        severity=SeverityLevel.LOW,
+                        description=f"Information disclosure: {header_name} header reveals server info",
+                        recommendation=f"Consider removing or obscuring the {header_name} header"
+                    ))
+                    break
+        
+        return headers_result
+    
     async def _check_ssl(self, hostname: str) -> SSLInfo:
         """Check SSL/TLS certificate"""
         ssl_info = SSLInfo()
@@ -331,7 +356,7 @@ class SecurityAnalyzer:
         """Check for exposed sensitive files"""
         exposed = []
         
-        async with httpx.AsyncClient(
+        async with polite_client(
             timeout=10.0,
             follow_redirects=False,
             verify=False
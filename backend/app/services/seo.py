@@ -2,12 +2,16 @@
 SEO & Performance Analysis Service
 Uses Google PageSpeed Insights API (Lighthouse)
 """
+import asyncio
 import httpx
 import logging
-import asyncio
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from ..config import get_settings
-from ..models import SEOResult, CoreWebVitals, LighthouseScores
+from ..core.executor import CPUExecutor
+from ..core.politeness import polite_client
+from ..models import SEOResult, CoreWebVitals, LighthouseScores, DuplicateCluster
+from .near_duplicates import NearDuplicateIndex
+from .site_crawl import SiteCrawl
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,23 +21,95 @@ class SEOAnalyzer:
     """Analyzes SEO and performance using Google PageSpeed Insights"""
     
     PAGESPEED_API_URL = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+
+    # Duplicate content: SimHash distance (bits) still counted as the same text
+    DUPLICATE_MAX_DISTANCE = 6
+    MAX_CLUSTERS = 20
+    MAX_CLUSTER_PAGES = 20
     
     def __init__(self):
         self.settings = get_settings()
         self.api_key = self.settings.google_pagespeed_api_key
     
-    async def analyze(self, url: str, lang: str = "en", html_content: Optional[str] = None) -> SEOResult:
+    async def analyze(
+        self,
+        url: str,
+        lang: str = "en",
+        html_content: Optional[str] = None,
+        site_crawl: Optional[SiteCrawl] = None
+    ) -> SEOResult:
         """
         Run PageSpeed Insights analysis on the given URL, with local fallback.
+        With a site crawl, crawled pages are also checked for duplicate content
+        and, when the crawl audits pages, for the on-page checks site-wide.
         
         Args:
             url: The URL to analyze
             lang: Language code for results (en, fr)
             html_content: Optional pre-rendered HTML (Deep Scan) for fallback analysis
+            site_crawl: Optional crawl shared with the other analyzers
             
         Returns:
             SEOResult with Lighthouse scores or local fallback
         """
+        if site_crawl is None:
+            return await self._analyze_page(url, lang, html_content)
+
+        result, crawl = await asyncio.gather(
+            self._analyze_page(url, lang, html_content), site_crawl.run(), return_exceptions=True
+        )
+        if isinstance(result, BaseException):
+            raise result
+        if isinstance(crawl, BaseException):
+            logger.warning(f"Site crawl failed, no duplicate content check: {crawl}")
+            return result
+
+        clusters, compared = self._duplicate_clusters(site_crawl)
+        result.duplicate_clusters = clusters
+        result.pages_compared = compared
+        if site_crawl.audit is not None:
+            result.site_audit = await site_crawl.audit.finish()
+            if site_crawl.fingerprints:
+                await site_crawl.fingerprints.save()
+        return result
+
+    async def analyze_static(self, url: str, html_content: str) -> SEOResult:
+        """
+        Local analysis of already fetched HTML, without PageSpeed (quick scans).
+        Accessibility and best practices need Lighthouse: they are left unset.
+        """
+        result = await CPUExecutor.run("seo", SEOAnalyzer._local_analyze, html_content, url)
+        if result.error:
+            return result
+        result.scores.accessibility = None
+        result.scores.best_practices = None
+        result.diagnostics = [{
+            "id": "quick-scan",
+            "title": "Quick Scan",
+            "description": "Scores are estimated from the page HTML. Lighthouse results come with the full scan.",
+            "score": 0.5
+        }]
+        return result
+
+    def _duplicate_clusters(self, site_crawl: SiteCrawl) -> Tuple[List[DuplicateCluster], int]:
+        """Near-duplicate groups among crawled pages, from the SimHash computed while crawling"""
+        index = NearDuplicateIndex(self.DUPLICATE_MAX_DISTANCE)
+        for page_url, status, page in site_crawl.pages:
+            if page is not None and page.simhash is not None and status == 200:
+                index.add(page_url, page.simhash)
+
+        clusters = [
+            DuplicateCluster(
+                pages=members[:self.MAX_CLUSTER_PAGES],
+                size=len(members),
+                max_distance=index.max_cluster_distance(members)
+            )
+            for members in index.clusters()[:self.MAX_CLUSTERS]
+        ]
+        return clusters, len(index)
+
+    async def _analyze_page(self, url: str, lang: str, html_content: Optional[str]) -> SEOResult:
+        """PageSpeed Insights, or the local analysis when the API is unavailable"""
         logger.info(f"📊 Starting SEO analysis for: {url} (lang: {lang})")
         
         # Check API key status
@@ -74,7 +150,7 @@ class SEOAnalyzer:
         if not target_html:
             logger.info("⚠️ No Deep Scan HTML available. Attempting simple fetch for local fallback...")
             try:
-                async with httpx.AsyncClient(timeout=15.0, follow_redirects=True, verify=False, headers={"User-Agent": "Mozilla/5.0 (compatible; SiteAuditorBot/1.0)"}) as client:
+                async with polite_client(timeout=15.0, follow_redirects=True, verify=False, headers={"User-Agent": "Mozilla/5.0 (compatible; SiteAuditorBot/1.0)"}) as client:
                     resp = await client.get(url)
                     if resp.status_code == 200:
                         target_html = resp.text
@@ -83,13 +159,13 @@ class SEOAnalyzer:
 
         if target_html:
             logger.info("⚡ Executing Local SEO Analysis")
-            loop = asyncio.get_running_loop()
-            return await loop.run_in_executor(None, self._local_analyze, target_html, url)
+            return await CPUExecutor.run("seo", SEOAnalyzer._local_analyze, target_html, url)
             
         return SEOResult(error="PageSpeed API failed and all local fetch attempts failed.")
 
-    def _local_analyze(self, html: str, url: str) -> SEOResult:
-        """Perform basic SEO analysis locally using BeautifulSoup"""
+    @staticmethod
+    def _local_analyze(html: str, url: str) -> SEOResult:
+        """Perform basic SEO analysis locally using BeautifulSoup (runs in the CPU pool)"""
         from bs4 import BeautifulSoup
         
         try:
@@ -0,0 +1,259 @@
+"""
+Site-wide On-Page SEO Audit
+The homepage checks of the SEO analyzer (title, meta description, H1, image alts,
+viewport), plus canonical/hreflang consistency and title/description duplication,
+run on every crawled page.
+
+Pages stream through: the crawler hands each HTML body over as soon as it is read,
+bodies are batched and parsed in the CPU pool (cpu_tasks.audit_pages, one pass per
+page), and only the small per-page findings come back to be folded into site-level
+counters. At most MAX_IN_FLIGHT batches are held at once; past that the crawler
+waits, so memory stays flat whatever the size of the crawl.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.executor import CPUExecutor
+from ..models import DuplicateMeta, SiteAuditIssue, SiteAuditPage, SiteAuditResult
+from . import cpu_tasks
+from .page_fingerprints import PageFingerprintStore
+from .url_canon import url_key
+
+logger = logging.getLogger(__name__)
+
+# Bit order of the per-page issue mask
+ISSUES = (
+    "title_missing", "title_too_long", "title_duplicate",
+    "description_missing", "description_too_long", "description_duplicate",
+    "h1_missing", "h1_multiple", "image_alt_missing", "viewport_missing", "noindex",
+    "canonical_missing", "canonical_broken", "canonical_chain",
+    "hreflang_no_self", "hreflang_no_return", "hreflang_broken",
+)
+_BIT = {code: 1 << position for position, code in enumerate(ISSUES)}
+
+
+def page_issues(findings: dict) -> int:
+    """Issue mask of the checks that only need the page itself"""
+    mask = 0
+    title, description = findings.get("title"), findings.get("description")
+    if not title:
+        mask |= _BIT["title_missing"]
+    elif len(title) > SiteAudit.MAX_TITLE_LENGTH:
+        mask |= _BIT["title_too_long"]
+    if not description:
+        mask |= _BIT["description_missing"]
+    elif len(description) > SiteAudit.MAX_DESCRIPTION_LENGTH:
+        mask |= _BIT["description_too_long"]
+    if findings.get("h1", 0) == 0:
+        mask |= _BIT["h1_missing"]
+    elif findings["h1"] > 1:
+        mask |= _BIT["h1_multiple"]
+    if findings.get("images_no_alt"):
+        mask |= _BIT["image_alt_missing"]
+    if not findings.get("viewport"):
+        mask |= _BIT["viewport_missing"]
+    if findings.get("noindex"):
+        mask |= _BIT["noindex"]
+    if not findings.get("canonical"):
+        mask |= _BIT["canonical_missing"]
+    return mask
+
+
+def _issue_codes(mask: int) -> List[str]:
+    return [code for code in ISSUES if mask & _BIT[code]]
+
+
+class _PageRecord:
+    __slots__ = ("url", "key", "mask", "title", "description")
+
+    def __init__(self, url: str, key: str, mask: int, title: Optional[str], description: Optional[str]):
+        self.url = url
+        self.key = key
+        self.mask = mask
+        self.title = title  # Casefolded keys into SiteAudit._titles / _descriptions
+        self.description = description
+
+
+class SiteAudit:
+    """Streams crawled pages through the CPU pool and aggregates their findings"""
+
+    MAX_TITLE_LENGTH = 60
+    MAX_DESCRIPTION_LENGTH = 160
+    # A batch is sent to the pool once it reaches either bound
+    BATCH_PAGES = 8
+    BATCH_BYTES = 1024 * 1024
+    MAX_IN_FLIGHT = 4
+    MAX_EXAMPLES = 5
+    MAX_DUPLICATE_GROUPS = 10
+    TOP_OFFENDERS = 10
+
+    def __init__(self, fingerprints: Optional[PageFingerprintStore] = None):
+        # Incremental scans: findings are stored with the page fingerprints and
+        # reused for pages answered 304 (no body to parse)
+        self.fingerprints = fingerprints
+        self._batch: List[Tuple[str, bytes, Optional[str]]] = []
+        self._batch_bytes = 0
+        self._slots = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+        self._running: Set[asyncio.Task] = set()
+        self._received: Set[str] = set()  # url_key of the pages whose body was handed over
+        self._records: Dict[str, _PageRecord] = {}  # url_key -> record
+        self._statuses: Dict[str, int] = {}  # url_key -> crawl status, for canonical/hreflang targets
+        self._canonicals: Dict[str, str] = {}  # url_key -> canonical url_key, pages pointing elsewhere only
+        self._alternates: Dict[str, Set[str]] = {}  # url_key -> hreflang alternate url_keys
+        self._titles: Dict[str, list] = {}  # casefolded title -> [title, pages, example URLs]
+        self._descriptions: Dict[str, list] = {}
+        self.reused = 0
+
+    async def add_html(self, url: str, body: bytes, charset: Optional[str]):
+        """Queue a page body for auditing; waits while MAX_IN_FLIGHT batches are being parsed"""
+        self._received.add(url_key(url))
+        self._batch.append((url, body, charset))
+        self._batch_bytes += len(body)
+        if len(self._batch) >= self.BATCH_PAGES or self._batch_bytes >= self.BATCH_BYTES:
+            await self._submit()
+
+    def add_status(self, url: str, status: int, unchanged: bool = False):
+        """Crawl status of every fetched URL; unchanged pages without a body reuse stored findings"""
+        key = url_key(url)
+        self._statuses[key] = status
+        if not unchanged or key in self._received or key in self._records or self.fingerprints is None:
+            return
+        previous = self.fingerprints.page(url)
+        if previous is not None and previous.seo is not None:
+            self._record(url, previous.seo)
+            self.reused += 1
+
+    async def finish(self) -> SiteAuditResult:
+        """Parse what is still queued, wait for the pool, then compute the site-level result"""
+        if self._batch:
+            await self._submit()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        return self._result()
+
+    def cancel(self):
+        for task in self._running:
+            task.cancel()
+        self._batch = []
+
+    async def _submit(self):
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        await self._slots.acquire()
+        task = asyncio.create_task(self._parse(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _parse(self, batch: List[Tuple[str, bytes, Optional[str]]]):
+        try:
+            results = await CPUExecutor.run("parse", cpu_tasks.audit_pages, batch)
+        except Exception as e:
+            logger.warning(f"On-page audit batch failed ({len(batch)} pages): {e}")
+            return
+        finally:
+            self._slots.release()
+        for url, findings in results:
+            if findings is None:
+                continue
+            self._record(url, findings)
+            if self.fingerprints is not None:
+                fingerprint = self.fingerprints.page(url)
+                if fingerprint is not None:
+                    fingerprint.seo = findings
+                    self.fingerprints.put_page(url, fingerprint)
+
+    def _record(self, url: str, findings: dict):
+        key = url_key(url)
+        if key in self._records:
+            return
+        title = self._count_duplicate(self._titles, findings.get("title"), url)
+        description = self._count_duplicate(self._descriptions, findings.get("description"), url)
+        self._records[key] = _PageRecord(url, key, page_issues(findings), title, description)
+
+        canonical = findings.get("canonical")
+        if canonical and url_key(canonical) != key:
+            self._canonicals[key] = url_key(canonical)
+        alternates = findings.get("hreflang") or {}
+        if alternates:
+            self._alternates[key] = {url_key(alternate) for alternate in alternates.values()}
+
+    def _count_duplicate(self, groups: Dict[str, list], value: Optional[str], url: str) -> Optional[str]:
+        if not value:
+            return None
+        folded = value.casefold()
+        group = groups.get(folded)
+        if group is None:
+            groups[folded] = [value, 1, [url]]
+            return folded
+        group[1] += 1
+        if len(group[2]) < self.MAX_EXAMPLES:
+            group[2].append(url)
+        return folded
+
+    def _site_issues(self, record: _PageRecord) -> int:
+        """Issue mask including the checks that depend on other crawled pages"""
+        mask = record.mask
+        if record.title and self._titles[record.title][1] > 1:
+            mask |= _BIT["title_duplicate"]
+        if record.description and self._descriptions[record.description][1] > 1:
+            mask |= _BIT["description_duplicate"]
+
+        canonical = self._canonicals.get(record.key)
+        if canonical is not None:
+            status = self._statuses.get(canonical)
+            if status is not None and status != 200:
+                mask |= _BIT["canonical_broken"]
+            elif self._canonicals.get(canonical, canonical) != canonical:
+                mask |= _BIT["canonical_chain"]
+
+        alternates = self._alternates.get(record.key)
+        if alternates:
+            if record.key not in alternates:
+                mask |= _BIT["hreflang_no_self"]
+            for alternate in alternates - {record.key}:
+                status = self._statuses.get(alternate)
+                if status is not None and status != 200:
+                    mask |= _BIT["hreflang_broken"]
+                elif alternate in self._records and record.key not in self._alternates.get(alternate, ()):
+                    mask |= _BIT["hreflang_no_return"]
+        return mask
+
+    def _result(self) -> SiteAuditResult:
+        counts = {code: 0 for code in ISSUES}
+        examples: Dict[str, List[str]] = {code: [] for code in ISSUES}
+        offenders: List[Tuple[int, int, str, int]] = []
+        with_issues = 0
+        for order, record in enumerate(self._records.values()):
+            mask = self._site_issues(record)
+            if not mask:
+                continue
+            with_issues += 1
+            for code in _issue_codes(mask):
+                counts[code] += 1
+                if len(examples[code]) < self.MAX_EXAMPLES:
+                    examples[code].append(record.url)
+            offenders.append((-mask.bit_count(), order, record.url, mask))
+
+        offenders.sort()
+        return SiteAuditResult(
+            pages_audited=len(self._records),
+            pages_with_issues=with_issues,
+            pages_reused=self.reused,
+            issues=sorted(
+                (SiteAuditIssue(code=code, pages=count, examples=examples[code]) for code, count in counts.items() if count),
+                key=lambda issue: issue.pages, reverse=True
+            ),
+            duplicate_titles=self._duplicate_groups(self._titles),
+            duplicate_descriptions=self._duplicate_groups(self._descriptions),
+            top_offenders=[
+                SiteAuditPage(url=url, issues=_issue_codes(mask))
+                for _, _, url, mask in offenders[:self.TOP_OFFENDERS]
+            ],
+        )
+
+    def _duplicate_groups(self, groups: Dict[str, list]) -> List[DuplicateMeta]:
+        shared = sorted((group for group in groups.values() if group[1] > 1), key=lambda group: group[1], reverse=True)
+        return [
+            DuplicateMeta(value=value, size=size, pages=pages)
+            for value, size, pages in shared[:self.MAX_DUPLICATE_GROUPS]
+        ]
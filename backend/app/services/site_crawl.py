@@ -0,0 +1,92 @@
+"""
+Shared Site Crawl
+One crawl per scan, consumed by every analyzer that needs the site's pages
+(broken links, duplicate content, on-page audit...) instead of each crawling on its own.
+
+The first analyzer to run() it starts the crawl; the others await the same one.
+Listeners can subscribe at any time: pages crawled so far are replayed to them,
+then they receive pages as they come. Scan crawls are small (MAX_PAGES), so
+the per-page link data is kept for the lifetime of the scan. Page HTML is not:
+with audit_pages, it streams straight into the site-wide on-page audit.
+"""
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from .crawler import AsyncCrawler, PageCallback, ProgressCallback, invoke_callback
+from .html_stream import ExtractedLinks
+from .page_fingerprints import PageFingerprintStore
+from .site_audit import SiteAudit
+
+
+class SiteCrawl:
+    MAX_PAGES = 50
+    MAX_DEPTH = 3
+    # Hard stop of the crawl (the page cap only stops queueing new pages)
+    TIME_BUDGET = 60.0
+
+    def __init__(
+        self,
+        url: str,
+        max_pages: int = MAX_PAGES,
+        max_depth: int = MAX_DEPTH,
+        on_progress: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+        audit_pages: bool = False,
+    ):
+        self.url = url
+        # Incremental (monitor) scans: previous fingerprints, saved by the analyzers using them
+        self.fingerprints = PageFingerprintStore(url) if incremental else None
+        # On-page SEO checks of every crawled page, collected by the SEO analyzer
+        self.audit = SiteAudit(self.fingerprints) if audit_pages else None
+        self.pages: List[Tuple[str, int, Optional[ExtractedLinks]]] = []
+        self._listeners: List[PageCallback] = []
+        self._task: Optional[asyncio.Future] = None
+        self.crawler = AsyncCrawler(
+            base_url=url,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            on_progress=on_progress,
+            on_page=self._on_page,
+            fingerprints=self.fingerprints,
+            content_signatures=True,
+            on_html=self.audit.add_html if self.audit else None,
+            time_budget=self.TIME_BUDGET,
+        )
+
+    async def subscribe(self, listener: PageCallback):
+        """Replay the pages crawled so far to `listener`, then keep it posted"""
+        index = 0
+        while index < len(self.pages):
+            await invoke_callback(listener, *self.pages[index])
+            index += 1
+        # No await between the last replayed page and registration: nothing is missed
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: PageCallback):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def run(self) -> Set[str]:
+        """Start the crawl (once) and wait for it; returns the visited URLs"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._crawl())
+        # One analyzer giving up (cancelled) must not stop the crawl for the others
+        return await asyncio.shield(self._task)
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        if self.audit is not None:
+            self.audit.cancel()
+
+    async def _crawl(self) -> Set[str]:
+        if self.fingerprints:
+            await self.fingerprints.load()
+        return await self.crawler.crawl()
+
+    async def _on_page(self, url: str, status: int, page: Optional[ExtractedLinks]):
+        self.pages.append((url, status, page))
+        if self.audit is not None:
+            self.audit.add_status(url, status, unchanged=bool(page and page.unchanged))
+        for listener in list(self._listeners):
+            await invoke_callback(listener, url, status, page)
@@ -0,0 +1,158 @@
+"""
+Streaming Sitemap Reader
+Yields page URLs from sitemap.xml files and sitemap indexes without loading them:
+the body is inflated (gzip) and parsed (lxml pull parser) chunk by chunk, and
+parsed <url> entries are discarded immediately, so 50k-URL sitemaps stay small.
+"""
+import asyncio
+import logging
+import zlib
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+import aiohttp
+from lxml import etree
+
+from .robots import CRAWLER_USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapParser:
+    """
+    Incremental <urlset>/<sitemapindex> parser.
+    feed() returns the (kind, loc) pairs completed by that chunk, kind being
+    "url" for pages and "sitemap" for child sitemaps of an index.
+    """
+
+    def __init__(self, max_bytes: int = 50 * 1024 * 1024):
+        # No entity expansion / network access: sitemaps are untrusted input
+        self._parser = etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True, huge_tree=False
+        )
+        self._inflater = None
+        self._sniffed = False
+        self.max_bytes = max_bytes  # Uncompressed: guards against gzip bombs
+        self.parsed_bytes = 0
+        self.exhausted = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, str]]:
+        if self.exhausted:
+            return []
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk.startswith(GZIP_MAGIC):
+                # .xml.gz served as a plain file (not Content-Encoding)
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        remaining = self.max_bytes - self.parsed_bytes
+        if self._inflater is not None:
+            chunk = self._inflater.decompress(chunk, remaining + 1)
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self.exhausted = True
+        self.parsed_bytes += len(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Tuple[str, str]]:
+        try:
+            if self._inflater is not None and not self.exhausted:
+                self._parser.feed(self._inflater.flush())
+            self._parser.close()
+        except (etree.XMLSyntaxError, zlib.error):
+            pass  # Truncated sitemap: keep the entries read so far
+        return self._drain()
+
+    def _drain(self) -> List[Tuple[str, str]]:
+        entries = []
+        for _, elem in self._parser.read_events():
+            if not isinstance(elem.tag, str):
+                continue
+            name = etree.QName(elem).localname
+            if name == "loc":
+                parent = elem.getparent()
+                kind = etree.QName(parent).localname if parent is not None else ""
+                loc = (elem.text or "").strip()
+                if loc and kind in ("url", "sitemap"):
+                    entries.append((kind, loc))
+            elif name in ("url", "sitemap"):
+                # Entry done: free it and the ones before it
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+        return entries
+
+
+def parse_sitemap_bytes(chunks: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    """Synchronous helper over an iterable of raw (possibly gzipped) chunks"""
+    parser = SitemapParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class SitemapReader:
+    """Walks sitemaps (and nested indexes) breadth-first, streaming each one"""
+
+    MAX_SITEMAPS = 50
+    MAX_INDEX_DEPTH = 2
+    MAX_BYTES = 50 * 1024 * 1024  # Protocol limit, uncompressed
+    MAX_COMPRESSED_BYTES = 10 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+
+    async def iter_urls(self, sitemap_urls: List[str], limit: Optional[int] = None) -> AsyncIterator[str]:
+        """Page URLs in sitemap order; stops reading as soon as `limit` URLs were yielded"""
+        queue = deque((url, 0) for url in sitemap_urls)
+        seen = set(sitemap_urls)
+        fetched = 0
+        yielded = 0
+
+        while queue and fetched < self.MAX_SITEMAPS:
+            sitemap_url, depth = queue.popleft()
+            fetched += 1
+            # aclosing: stopping early releases the connection right away
+            async with aclosing(self._stream(sitemap_url)) as entries:
+                async for kind, loc in entries:
+                    if kind == "sitemap":
+                        if depth < self.MAX_INDEX_DEPTH and loc not in seen:
+                            seen.add(loc)
+                            queue.append((loc, depth + 1))
+                        continue
+                    yield loc
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+
+    async def _stream(self, sitemap_url: str) -> AsyncIterator[Tuple[str, str]]:
+        parser = SitemapParser(self.MAX_BYTES)
+        try:
+            async with self.session.get(
+                sitemap_url,
+                timeout=aiohttp.ClientTimeout(total=30),
+                ssl=False,
+                headers={"User-Agent": CRAWLER_USER_AGENT},
+            ) as response:
+                if response.status != 200:
+                    return
+                received = 0
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > self.MAX_COMPRESSED_BYTES:
+                        break
+                    for entry in parser.feed(chunk):
+                        yield entry
+                    if parser.exhausted:
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError, zlib.error) as e:
+            logger.info(f"Sitemap {sitemap_url} could not be read: {e}")
+            return
+        for entry in parser.close():
+            yield entry
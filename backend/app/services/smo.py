@@ -2,12 +2,13 @@
 Social Media Optimization (SMO) Analyzer Service
 Extracts and validates Open Graph and Twitter Card metadata for social previews.
 """
-import httpx
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from typing import Optional
 
+from ..core.executor import CPUExecutor
+from ..core.politeness import polite_client
 from ..models.schemas import SMOResult
+from .cpu_tasks import extract_social_meta
 
 class SMOAnalyzer:
     def __init__(self):
@@ -21,7 +22,7 @@ class SMOAnalyzer:
         result = SMOResult()
         
         try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=10.0, headers=self.headers, verify=False) as client:
+            async with polite_client(follow_redirects=True, timeout=10.0, headers=self.headers, verify=False) as client:
                 html = ""
                 
                 if html_content:
@@ -38,24 +39,23 @@ class SMOAnalyzer:
                         return result
 
                     html = response.text
-                soup = BeautifulSoup(html, "html.parser")
 
-                # --- 1. Extraction ---
-                og_title = self._get_meta(soup, "og:title")
-                og_desc = self._get_meta(soup, "og:description")
-                og_image = self._get_meta(soup, "og:image")
-                og_url = self._get_meta(soup, "og:url")
-                og_site_name = self._get_meta(soup, "og:site_name")
+                # --- 1. Extraction (parsed in the CPU pool) ---
+                meta = await CPUExecutor.run("parse", extract_social_meta, html)
+                og_title = meta["og_title"]
+                og_desc = meta["og_description"]
+                og_image = meta["og_image"]
+                og_url = meta["og_url"]
+                og_site_name = meta["og_site_name"]
 
-                twitter_card = self._get_meta(soup, "twitter:card", "name")
-                twitter_title = self._get_meta(soup, "twitter:title", "name")
-                twitter_desc = self._get_meta(soup, "twitter:description", "name")
-                twitter_image = self._get_meta(soup, "twitter:image", "name")
+                twitter_card = meta["twitter_card"]
+                twitter_title = meta["twitter_title"]
+                twitter_desc = meta["twitter_description"]
+                twitter_image = meta["twitter_image"]
 
                 # Basic Meta Fallbacks
-                page_title = soup.title.string.strip() if soup.title and soup.title.string else None
-                meta_desc_tag = soup.find("meta", attrs={"name": "description"})
-                meta_desc = meta_desc_tag["content"].strip() if meta_desc_tag and meta_desc_tag.get("content") else None
+                page_title = meta["page_title"]
+                meta_desc = meta["meta_description"]
 
                 # --- 2. Intelligent Logic (Fallbacks) ---
                 
@@ -116,20 +116,6 @@ class SMOAnalyzer:
 
         return result
 
-    def _get_meta(self, soup, property_name: str, attr="property") -> Optional[str]:
-        """Helper to safely extract meta content"""
-        # Try finding by property (og:*) or name (twitter:*)
-        tag = soup.find("meta", attrs={attr: property_name})
-        
-        # Fallback: sometimes people swap name/property
-        if not tag:
-             alt_attr = "name" if attr == "property" else "property"
-             tag = soup.find("meta", attrs={alt_attr: property_name})
-        
-        if tag and tag.get("content"):
-            return tag["content"].strip()
-        return None
-
     async def _check_image(self, client, url: str) -> bool:
         """HEAD request to validate image presence"""
         try:
@@ -1,4 +1,3 @@
-
 import logging
 from sqlmodel import Session, select
 from app.db.session import engine
@@ -7,36 +6,55 @@ from app.models.schemas import AuditStatus
 
 logger = logging.getLogger(__name__)
 
+# A task interrupted this many times is given up (e.g. a page that crashes the worker)
+MAX_RECOVERIES = 3
+
 class TaskRecoveryService:
     @staticmethod
     def recover_stuck_tasks():
         """
         Finds tasks that were left in RUNNING or PENDING state due to a server crash/restart.
-        Marks them as FAILED.
+        Re-enqueues them: the scan resumes from its checkpoint (only the missing
+        analyzers run), and a task still running on a worker ignores the copy.
+        Tasks that cannot be resumed are marked as FAILED.
         """
         logger.info("🛠️ Task Recovery: Checking for interrupted tasks...")
-        
+
         try:
+            from app.worker import process_scan_task
+
             with Session(engine) as session:
                 statement = select(ScanTask).where(
-                    (ScanTask.status == AuditStatus.RUNNING) | 
+                    (ScanTask.status == AuditStatus.RUNNING) |
                     (ScanTask.status == AuditStatus.PENDING)
                 )
                 stuck_tasks = session.exec(statement).all()
-                
-                count = 0
+
+                requeued = failed = 0
                 for task in stuck_tasks:
                     logger.warning(f"⚠️ Recovering stuck task {task.id} (Status: {task.status})")
-                    task.status = AuditStatus.FAILED
-                    task.error = "Scan interrupted by server restart/update. Please try again."
+                    # Tasks from before scan arguments were stored have unknown plan features
+                    if task.features is None or task.recoveries >= MAX_RECOVERIES:
+                        task.status = AuditStatus.FAILED
+                        task.error = "Scan interrupted by server restart/update. Please try again."
+                        failed += 1
+                    else:
+                        try:
+                            process_scan_task.delay(task.id, task.url, task.lang, task.features)
+                            task.recoveries += 1
+                            requeued += 1
+                        except Exception as e:
+                            logger.error(f"❌ Task Recovery: Could not re-enqueue {task.id}: {e}")
+                            task.status = AuditStatus.FAILED
+                            task.error = "Scan interrupted by server restart/update. Please try again."
+                            failed += 1
                     session.add(task)
-                    count += 1
-                
-                if count > 0:
+
+                if stuck_tasks:
                     session.commit()
-                    logger.info(f"✅ Task Recovery: Marked {count} stuck tasks as FAILED.")
+                    logger.info(f"✅ Task Recovery: Re-enqueued {requeued} interrupted tasks, marked {failed} as FAILED.")
                 else:
                     logger.info("✅ Task Recovery: No stuck tasks found.")
-                    
+
         except Exception as e:
             logger.error(f"❌ Task Recovery Failed: {e}")
@@ -2,7 +2,6 @@
 Technology Stack Detection Service
 Fingerprints technologies used by the website
 """
-import httpx
 import re
 from typing import Optional, Dict, Any, List, Set
 from urllib.parse import urlparse
@@ -11,8 +10,12 @@ from ..config import get_settings
 from ..models import TechStackResult, Technology, CompanyInfo, ContactInfo, SeverityLevel
 
 
-from .wappalyzer_enhanced import EnhancedWappalyzer
+from ..core.executor import CPUExecutor
+from ..core.politeness import polite_client
+from .cpu_tasks import fingerprint_technologies
 from .cve_matcher import CVEMatcher
+from .cve_index import normalize_product
+from .js_hashes import ScriptHashIdentifier
 from typing import Optional, Dict, List
 import logging
 
@@ -23,7 +26,6 @@ class TechStackAnalyzer:
     
     def __init__(self):
         self.settings = get_settings()
-        self.wappalyzer = EnhancedWappalyzer()
     
     async def analyze(self, url: str, html_content: Optional[str] = None, headers: Optional[Dict] = None) -> TechStackResult:
         """
@@ -40,7 +42,7 @@ class TechStackAnalyzer:
                 target_html = html_content
                 target_headers = headers or {}
             else:
-                async with httpx.AsyncClient(
+                async with polite_client(
                     timeout=self.settings.request_timeout,
                     follow_redirects=True,
                     verify=False,
@@ -51,8 +53,13 @@ class TechStackAnalyzer:
                     target_headers = dict(response.headers)
             
             # 1. Enhanced Wappalyzer Detection
-            # This handles detection + granular version extraction
-            detected_raw = self.wappalyzer.analyze(url, target_html, target_headers)
+            # This handles detection + granular version extraction.
+            # Regex over the whole page is CPU-bound: run it in the process pool.
+            detected_raw = await CPUExecutor.run("wappalyzer", fingerprint_technologies, url, target_html, target_headers)
+
+            # 1b. Hash-based JS library identification (exact versions for bundled/renamed files)
+            if self.settings.js_hash_detection:
+                detected_raw = await self._merge_script_hashes(url, target_html, detected_raw)
             
             for item in detected_raw:
                 version = item.get("version")
@@ -123,6 +130,32 @@ class TechStackAnalyzer:
         
         return result
 
+    async def _merge_script_hashes(self, url: str, html: str, detected_raw: List[Dict]) -> List[Dict]:
+        """Fill in (or add) technologies identified from script content hashes."""
+        try:
+            identified = await ScriptHashIdentifier().identify(url, html)
+        except Exception as e:
+            logger.warning(f"Script hash identification failed: {e}")
+            return detected_raw
+
+        by_key = {normalize_product(item["name"]): item for item in detected_raw}
+        for match in identified:
+            key = normalize_product(match["library"])
+            item = by_key.get(key)
+            if item is None:
+                item = {
+                    "name": match["library"],
+                    "categories": ["JavaScript Libraries"],
+                    "version": None,
+                    "website": "",
+                    "icon": None,
+                }
+                by_key[key] = item
+                detected_raw.append(item)
+            # A content hash match is exact: it wins over URL heuristics
+            item["version"] = match["version"]
+        return detected_raw
+
     def _categorize_technologies(self, result: TechStackResult) -> TechStackResult:
         """Categorize detected technologies"""
         for tech in result.technologies:
@@ -0,0 +1,142 @@
+"""
+URL Canonicalization
+One normalization for every component that fetches, dedupes or caches by URL
+(crawlers, link checker, Green IT resource list, verdict/hash caches).
+
+- canonicalize_url(): a fetchable URL - lowercase scheme/host, no default port,
+  resolved dot segments, normalized percent-escapes, sorted query without
+  tracking parameters, no fragment.
+- url_key(): crawl dedupe identity - the canonical URL, plus trailing-slash
+  and www. aliasing, which usually (not always) point to the same page and so
+  must not be applied to the URL actually requested. Per-URL results (link
+  verdicts, fingerprints, cached scans) are keyed by canonicalize_url() instead.
+"""
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Click/campaign identifiers that never change the page content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid",
+    "igshid", "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# www. aliasing policies
+WWW_KEEP = "keep"
+WWW_STRIP = "strip"
+WWW_ADD = "add"
+
+_UNRESERVED = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+_PERCENT_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+# Path characters left as-is when re-quoting (RFC 3986 pchar + "/")
+_PATH_SAFE = "/:@!$&'()*+,;=%"
+
+
+def _normalize_escapes(value: str) -> str:
+    """Uppercase escapes, decode the ones encoding unreserved characters"""
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else f"%{match.group(1).upper()}"
+    return _PERCENT_ESCAPE.sub(fix, value)
+
+
+def _remove_dot_segments(path: str) -> str:
+    if "." not in path:
+        return path
+    output = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if path.endswith(("/.", "/..")):
+        output.append("")
+    return "/".join(output) or "/"
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_host(host: str, www: str = WWW_KEEP) -> str:
+    host = host.strip().rstrip(".").lower()
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    if www == WWW_STRIP and host.startswith("www."):
+        host = host[4:]
+    elif www == WWW_ADD and not host.startswith("www.") and host.count(".") == 1:
+        host = f"www.{host}"
+    return host
+
+
+def same_site(host_a: str, host_b: str) -> bool:
+    """Hosts equal up to case, trailing dot, default port and www. prefix"""
+    def bare(host: str) -> str:
+        parts = urlsplit(f"//{host}")
+        return normalize_host(parts.hostname or "", WWW_STRIP)
+    return bare(host_a) == bare(host_b)
+
+
+def canonicalize_url(url: str, base: Optional[str] = None, www: str = WWW_KEEP) -> Optional[str]:
+    """
+    Canonical absolute http(s) URL, or None for other schemes / unparsable input.
+    `base` resolves relative references.
+    """
+    url = url.strip()
+    if not url:
+        return None
+    if base:
+        url = urljoin(base, url)
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    netloc = normalize_host(parts.hostname, www)
+    if ":" in netloc:
+        netloc = f"[{netloc}]"  # IPv6 literal
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    path = _remove_dot_segments(quote(_normalize_escapes(parts.path or "/"), safe=_PATH_SAFE))
+
+    query = ""
+    if parts.query:
+        params = [
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not is_tracking_param(name)
+        ]
+        # Stable on names: repeated keys keep their relative order (array semantics)
+        params.sort(key=lambda param: param[0])
+        query = urlencode(params, quote_via=quote)
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_key(url: str, base: Optional[str] = None) -> str:
+    """
+    Dedupe / cache identity: canonical URL with www. stripped and no trailing slash
+    (except the root). Falls back to the stripped input for non-http(s) URLs.
+    """
+    canonical = canonicalize_url(url, base, www=WWW_STRIP)
+    if canonical is None:
+        return url.strip()
+    parts = urlsplit(canonical)
+    path = parts.path
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ""))
@@ -1,20 +1,51 @@
+import json
 import logging
 from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, TypeVar
 from sqlmodel import Session
 from asgiref.sync import async_to_sync
 
+from app.core.async_runtime import AsyncRuntime
 from app.core.celery_app import celery_app
+from app.core.config import get_settings
 from app.database import engine
 from app.models.task import ScanTask, AuditStatus
-from app.services.scanner import process_url
+from app.models.crawl import CrawlJob, CrawlStatus
+from app.models.email_audit import EmailAuditJob, EmailAuditStatus
+from app.models.bulk_scan import BulkScanJob, BulkScanStatus
+from app.models.audit import Audit
+from app.models.schemas import AnalyzeResponse
+from app.services.scanner import process_url_stream
+from app.services.scan_events import ScanEventChannel
+from app.services.scan_checkpoint import ScanCheckpoint, ScanAlreadyRunning
+from app.services.large_crawl import LargeSiteCrawler, CrawlAlreadyRunning
+from app.services.bulk_email_audit import BulkEmailAudit, AuditAlreadyRunning
+from app.services.bulk_scan import BulkScanShard, ShardAlreadyRunning
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Scan events relayed to subscribers while a background scan runs (screenshots are not)
+RELAYED_EVENTS = ("log", "progress", "partial")
+
+
+def run_async(fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run a task's coroutine: on the worker process's shared event loop, or on a
+    loop of its own when WORKER_SHARED_LOOP is off
+    """
+    if get_settings().worker_shared_loop:
+        return AsyncRuntime.run(fn)
+    return async_to_sync(fn)()
+
+
 @celery_app.task(acks_late=True)
-def process_scan_task(task_id: str, url: str, lang: str):
+def process_scan_task(task_id: str, url: str, lang: str, allowed_features: Optional[List[str]] = None):
     """
     Celery task for scan processing.
-    Updates the task status in DB.
+    Updates the task status in DB. Analyzer results are checkpointed in Redis,
+    so a redelivered or re-enqueued task only runs the analyzers still missing.
     """
     logger.info(f"Starting Celery scan for task {task_id}")
     
@@ -24,26 +55,275 @@ def process_scan_task(task_id: str, url: str, lang: str):
         if not task:
             logger.error(f"Task {task_id} not found")
             return
+        if task.status in (AuditStatus.COMPLETED, AuditStatus.FAILED):
+            return
 
         task.status = AuditStatus.RUNNING
         session.add(task)
         session.commit()
+
+        events = ScanEventChannel(task_id)
+        checkpoint = ScanCheckpoint(task_id)
+
+        async def scan() -> AnalyzeResponse:
+            # Progress is relayed live; the final event waits for the task row to be saved
+            async with checkpoint.hold():
+                precomputed = await checkpoint.load()
+                if precomputed:
+                    await events.publish({
+                        "type": "log", "step": "init",
+                        "message": f"Resuming interrupted scan ({', '.join(sorted(precomputed))} already done)"
+                    })
+                error = "Analysis stream completed without result"
+                async for chunk in process_url_stream(
+                    url, lang, allowed_features, precomputed=precomputed, partial_results=True
+                ):
+                    event = json.loads(chunk)
+                    if event["type"] == "complete":
+                        return AnalyzeResponse(**event["data"])
+                    if event["type"] == "error":
+                        error = event["message"]
+                    elif event["type"] in RELAYED_EVENTS:
+                        if event["type"] == "partial":
+                            await checkpoint.save(event["step"], event["data"])
+                        await events.publish(event)
+                raise Exception(error)
         
         try:
-            # Run the heavy scan (Async)
-            # Wrap async call with async_to_sync since Celery workers are sync by default
-            result = async_to_sync(process_url)(url, lang)
+            # Run the heavy scan (Async) on the worker's event loop
+            result = run_async(scan)
             
             # Save result
             task.result = result.model_dump(mode='json')
             task.status = AuditStatus.COMPLETED
             task.finished_at = datetime.utcnow()
+            final_event = {"type": "complete", "data": task.result}
             logger.info(f"Task {task_id} completed successfully")
             
+        except ScanAlreadyRunning:
+            logger.warning(f"Task {task_id} is already running on another worker")
+            return
         except Exception as e:
             logger.error(f"Task {task_id} failed: {e}")
             task.error = str(e)
             task.status = AuditStatus.FAILED
+            final_event = {"type": "error", "message": str(e)}
         
         session.add(task)
         session.commit()
+        run_async(checkpoint.clear)
+        run_async(lambda: events.publish(final_event))
+
+
+@celery_app.task(acks_late=True)
+def run_large_crawl(crawl_id: str):
+    """
+    Celery task for large-site crawls.
+    State is in Redis, so a redelivered task resumes where the previous worker stopped.
+    """
+    logger.info(f"Starting large crawl {crawl_id}")
+
+    with Session(engine) as session:
+        job = session.get(CrawlJob, crawl_id)
+        if not job:
+            logger.error(f"Crawl {crawl_id} not found")
+            return
+        if job.status in (CrawlStatus.COMPLETED, CrawlStatus.CANCELLED):
+            return
+
+        job.status = CrawlStatus.RUNNING
+        job.started_at = job.started_at or datetime.utcnow()
+        job.error = None
+        session.add(job)
+        session.commit()
+        url, max_pages, max_depth = job.url, job.max_pages, job.max_depth
+
+        def checkpoint(stats: dict):
+            # Own session: called from a thread while the crawl runs
+            with Session(engine) as checkpoint_session:
+                current = checkpoint_session.get(CrawlJob, crawl_id)
+                current.pages_crawled = stats["pages_crawled"]
+                current.pages_discovered = stats["pages_discovered"]
+                current.error_pages = stats["error_pages"]
+                current.last_checkpoint_at = datetime.utcnow()
+                checkpoint_session.add(current)
+                checkpoint_session.commit()
+
+        async def crawl():
+            crawler = LargeSiteCrawler(
+                crawl_id,
+                url,
+                max_pages=max_pages,
+                max_depth=max_depth,
+                on_checkpoint=checkpoint,
+            )
+            return await crawler.crawl()
+
+        try:
+            stats = run_async(crawl)
+        except CrawlAlreadyRunning:
+            logger.warning(f"Crawl {crawl_id} is already running on another worker")
+            return
+        except Exception as e:
+            logger.error(f"Crawl {crawl_id} failed: {e}")
+            session.refresh(job)
+            job.status = CrawlStatus.FAILED
+            job.error = str(e)
+            session.add(job)
+            session.commit()
+            return
+
+        checkpoint(stats)
+        session.refresh(job)
+        # Frontier left over means the crawl was stopped by a cancel request
+        job.status = CrawlStatus.COMPLETED if stats["queued"] == 0 else CrawlStatus.CANCELLED
+        job.finished_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+        logger.info(f"Crawl {crawl_id} {job.status.value}: {stats['pages_crawled']} pages")
+
+
+@celery_app.task(acks_late=True)
+def run_email_audit(audit_id: str):
+    """
+    Celery task for bulk email-health audits.
+    Finished domains are recorded in Redis, so a redelivered task only runs the others.
+    """
+    logger.info(f"Starting email audit {audit_id}")
+
+    with Session(engine) as session:
+        job = session.get(EmailAuditJob, audit_id)
+        if not job:
+            logger.error(f"Email audit {audit_id} not found")
+            return
+        if job.status in (EmailAuditStatus.COMPLETED, EmailAuditStatus.CANCELLED):
+            return
+
+        job.status = EmailAuditStatus.RUNNING
+        job.started_at = job.started_at or datetime.utcnow()
+        job.error = None
+        session.add(job)
+        session.commit()
+
+        def checkpoint(stats: dict):
+            # Own session: called from a thread while the audit runs
+            with Session(engine) as checkpoint_session:
+                current = checkpoint_session.get(EmailAuditJob, audit_id)
+                current.domains_done = stats["domains_done"]
+                current.domains_failed = stats["domains_failed"]
+                current.last_checkpoint_at = datetime.utcnow()
+                checkpoint_session.add(current)
+                checkpoint_session.commit()
+
+        async def audit():
+            return await BulkEmailAudit(audit_id, on_checkpoint=checkpoint).run()
+
+        try:
+            stats = run_async(audit)
+        except AuditAlreadyRunning:
+            logger.warning(f"Email audit {audit_id} is already running on another worker")
+            return
+        except Exception as e:
+            logger.error(f"Email audit {audit_id} failed: {e}")
+            session.refresh(job)
+            job.status = EmailAuditStatus.FAILED
+            job.error = str(e)
+            session.add(job)
+            session.commit()
+            return
+
+        checkpoint(stats)
+        session.refresh(job)
+        # Domains left over means the audit was stopped by a cancel request
+        job.status = EmailAuditStatus.COMPLETED if stats["domains_done"] >= stats["domain_count"] \
+            else EmailAuditStatus.CANCELLED
+        job.finished_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+        logger.info(f"Email audit {audit_id} {job.status.value}: {stats['domains_done']} domains")
+
+
+@celery_app.task(acks_late=True)
+def run_bulk_scan(job_id: str, shard: int):
+    """
+    Celery task for one shard of a bulk scan (all shards share the job's URL queue).
+    A redelivered shard puts the URLs it had started back in the queue first.
+    Full results are saved to the user's audit history.
+    """
+    logger.info(f"Starting bulk scan {job_id} shard {shard}")
+
+    with Session(engine) as session:
+        job = session.get(BulkScanJob, job_id)
+        if not job:
+            logger.error(f"Bulk scan {job_id} not found")
+            return
+        if job.status in (BulkScanStatus.COMPLETED, BulkScanStatus.CANCELLED):
+            return
+
+        job.status = BulkScanStatus.RUNNING
+        job.started_at = job.started_at or datetime.utcnow()
+        job.error = None
+        session.add(job)
+        session.commit()
+        user_id, shards, lang, features = job.user_id, job.shards, job.lang, list(job.features)
+
+        def checkpoint(stats: dict):
+            # Own session: called from a thread while the scans run
+            with Session(engine) as checkpoint_session:
+                current = checkpoint_session.get(BulkScanJob, job_id)
+                current.urls_done = stats["urls_done"]
+                current.urls_failed = stats["urls_failed"]
+                current.last_checkpoint_at = datetime.utcnow()
+                checkpoint_session.add(current)
+                checkpoint_session.commit()
+
+        def save_result(url: str, response) -> int:
+            with Session(engine) as result_session:
+                audit = Audit(
+                    user_id=user_id,
+                    url=url,
+                    score=response.global_score,
+                    summary=json.dumps(response.model_dump(mode='json')),
+                    created_at=datetime.utcnow()
+                )
+                result_session.add(audit)
+                result_session.commit()
+                return audit.id
+
+        async def scan():
+            shard_runner = BulkScanShard(
+                job_id, shard, shards, lang=lang, features=features,
+                on_result=save_result, on_checkpoint=checkpoint,
+            )
+            stats = await shard_runner.run()
+            stats["cancelled"] = await BulkScanShard.cancel_requested(job_id)
+            return stats
+
+        try:
+            stats = run_async(scan)
+        except ShardAlreadyRunning:
+            logger.warning(f"Bulk scan {job_id} shard {shard} is already running on another worker")
+            return
+        except Exception as e:
+            logger.error(f"Bulk scan {job_id} shard {shard} failed: {e}")
+            session.refresh(job)
+            job.status = BulkScanStatus.FAILED
+            job.error = str(e)
+            session.add(job)
+            session.commit()
+            return
+
+        if stats["shards_running"]:
+            return  # The last shard to stop settles the job status
+        session.refresh(job)
+        if stats["urls_done"] >= stats["url_count"]:
+            job.status = BulkScanStatus.COMPLETED
+        elif stats["cancelled"]:
+            job.status = BulkScanStatus.CANCELLED
+        else:
+            # URLs still in flight on a shard awaiting redelivery
+            return
+        job.finished_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+        logger.info(f"Bulk scan {job_id} {job.status.value}: {stats['urls_done']} URLs")
@@ -0,0 +1,112 @@
+"""
+Bulk Email Audit Benchmark
+Audits thousands of site-N.test domains against the stub DNS server of
+benchmark_dns.py (fixed answer delay, in its own process so it does not compete
+with the audit for the GIL) and reports throughput and the worker's RSS along the run.
+
+Requires a reachable Redis (REDIS_URL).
+
+Usage:
+    python scripts/benchmark_bulk_email_audit.py --domains 10000
+    python scripts/benchmark_bulk_email_audit.py --domains 5000 --interrupt-after 2000   # also exercises resume
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import threading
+import time
+import uuid
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import get_redis
+from app.services.bulk_email_audit import BulkEmailAudit
+from app.services.dns_engine import DNSEngine
+from scripts.benchmark_dns import PORT, start_stub
+
+
+def rss_mb() -> float:
+    # Resident pages, from /proc (Linux)
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def serve_stub(delay: float, ready):
+    start_stub(delay)
+    ready.set()
+    threading.Event().wait()  # Keeps the daemon process (and its server thread) alive
+
+
+async def run(args):
+    ready = multiprocessing.Event()
+    multiprocessing.Process(target=serve_stub, args=(args.delay, ready), daemon=True).start()
+    ready.wait()
+    DNSEngine.configure(nameservers=["127.0.0.1"], port=PORT, max_concurrency=args.dns_concurrency)
+    audit_id = f"bench-{uuid.uuid4().hex[:8]}"
+    await BulkEmailAudit.store_domains(audit_id, [f"site-{i}.test" for i in range(args.domains)])
+
+    print(f"--- {args.domains} domains, {args.delay * 1000:.0f} ms per DNS answer, "
+          f"{args.concurrency} domains / {args.dns_concurrency} queries at once ---")
+    rss_samples = [rss_mb()]
+
+    async def sample_rss():
+        # Flat memory shows as the same RSS at 10% and at 100% of the list
+        while True:
+            await asyncio.sleep(1.0)
+            rss_samples.append(rss_mb())
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    try:
+        if args.interrupt_after:
+            # Simulate a worker dying mid-audit, then resume the same audit id
+            audit = BulkEmailAudit(audit_id, concurrency=args.concurrency)
+            task = asyncio.create_task(audit.run())
+            while (await audit.stats())["domains_done"] < args.interrupt_after:
+                await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # A dead worker would not release its lock: let it lapse immediately
+            await get_redis().delete(audit.lock_key)
+            print(f"interrupted after {(await audit.stats())['domains_done']} domains, resuming...")
+
+        audit = BulkEmailAudit(audit_id, concurrency=args.concurrency)
+        stats = await audit.run()
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+
+        rows = [json.loads(raw) for raw in await BulkEmailAudit.read_results(audit_id, 0, args.domains + 1)]
+        unique = len({row["domain"] for row in rows})
+        print(f"audited          {stats['domains_done']}/{stats['domain_count']} domains "
+              f"({stats['domains_failed']} failed, {len(rows)} result lines, {unique} distinct) in {elapsed:.1f}s")
+        print(f"throughput       {stats['domains_done'] / elapsed:.0f} domains/s")
+        print(f"dns queries      {DNSEngine.stats['queries']} sent, {DNSEngine.stats['hits']} cache hits, "
+              f"{DNSEngine.stats['coalesced']} shared")
+        print(f"process RSS      {rss_samples[0]:.0f} MiB before, "
+              + " ".join(f"{rss:.0f}" for rss in rss_samples[1::max(1, len(rss_samples) // 10)])
+              + f" MiB while running, peak {max(rss_samples):.0f} MiB")
+        print(f"sample           {rows[0]}")
+    finally:
+        sampler.cancel()
+        redis = get_redis()
+        async for key in redis.scan_iter(match=f"emailaudit:{audit_id}:*"):
+            await redis.delete(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bulk email-health audit.")
+    parser.add_argument("--domains", type=int, default=10000)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stub DNS answer delay (seconds)")
+    parser.add_argument("--concurrency", type=int, default=BulkEmailAudit.CONCURRENCY, help="Domains at once")
+    parser.add_argument("--dns-concurrency", type=int, default=DNSEngine.MAX_CONCURRENCY, help="DNS queries at once")
+    parser.add_argument("--interrupt-after", type=int, default=0, help="Kill the first run after N domains, then resume")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
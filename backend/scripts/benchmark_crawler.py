@@ -0,0 +1,103 @@
+"""
+Crawler Throughput Benchmark
+Crawls a local synthetic site (some pages deliberately slow) with the previous
+batch-synchronous BFS and with the worker-pool AsyncCrawler, and compares wall time.
+
+Usage:
+    python scripts/benchmark_crawler.py
+    python scripts/benchmark_crawler.py --pages 200 --slow-every 7 --slow-delay 2.0 --concurrency 10
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+from collections import deque
+
+from aiohttp import web
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.politeness import HostPoliteness
+from app.services.crawler import AsyncCrawler
+
+
+def build_site(pages: int, fanout: int, slow_every: int, slow_delay: float, fast_delay: float) -> web.Application:
+    """Page i links to the next `fanout` pages; every `slow_every`-th page stalls."""
+
+    async def page(request: web.Request) -> web.Response:
+        index = int(request.match_info["index"])
+        await asyncio.sleep(slow_delay if slow_every and index % slow_every == slow_every - 1 else fast_delay)
+        links = "".join(
+            f'<a href="/page/{target}">Page {target}</a>'
+            for target in range(index + 1, min(index + 1 + fanout, pages))
+        )
+        return web.Response(text=f"<html><body><h1>Page {index}</h1>{links}</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/page/{index}", page)
+    return app
+
+
+class BatchCrawler(AsyncCrawler):
+    """The previous algorithm: gather a batch of `concurrency` pages, then schedule the next one."""
+
+    async def crawl(self):
+        import aiohttp
+
+        queue = deque([(self.base_url, 0)])
+        self.visited.add(self.base_url)
+        async with aiohttp.ClientSession() as session:
+            while queue and len(self.visited) < self.max_pages:
+                batch = []
+                while queue and len(batch) < self.concurrency:
+                    batch.append(queue.popleft())
+                results = await asyncio.gather(*(self._process_page(session, url, depth) for url, depth in batch))
+                for result_links in results:
+                    for url, depth in result_links:
+                        if len(self.visited) >= self.max_pages:
+                            break
+                        if url not in self.visited:
+                            self.visited.add(url)
+                            queue.append((url, depth))
+        return self.visited
+
+
+async def run(args):
+    runner = web.AppRunner(build_site(args.pages, args.fanout, args.slow_every, args.slow_delay, args.fast_delay))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    start_url = f"http://127.0.0.1:{args.port}/page/0"
+    # The synthetic site is local: measure the crawler, not the per-host politeness limits
+    HostPoliteness.configure(host_connections=0, host_rps=0)
+
+    print(f"--- Synthetic site: {args.pages} pages, fan-out {args.fanout}, "
+          f"1/{args.slow_every} pages take {args.slow_delay}s ---")
+    try:
+        for label, crawler_cls in (("batch BFS", BatchCrawler), ("worker pool", AsyncCrawler)):
+            # Cap above the site size so both crawlers have to fetch every page
+            crawler = crawler_cls(start_url, max_pages=args.pages + 1, max_depth=args.pages, concurrency=args.concurrency)
+            started = time.perf_counter()
+            visited = await crawler.crawl()
+            elapsed = time.perf_counter() - started
+            print(f"{label:<12} {len(visited):>5} pages in {elapsed:6.2f}s  ({len(visited) / elapsed:6.1f} pages/s)")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch BFS and worker-pool crawler throughput.")
+    parser.add_argument("--pages", type=int, default=150)
+    parser.add_argument("--fanout", type=int, default=4, help="Links per page")
+    parser.add_argument("--slow-every", type=int, default=10, help="Every N-th page is slow (0 disables)")
+    parser.add_argument("--slow-delay", type=float, default=1.5, help="Latency of slow pages (seconds)")
+    parser.add_argument("--fast-delay", type=float, default=0.02, help="Latency of normal pages (seconds)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
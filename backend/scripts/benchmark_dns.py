@@ -0,0 +1,182 @@
+"""
+DNS Analyzer Benchmark
+Local stub DNS server answering after a fixed delay (a slow authoritative server),
+queried by concurrent DNS scans:
+- the former DNSAnalyzer's nine lookups, as serial blocking dns.resolver calls,
+- the same nine lookups on the async DNS engine,
+- the full DNSAnalyzer (SPF include chain, DKIM selector discovery), cold then cached.
+Reports wall time and the worst event-loop lag seen by a ticker task meanwhile.
+
+Usage:
+    python scripts/benchmark_dns.py
+    python scripts/benchmark_dns.py --scans 20 --delay 0.1
+"""
+import sys
+import os
+import argparse
+import asyncio
+import threading
+import time
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dns.message
+import dns.rcode
+import dns.resolver
+import dns.rrset
+
+from app.services.dns_engine import DNSEngine
+from app.services.dns_health import DNSAnalyzer
+
+PORT = 53535
+SOA = "ns.test. hostmaster.test. 1 3600 600 86400 300"
+
+
+LEGACY_DKIM_SELECTORS = ["default", "google", "mail", "k1", "smtp", "sig1"]
+
+
+def zone_records(name: str, rdtype: str):
+    """
+    Records of name, [] for an existing name without such records (NODATA), None
+    for NXDOMAIN. Every site-N.test has A, SPF (including Microsoft 365 through
+    _spf.test) and DMARC records; all but every third have a selector1 DKIM key.
+    """
+    name = name.rstrip(".")
+    labels = name.split(".")
+    if name == "_spf.test":
+        return ['"v=spf1 include:spf.protection.outlook.com ip4:192.0.2.0/24 -all"'] if rdtype == "TXT" else []
+    if name == "spf.protection.outlook.com":
+        return ['"v=spf1 ip4:203.0.113.0/24 -all"'] if rdtype == "TXT" else []
+    if not name.endswith(".test") or not labels[-2].startswith("site-"):
+        return None
+    has_dkim = int(labels[-2].split("-")[1]) % 3 != 0
+    if len(labels) == 2:
+        if rdtype == "A":
+            return ["192.0.2.10"]
+        return ['"v=spf1 include:_spf.test -all"'] if rdtype == "TXT" else []
+    if labels[0] == "_dmarc" and len(labels) == 3:
+        return ['"v=DMARC1; p=reject"'] if rdtype == "TXT" else []
+    if labels[0] == "_domainkey" and len(labels) == 3 and has_dkim:
+        return []  # Empty non-terminal: selectors exist below
+    if labels[:2] == ["selector1", "_domainkey"] and has_dkim:
+        return ['"v=DKIM1; k=rsa; p=MIGf"'] if rdtype == "TXT" else []
+    return None
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        query = dns.message.from_wire(data)
+        question = query.question[0]
+        name, rdtype = question.name.to_text(), dns.rdatatype.to_text(question.rdtype)
+        response = dns.message.make_response(query)
+        records = zone_records(name, rdtype)
+        if records:
+            response.answer.append(dns.rrset.from_text(question.name, 300, "IN", rdtype, *records))
+        else:
+            if records is None:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            response.authority.append(dns.rrset.from_text("test.", 300, "IN", "SOA", SOA))
+        asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, response.to_wire(), addr)
+
+
+def start_stub(delay: float):
+    """Stub server on its own thread and loop: blocking clients cannot stall it"""
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(loop.create_datagram_endpoint(lambda: StubDNS(delay), local_addr=("127.0.0.1", PORT)))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+
+
+def legacy_queries(domain: str):
+    return [(domain, "A"), (domain, "TXT"), (f"_dmarc.{domain}", "TXT")] + [
+        (f"{selector}._domainkey.{domain}", "TXT") for selector in LEGACY_DKIM_SELECTORS
+    ]
+
+
+def blocking_scan(resolver: dns.resolver.Resolver, domain: str):
+    """The former DNSAnalyzer: nine serial lookups on the event loop thread"""
+    for name, rdtype in legacy_queries(domain):
+        try:
+            resolver.resolve(name, rdtype)
+        except dns.exception.DNSException:
+            pass
+
+
+async def measure(label: str, scans):
+    """Run the scans concurrently next to a 10 ms ticker; print wall time and worst loop lag"""
+    worst_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst_lag = max(worst_lag, time.perf_counter() - start - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*scans)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    print(f"{label:<28} {elapsed:8.2f} s   worst loop lag {worst_lag * 1000:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocking vs async DNS scans against a slow stub server.")
+    parser.add_argument("--scans", type=int, default=10, help="Concurrent scans (distinct domains)")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub server answer delay (seconds)")
+    args = parser.parse_args()
+
+    start_stub(args.delay)
+    domains = [f"site-{i}.test" for i in range(args.scans)]
+    print(f"--- {args.scans} concurrent scans, {args.delay * 1000:.0f} ms per answer ---")
+
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = ["127.0.0.1"]
+    resolver.port = PORT
+    resolver.cache = None
+
+    async def legacy(domain):
+        blocking_scan(resolver, domain)
+
+    await measure("9 lookups, blocking serial", [legacy(domain) for domain in domains])
+
+    DNSEngine.configure(nameservers=["127.0.0.1"], port=PORT)
+    await measure("9 lookups, async engine", [DNSEngine.query_many(legacy_queries(domain)) for domain in domains])
+
+    DNSEngine.clear_cache()
+    DNSEngine.stats.update(queries=0, hits=0, coalesced=0)
+    analyzer = DNSAnalyzer()
+    await measure("Full analysis", [analyzer.analyze(f"https://{domain}/") for domain in domains])
+    print(f"  {DNSEngine.stats['queries']} queries sent, {DNSEngine.stats['coalesced']} shared")
+    await measure("Full analysis, cached", [analyzer.analyze(f"https://{domain}/") for domain in domains])
+
+    for domain in domains[:3]:
+        result = await analyzer.analyze(f"https://{domain}/")
+        print(
+            f"{domain}: score {result.score}, SPF {result.spf.status} ({result.spf.dns_lookups} lookups, "
+            f"includes {result.spf.includes}), DKIM {result.dkim.selectors_found or '-'} "
+            f"of {len(result.dkim.selectors_checked)} probed, providers {result.dkim.providers}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Large Crawl Benchmark
+Crawls a local synthetic site with LargeSiteCrawler (Redis frontier + Bloom visited set)
+and reports throughput, worker memory and the Redis footprint of the crawl state.
+
+Requires a reachable Redis (REDIS_URL).
+
+Usage:
+    python scripts/benchmark_large_crawl.py --pages 50000
+    python scripts/benchmark_large_crawl.py --pages 20000 --interrupt-after 5000   # also exercises resume
+"""
+import sys
+import os
+import argparse
+import asyncio
+import resource
+import time
+import tracemalloc
+import uuid
+
+from aiohttp import web
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import get_redis
+from app.core.politeness import HostPoliteness
+from app.services.large_crawl import LargeSiteCrawler
+from scripts.benchmark_crawler import build_site
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def redis_footprint(crawl_id: str) -> int:
+    redis = get_redis()
+    total = 0
+    async for key in redis.scan_iter(match=f"crawl:{crawl_id}:*"):
+        total += await redis.memory_usage(key) or 0
+    return total
+
+
+async def run(args):
+    runner = web.AppRunner(build_site(args.pages, args.fanout, 0, 0.0, args.latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    start_url = f"http://127.0.0.1:{args.port}/page/0"
+    crawl_id = f"bench-{uuid.uuid4().hex[:8]}"
+    # The synthetic site is local: measure the crawler, not the per-host politeness limits
+    HostPoliteness.configure(host_connections=0, host_rps=0)
+
+    print(f"--- Synthetic site: {args.pages} pages, fan-out {args.fanout}, {args.latency * 1000:.0f}ms latency ---")
+    rss_before = peak_rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        if args.interrupt_after:
+            # Simulate a worker dying mid-crawl, then resume the same crawl id
+            crawler = LargeSiteCrawler(crawl_id, start_url, max_pages=args.pages, max_depth=args.pages,
+                                       concurrency=args.concurrency)
+            reached = asyncio.Event()
+
+            def stop_when(progress):
+                if progress["pages_crawled"] >= args.interrupt_after:
+                    reached.set()
+
+            crawler.on_progress = stop_when
+            task = asyncio.create_task(crawler.crawl())
+            await reached.wait()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # A dead worker would not release its lock: let it lapse immediately
+            await get_redis().delete(crawler.lock_key)
+            print(f"interrupted after {crawler.pages_crawled} pages, resuming...")
+
+        footprint = 0
+
+        async def sample(progress):
+            nonlocal footprint
+            if progress["pages_crawled"] % 1000 == 0:
+                footprint = max(footprint, await redis_footprint(crawl_id))
+
+        crawler = LargeSiteCrawler(crawl_id, start_url, max_pages=args.pages, max_depth=args.pages,
+                                   concurrency=args.concurrency, on_progress=sample)
+        stats = await crawler.crawl()
+        elapsed = time.perf_counter() - started
+        _, heap_peak = tracemalloc.get_traced_memory()
+
+        print(f"crawled          {stats['pages_crawled']} pages ({stats['error_pages']} errors) in {elapsed:.1f}s")
+        print(f"throughput       {stats['pages_crawled'] / elapsed:.0f} pages/s")
+        print(f"python heap peak {heap_peak / 1024 / 1024:.1f} MiB")
+        print(f"process RSS      {rss_before:.0f} -> {peak_rss_mb():.0f} MiB (peak)")
+        print(f"redis state peak {footprint / 1024 / 1024:.1f} MiB "
+              f"(bloom {crawler.visited_filter.num_bits / 8 / 1024:.0f} KiB, k={crawler.visited_filter.num_hashes})")
+    finally:
+        tracemalloc.stop()
+        redis = get_redis()
+        async for key in redis.scan_iter(match=f"crawl:{crawl_id}:*"):
+            await redis.delete(key)
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Redis-backed large-site crawler.")
+    parser.add_argument("--pages", type=int, default=50000)
+    parser.add_argument("--fanout", type=int, default=8, help="Links per page")
+    parser.add_argument("--latency", type=float, default=0.005, help="Page latency (seconds)")
+    parser.add_argument("--concurrency", type=int, default=LargeSiteCrawler.CONCURRENCY)
+    parser.add_argument("--interrupt-after", type=int, default=0, help="Kill the first run after N pages, then resume")
+    parser.add_argument("--port", type=int, default=8766)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
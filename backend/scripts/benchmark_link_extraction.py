@@ -0,0 +1,80 @@
+"""
+Link Extraction Benchmark
+Compares the previous crawler path (whole body as text + BeautifulSoup tree) with the
+streaming lxml extractor on a large synthetic page: CPU time and peak Python memory.
+
+Usage:
+    python scripts/benchmark_link_extraction.py
+    python scripts/benchmark_link_extraction.py --links 50000 --filler 400
+"""
+import sys
+import os
+import argparse
+import time
+import tracemalloc
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.html_stream import StreamingLinkExtractor
+
+CHUNK_SIZE = 64 * 1024
+
+
+def page_chunks(links: int, filler: int):
+    """Yields the page as network-sized chunks without ever holding all of it"""
+    yield b"<html><head><title>Big page</title></head><body><nav><a href='/'>Home</a></nav><main>"
+    buffer = []
+    size = 0
+    for i in range(links):
+        row = (f"<div class='card'><p>{'lorem ipsum ' * (filler // 12)}</p>"
+               f"<a href='/products/{i}?ref=list'>Product <b>{i}</b></a><img src='/img/{i}.jpg' alt=''></div>").encode()
+        buffer.append(row)
+        size += len(row)
+        if size >= CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    buffer.append(b"</main></body></html>")
+    yield b"".join(buffer)
+
+
+def soup_extract(links: int, filler: int):
+    from bs4 import BeautifulSoup
+
+    html = b"".join(page_chunks(links, filler)).decode("utf-8")  # response.text()
+    soup = BeautifulSoup(html, "html.parser")
+    return [a_tag["href"] for a_tag in soup.find_all("a", href=True)]
+
+
+def stream_extract(links: int, filler: int):
+    extractor = StreamingLinkExtractor("utf-8")
+    for chunk in page_chunks(links, filler):
+        extractor.feed(chunk)
+    return extractor.close().hrefs
+
+
+def measure(fn, links: int, filler: int):
+    tracemalloc.start()
+    cpu = time.process_time()
+    hrefs = fn(links, filler)
+    cpu = time.process_time() - cpu
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(hrefs), cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare BeautifulSoup and streaming link extraction.")
+    parser.add_argument("--links", type=int, default=20000)
+    parser.add_argument("--filler", type=int, default=200, help="Bytes of text per card")
+    args = parser.parse_args()
+
+    page_size = sum(len(chunk) for chunk in page_chunks(args.links, args.filler))
+    print(f"--- Page: {page_size / 1024 / 1024:.1f} MiB, {args.links + 1} links ---")
+    for label, fn in (("BeautifulSoup", soup_extract), ("streaming", stream_extract)):
+        count, cpu, peak = measure(fn, args.links, args.filler)
+        print(f"{label:<14} {count:>6} links  cpu {cpu * 1000:8.0f} ms  peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Near-Duplicate Detection Benchmark
+Synthetic site of N pages where a share of pages are near-copies of others
+(printer versions, a few edited words, tracking-parameter twins). Measures
+SimHash signing, LSH-banded clustering, and the pairwise scan it replaces
+(timed on a sample and extrapolated, since it is quadratic).
+
+Usage:
+    python scripts/benchmark_near_duplicates.py
+    python scripts/benchmark_near_duplicates.py --pages 50000 --duplicates 0.1
+"""
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.near_duplicates import NearDuplicateIndex, SimHashBuilder, hamming_distance
+
+VOCABULARY = [f"word{i}" for i in range(20000)]
+
+
+def build_pages(pages: int, duplicate_share: float, words: int, seed: int):
+    """(texts, originals): originals[i] is the page i was copied from, or None"""
+    rng = random.Random(seed)
+    texts, originals = [], []
+    for i in range(pages):
+        if texts and rng.random() < duplicate_share:
+            source = rng.randrange(len(texts))
+            while originals[source] is not None:
+                source = originals[source]
+            tokens = texts[source].split()
+            variant = rng.choice(("print", "edit", "same"))
+            if variant == "print":
+                tokens += ["printer", "friendly", "version"]
+            elif variant == "edit":
+                for _ in range(2):
+                    tokens[rng.randrange(len(tokens))] = rng.choice(VOCABULARY)
+            texts.append(" ".join(tokens))
+            originals.append(source)
+        else:
+            texts.append(" ".join(rng.choice(VOCABULARY) for _ in range(words)))
+            originals.append(None)
+    return texts, originals
+
+
+def sign(texts):
+    signatures = []
+    for text in texts:
+        builder = SimHashBuilder()
+        # Fed in pieces, as the streaming parser does
+        for start in range(0, len(text), 512):
+            builder.feed(text[start:start + 512])
+        signatures.append(builder.finish())
+    return signatures
+
+
+def pairwise_pairs(signatures, max_distance):
+    matches = 0
+    for i in range(len(signatures)):
+        a = signatures[i]
+        for j in range(i + 1, len(signatures)):
+            if hamming_distance(a, signatures[j]) <= max_distance:
+                matches += 1
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimHash + LSH duplicate clustering against a pairwise scan.")
+    parser.add_argument("--pages", type=int, default=12000)
+    parser.add_argument("--duplicates", type=float, default=0.05, help="Share of pages that copy another page")
+    parser.add_argument("--words", type=int, default=400, help="Words of text per page")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--pairwise-sample", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts, originals = build_pages(args.pages, args.duplicates, args.words, args.seed)
+    copies = sum(1 for original in originals if original is not None)
+    print(f"--- {args.pages} pages, {copies} near-copies, {args.words} words each ---")
+
+    start = time.perf_counter()
+    signatures = sign(texts)
+    sign_time = time.perf_counter() - start
+    print(f"SimHash signing      {sign_time:8.2f} s  ({sign_time / args.pages * 1000:.2f} ms/page)")
+
+    start = time.perf_counter()
+    index = NearDuplicateIndex(args.max_distance)
+    for page, signature in enumerate(signatures):
+        index.add(page, signature)
+    clusters = index.clusters()
+    lsh_time = time.perf_counter() - start
+    print(f"LSH clustering       {lsh_time:8.2f} s  ({index.comparisons} comparisons, {len(clusters)} clusters)")
+
+    # Recall: copies that ended up in their original's cluster
+    cluster_of = {page: number for number, members in enumerate(clusters) for page in members}
+    found = sum(
+        1 for page, original in enumerate(originals)
+        if original is not None and page in cluster_of and cluster_of[page] == cluster_of.get(original)
+    )
+    # False merges: clusters joining pages copied from different originals
+    mixed = sum(
+        1 for members in clusters
+        if len({originals[page] if originals[page] is not None else page for page in members}) > 1
+    )
+    print(f"Recall               {found}/{copies} copies clustered with their original, {mixed} mixed clusters")
+
+    sample = signatures[:args.pairwise_sample]
+    start = time.perf_counter()
+    pairwise_pairs(sample, args.max_distance)
+    sample_time = time.perf_counter() - start
+    estimate = sample_time * (args.pages / len(sample)) ** 2
+    print(f"Pairwise scan        {sample_time:8.2f} s  on {len(sample)} pages -> ~{estimate:.0f} s estimated for {args.pages}")
+
+
+if __name__ == "__main__":
+    main()
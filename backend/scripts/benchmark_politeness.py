@@ -0,0 +1,137 @@
+"""
+Host Politeness Benchmark
+Several "workers" (threads, each with its own event loop like Celery tasks)
+scan the same local site at once: link checks (httpx) and a crawl (aiohttp)
+per worker. The site behaves like a WAF: above a few requests at once or per
+second it answers 429 with Retry-After. Runs once without coordination and
+once through HostPoliteness, and reports what the site saw.
+
+Uses Redis when REDIS_URL is set, else the in-process schedule (shared by the
+threads of this process).
+
+Usage:
+    python scripts/benchmark_politeness.py
+    python scripts/benchmark_politeness.py --workers 6 --links 60 --waf-connections 8 --waf-rps 15
+"""
+import sys
+import os
+import argparse
+import asyncio
+import collections
+import threading
+import time
+
+import httpx
+from aiohttp import web
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.politeness import HostPoliteness, polite_client
+from app.services.crawler import AsyncCrawler
+from scripts.benchmark_crawler import build_site
+
+
+class WAF:
+    """Counts what the site sees; refuses requests above its connection / rate limits"""
+
+    def __init__(self, max_connections: int, max_rps: int):
+        self.max_connections = max_connections
+        self.max_rps = max_rps
+        self.active = 0
+        self.peak_active = 0
+        self.recent = collections.deque()
+        self.peak_rps = 0
+        self.served = 0
+        self.refused = 0
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        now = time.monotonic()
+        self.recent.append(now)
+        while self.recent[0] < now - 1.0:
+            self.recent.popleft()
+        self.peak_rps = max(self.peak_rps, len(self.recent))
+        if self.active >= self.max_connections or len(self.recent) > self.max_rps:
+            self.refused += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            self.served += 1
+            return await handler(request)
+        finally:
+            self.active -= 1
+
+
+def scan_worker(start_url: str, links: int, polite: bool, errors: list):
+    async def scan():
+        base = start_url.rsplit("/", 1)[0]
+        make_client = polite_client if polite else httpx.AsyncClient
+        async with make_client(timeout=30.0) as client:
+            async def check(index: int):
+                await client.head(f"{base}/{index}")
+
+            crawler = AsyncCrawler(start_url, max_pages=links, max_depth=links, concurrency=10,
+                                   respect_robots=False, use_sitemaps=False)
+            await asyncio.gather(crawler.crawl(), *(check(i) for i in range(links)))
+
+    try:
+        asyncio.run(scan())
+    except Exception as e:
+        errors.append(e)
+
+
+async def run(args):
+    for polite in (False, True):
+        waf = WAF(args.waf_connections, args.waf_rps)
+        app = build_site(args.links * 2, 4, 0, 0.0, args.latency)
+        app.middlewares.append(waf.middleware)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", args.port)
+        await site.start()
+
+        if polite:
+            HostPoliteness.configure(host_connections=args.connections, host_rps=args.rps)
+            HostPoliteness.REFUSAL_STATUSES = (429, 503)
+        else:
+            # Baseline: no limits and no backoff, every source on its own
+            HostPoliteness.configure(host_connections=0, host_rps=0)
+            HostPoliteness.REFUSAL_STATUSES = ()
+
+        errors = []
+        threads = [
+            threading.Thread(target=scan_worker, args=(f"http://127.0.0.1:{args.port}/page/0", args.links, polite, errors))
+            for _ in range(args.workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            await asyncio.sleep(0.05)  # Keep serving the site meanwhile
+        elapsed = time.perf_counter() - started
+        await runner.cleanup()
+
+        label = f"polite ({args.connections} conns, {args.rps:g} req/s)" if polite else "uncoordinated"
+        total = waf.served + waf.refused
+        print(f"{label:<28} {total:>5} requests in {elapsed:5.1f}s, {waf.refused:>4} refused (429) "
+              f"= {100 * waf.refused / max(1, total):4.1f}%, peak {waf.peak_active} at once, "
+              f"peak {waf.peak_rps} req/s" + (f", {len(errors)} worker errors" if errors else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare uncoordinated and host-scheduled traffic on a rate-limited site.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent scans of the same site")
+    parser.add_argument("--links", type=int, default=40, help="Link checks and crawled pages per scan")
+    parser.add_argument("--latency", type=float, default=0.02, help="Page latency (seconds)")
+    parser.add_argument("--connections", type=int, default=6, help="Per-host connections (polite run)")
+    parser.add_argument("--rps", type=float, default=10.0, help="Per-host requests per second (polite run)")
+    parser.add_argument("--waf-connections", type=int, default=8, help="Site refuses above this many requests at once")
+    parser.add_argument("--waf-rps", type=int, default=15, help="Site refuses above this many requests per second")
+    parser.add_argument("--port", type=int, default=8767)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
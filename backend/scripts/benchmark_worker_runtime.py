@@ -0,0 +1,151 @@
+"""
+Worker Runtime Benchmark
+Runs the same batch of scans (security, tech, links, social and Green IT
+checks against a local site with a fixed page latency) the two ways a Celery
+worker can run them, and reports throughput per GB of worker memory:
+
+- per-task loop: prefork-style processes, each running one scan at a time on
+  a fresh event loop (async_to_sync), as process_scan_task used to;
+- shared loop: one process whose threads hand their scans to AsyncRuntime's
+  long-lived loop (`celery worker -P threads`), up to --inflight at once.
+
+The site is served from its own process so it does not compete with the
+workers for the GIL. Redis is not used (REDIS_URL is cleared).
+
+Usage:
+    python scripts/benchmark_worker_runtime.py
+    python scripts/benchmark_worker_runtime.py --scans 64 --processes 4 --threads 32 --inflight 32 --latency 0.05
+"""
+import sys
+import os
+import argparse
+import multiprocessing
+import queue
+import resource
+import threading
+import time
+
+os.environ["REDIS_URL"] = ""
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgiref.sync import async_to_sync
+from aiohttp import web
+
+from app.core.async_runtime import AsyncRuntime
+from app.core.politeness import HostPoliteness
+from app.services.scanner import process_url
+from scripts.benchmark_crawler import build_site
+
+FEATURES = ["basic_scan", "security_scan", "tech_scan", "links_scan", "smo_scan", "green_scan"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def serve_site(port: int, pages: int, latency: float):
+    app = build_site(pages, 4, 0, 0.0, latency)
+    web.run_app(app, host="127.0.0.1", port=port, print=None, handle_signals=False)
+
+
+def scan_urls(port: int, scans: int, pages: int):
+    return [f"http://127.0.0.1:{port}/page/{(i * 7) % pages}" for i in range(scans)]
+
+
+def per_task_worker(urls, results):
+    """One scan at a time, each on its own event loop"""
+    HostPoliteness.configure(host_connections=0, host_rps=0)
+    done = failed = 0
+    for url in urls:
+        try:
+            async_to_sync(lambda: process_url(url, "en", FEATURES))()
+            done += 1
+        except Exception:
+            failed += 1
+    results.put((done, failed, peak_rss_mb()))
+
+
+def shared_loop_worker(urls, threads: int, inflight: int, results):
+    """Threads hand their scans to the process's shared loop"""
+    HostPoliteness.configure(host_connections=0, host_rps=0)
+    AsyncRuntime.configure(inflight)
+    pending = queue.Queue()
+    for url in urls:
+        pending.put(url)
+    counts = {"done": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def consume():
+        while True:
+            try:
+                url = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                AsyncRuntime.run(lambda: process_url(url, "en", FEATURES))
+                outcome = "done"
+            except Exception:
+                outcome = "failed"
+            with lock:
+                counts[outcome] += 1
+
+    pool = [threading.Thread(target=consume) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    peak_running = AsyncRuntime.stats["peak_running"]
+    AsyncRuntime.stop()
+    results.put((counts["done"], counts["failed"], peak_rss_mb(), peak_running))
+
+
+def run_mode(label: str, workers):
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [multiprocessing.Process(target=target, args=(*args, results)) for target, args in workers]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    done = sum(report[0] for report in reports)
+    failed = sum(report[1] for report in reports)
+    rss = sum(report[2] for report in reports)
+    rate = done / elapsed
+    extra = f", peak {reports[0][3]} scans at once" if len(reports[0]) > 3 else ""
+    print(f"{label:<34} {done:>4} scans in {elapsed:6.1f}s = {rate:5.2f} scans/s, "
+          f"RSS {rss:6.0f} MB over {len(processes)} process(es) = {rate / (rss / 1024):6.1f} scans/s per GB"
+          + (f", {failed} failed" if failed else "") + extra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-task event loops with the shared worker loop.")
+    parser.add_argument("--scans", type=int, default=32, help="Scans in the batch")
+    parser.add_argument("--processes", type=int, default=4, help="Prefork processes (per-task loop mode)")
+    parser.add_argument("--threads", type=int, default=32, help="Task threads of the shared-loop process")
+    parser.add_argument("--inflight", type=int, default=32, help="Scans at once on the shared loop (WORKER_MAX_INFLIGHT)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages of the local site")
+    parser.add_argument("--latency", type=float, default=0.05, help="Page latency (seconds)")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    site = multiprocessing.Process(target=serve_site, args=(args.port, args.pages, args.latency), daemon=True)
+    site.start()
+    time.sleep(1.0)
+
+    urls = scan_urls(args.port, args.scans, args.pages)
+    print(f"--- {args.scans} scans ({', '.join(FEATURES[1:])}), {args.latency * 1000:.0f} ms per page ---")
+    shares = [urls[index::args.processes] for index in range(args.processes)]
+    run_mode(f"per-task loop ({args.processes} processes)", [(per_task_worker, (share,)) for share in shares])
+    run_mode(f"shared loop (1 process, {args.inflight} in flight)",
+             [(shared_loop_worker, (urls, args.threads, args.inflight))])
+    site.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Import CVE Feeds
+Builds the offline CVE index from NVD JSON feeds and/or OSV dumps.
+
+Usage:
+    python scripts/import_cve_feed.py nvdcve-2.0-2024.json.gz nvdcve-2.0-2025.json.gz
+    python scripts/import_cve_feed.py osv-npm-all.zip --output data/cve_index.sqlite3
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.services.cve_index import CVEIndexBuilder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local CVE index from offline feeds.")
+    parser.add_argument("feeds", nargs="+", help="NVD .json/.json.gz files, OSV .json/.jsonl files or OSV .zip dumps")
+    parser.add_argument("--output", default=None, help="Index path (defaults to CVE_INDEX_PATH)")
+    args = parser.parse_args()
+
+    output = args.output or get_settings().cve_index_path
+    print(f"--- Building CVE index: {output} ---")
+
+    started = time.time()
+    builder = CVEIndexBuilder(output)
+    for feed in args.feeds:
+        print(f"Importing {feed}...")
+        builder.ingest_file(feed)
+
+    stats = builder.finalize()
+    print(f"Done: {stats['vulns']} vulnerabilities, {stats['ranges']} version ranges in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Import JS Library Hashes
+Builds the known-library hash index used for hash-based JavaScript version detection.
+
+Usage:
+    python scripts/import_js_hashes.py --retire jsrepository.json
+    python scripts/import_js_hashes.py --directory ./libs   # ./libs/<library>/<version>/*.js
+"""
+import sys
+import os
+import argparse
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.services.js_hashes import JSHashIndexBuilder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the known JS library hash index.")
+    parser.add_argument("--retire", action="append", default=[], help="retire.js jsrepository.json (SHA-1 hashes)")
+    parser.add_argument("--directory", action="append", default=[], help="Directory of library files: <library>/<version>/*.js")
+    parser.add_argument("--output", default=None, help="Index path (defaults to JS_HASH_INDEX_PATH)")
+    args = parser.parse_args()
+
+    if not args.retire and not args.directory:
+        parser.error("Provide at least one --retire or --directory source")
+
+    output = args.output or get_settings().js_hash_index_path
+    print(f"--- Building JS hash index: {output} ---")
+
+    builder = JSHashIndexBuilder(output)
+    for path in args.retire:
+        print(f"Importing retire.js repository {path}...")
+        builder.ingest_retire_repository(path)
+    for path in args.directory:
+        print(f"Hashing library files in {path}...")
+        builder.ingest_directory(path)
+
+    print(f"Done: {builder.finalize()} hashes indexed")
+
+
+if __name__ == "__main__":
+    main()
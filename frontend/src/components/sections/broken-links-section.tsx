@@ -49,6 +49,11 @@ export function BrokenLinksSection({ data, className }: BrokenLinksSectionProps)
                         <Badge variant="outline" className="text-zinc-400 border-zinc-700">
                             {data.total_links_checked} {t.links.checked}
                         </Badge>
+                        {!!data.unchecked_count && (
+                            <Badge variant="outline" className="text-amber-400 border-amber-500/50">
+                                {data.unchecked_count} {t.links.unchecked}
+                            </Badge>
+                        )}
                         {hasBrokenLinks ? (
                             <Badge variant="outline" className="border-red-500/50 text-red-400">
                                 <XCircle className="w-3 h-3 mr-1" />
@@ -124,6 +129,23 @@ export function BrokenLinksSection({ data, className }: BrokenLinksSectionProps)
                                                             {t.links.linkText}: &ldquo;{link.source_text}&rdquo;
                                                         </p>
                                                     )}
+                                                    {link.sources && link.sources.length > 0 && (
+                                                        <div className="text-xs text-zinc-500 mt-1">
+                                                            <p>
+                                                                {t.links.foundOn} {link.source_count ?? link.sources.length} {t.links.pages}:
+                                                            </p>
+                                                            <ul className="mt-1 space-y-0.5">
+                                                                {link.sources.map((source) => (
+                                                                    <li key={source.page} className="font-mono truncate">
+                                                                        {source.page}
+                                                                        {source.anchor_text && (
+                                                                            <span className="font-sans text-zinc-600"> &ldquo;{source.anchor_text}&rdquo;</span>
+                                                                        )}
+                                                                    </li>
+                                                                ))}
+                                                            </ul>
+                                                        </div>
+                                                    )}
                                                 </div>
                                                 <Badge
                                                     variant="outline"
@@ -58,6 +58,17 @@ export function DnsSection({ data }: DnsSectionProps) {
                     </div>
                 )}
 
+                {data.mx && (
+                    <div className="flex items-center gap-2 text-sm text-zinc-500 mb-2 pl-1">
+                        <AtSign className="w-4 h-4" />
+                        {data.mx.status === "valid" && (
+                            <span>Serveurs mail (MX) : <span className="font-mono text-zinc-300">{data.mx.records.join(", ")}</span></span>
+                        )}
+                        {data.mx.status === "null" && <span>MX nul : ce domaine déclare ne recevoir aucun email.</span>}
+                        {data.mx.status === "missing" && <span className="text-yellow-500">Aucun enregistrement MX : ce domaine ne peut pas recevoir d'emails.</span>}
+                    </div>
+                )}
+
                 {/* SPF Card */}
                 <div className={`p-5 rounded-xl border ${getStatusColor(data.spf.status)}`}>
                     <div className="flex items-start justify-between mb-4">
@@ -81,6 +92,15 @@ export function DnsSection({ data }: DnsSectionProps) {
                         <div className="text-sm italic opacity-70 mb-4">Aucun enregistrement SPF trouvé.</div>
                     )}
 
+                    {data.spf.present && data.spf.dns_lookups !== undefined && (
+                        <div className="text-xs text-zinc-400 mb-2">
+                            Requêtes DNS : <strong className={data.spf.dns_lookups > 10 ? "text-red-400" : "text-zinc-300"}>{data.spf.dns_lookups}/10</strong>
+                            {data.spf.includes && data.spf.includes.length > 0 && (
+                                <span className="font-mono"> · {data.spf.includes.join(", ")}</span>
+                            )}
+                        </div>
+                    )}
+
                     {data.spf.warnings.length > 0 && (
                         <div className="space-y-2 mt-2">
                             {data.spf.warnings.map((w, i) => (
@@ -157,6 +177,12 @@ export function DnsSection({ data }: DnsSectionProps) {
                             Sélecteurs trouvés : {data.dkim.selectors_found.join(", ")}
                         </div>
                     )}
+
+                    {data.dkim?.providers && data.dkim.providers.length > 0 && (
+                        <div className="mt-2 text-xs text-zinc-400">
+                            Expéditeurs détectés via SPF : {data.dkim.providers.join(", ")}
+                        </div>
+                    )}
                 </div>
 
                 {/* Educational Section */}
@@ -31,7 +31,8 @@ import {
     AlertTriangle,
     ArrowRight,
     Info,
-    HelpCircle
+    HelpCircle,
+    Copy
 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { SEOResult } from "@/types";
@@ -379,6 +380,134 @@ export function SEOSection({ data, className }: SEOSectionProps) {
                     </div>
                 )}
 
+                {/* Duplicate content across crawled pages */}
+                {data.duplicate_clusters && data.duplicate_clusters.length > 0 && (
+                    <div>
+                        <div className="flex items-center gap-2 mb-3">
+                            <h3 className="text-sm font-medium text-zinc-500">
+                                {t.seo.duplicateContent} ({data.duplicate_clusters.length})
+                            </h3>
+                            <TooltipProvider>
+                                <Tooltip>
+                                    <TooltipTrigger>
+                                        <HelpCircle className="w-3.5 h-3.5 text-zinc-600" />
+                                    </TooltipTrigger>
+                                    <TooltipContent className="max-w-xs bg-zinc-900 border-zinc-800">
+                                        <p className="text-sm">{t.seo.duplicateContentDesc}</p>
+                                    </TooltipContent>
+                                </Tooltip>
+                            </TooltipProvider>
+                        </div>
+                        <div className="space-y-2">
+                            {data.duplicate_clusters.slice(0, 5).map((cluster) => (
+                                <div
+                                    key={cluster.pages[0]}
+                                    className="p-3 rounded-lg bg-amber-500/5 border border-amber-500/20"
+                                >
+                                    <div className="flex items-center gap-2 mb-1">
+                                        <Copy className="w-4 h-4 text-amber-400" />
+                                        <span className="text-xs text-zinc-400">
+                                            {cluster.size} pages · {cluster.max_distance === 0 ? t.seo.identical : t.seo.nearIdentical}
+                                        </span>
+                                    </div>
+                                    <ul className="space-y-0.5">
+                                        {cluster.pages.slice(0, 5).map((page) => (
+                                            <li key={page} className="text-xs font-mono text-zinc-300 truncate">
+                                                {page}
+                                            </li>
+                                        ))}
+                                    </ul>
+                                </div>
+                            ))}
+                        </div>
+                    </div>
+                )}
+
+                {/* On-page audit of every crawled page */}
+                {data.site_audit && data.site_audit.pages_audited > 0 && (
+                    <div>
+                        <div className="flex items-center gap-2 mb-3">
+                            <h3 className="text-sm font-medium text-zinc-500">
+                                {t.seo.siteAudit} · {data.site_audit.pages_with_issues}/{data.site_audit.pages_audited} {t.seo.pagesWithIssues}
+                            </h3>
+                            <TooltipProvider>
+                                <Tooltip>
+                                    <TooltipTrigger>
+                                        <HelpCircle className="w-3.5 h-3.5 text-zinc-600" />
+                                    </TooltipTrigger>
+                                    <TooltipContent className="max-w-xs bg-zinc-900 border-zinc-800">
+                                        <p className="text-sm">{t.seo.siteAuditDesc}</p>
+                                    </TooltipContent>
+                                </Tooltip>
+                            </TooltipProvider>
+                        </div>
+                        <div className="space-y-1.5 mb-4">
+                            {data.site_audit.issues.map((issue) => (
+                                <div
+                                    key={issue.code}
+                                    className="flex items-center justify-between gap-3 p-2 rounded-lg bg-zinc-800/30 border border-zinc-800"
+                                >
+                                    <div className="flex items-center gap-2 min-w-0">
+                                        <AlertTriangle className="w-4 h-4 text-amber-400 shrink-0" />
+                                        <span className="text-sm text-zinc-300 truncate">
+                                            {t.seo.auditIssues[issue.code] ?? issue.code}
+                                        </span>
+                                    </div>
+                                    <Badge variant="outline" className="text-xs border-zinc-700 text-zinc-400 shrink-0">
+                                        {issue.pages} pages
+                                    </Badge>
+                                </div>
+                            ))}
+                        </div>
+
+                        {[
+                            { label: t.seo.duplicateTitles, groups: data.site_audit.duplicate_titles },
+                            { label: t.seo.duplicateDescriptions, groups: data.site_audit.duplicate_descriptions },
+                        ].filter(({ groups }) => groups.length > 0).map(({ label, groups }) => (
+                            <div key={label} className="mb-4">
+                                <h4 className="text-xs font-medium text-zinc-500 mb-2">{label}</h4>
+                                <div className="space-y-2">
+                                    {groups.slice(0, 5).map((group) => (
+                                        <div
+                                            key={group.value}
+                                            className="p-3 rounded-lg bg-amber-500/5 border border-amber-500/20"
+                                        >
+                                            <div className="flex items-center gap-2 mb-1">
+                                                <Copy className="w-4 h-4 text-amber-400 shrink-0" />
+                                                <span className="text-sm text-zinc-300 truncate">{group.value}</span>
+                                                <span className="text-xs text-zinc-500 shrink-0">· {group.size} pages</span>
+                                            </div>
+                                            <ul className="space-y-0.5">
+                                                {group.pages.map((page) => (
+                                                    <li key={page} className="text-xs font-mono text-zinc-400 truncate">
+                                                        {page}
+                                                    </li>
+                                                ))}
+                                            </ul>
+                                        </div>
+                                    ))}
+                                </div>
+                            </div>
+                        ))}
+
+                        {data.site_audit.top_offenders.length > 0 && (
+                            <div>
+                                <h4 className="text-xs font-medium text-zinc-500 mb-2">{t.seo.topOffenders}</h4>
+                                <ul className="space-y-1.5">
+                                    {data.site_audit.top_offenders.slice(0, 5).map((page) => (
+                                        <li key={page.url} className="p-2 rounded-lg bg-zinc-800/30 border border-zinc-800">
+                                            <p className="text-xs font-mono text-zinc-300 truncate">{page.url}</p>
+                                            <p className="text-xs text-zinc-500 truncate">
+                                                {page.issues.map((code) => t.seo.auditIssues[code] ?? code).join(" · ")}
+                                            </p>
+                                        </li>
+                                    ))}
+                                </ul>
+                            </div>
+                        )}
+                    </div>
+                )}
+
                 {/* Error state */}
                 {data.error && (
                     <div className="p-4 rounded-lg bg-red-500/10 border border-red-500/30 text-red-400 flex items-center gap-2">
@@ -71,6 +71,17 @@ interface SEOTranslations {
     bestPracticesDesc: string;
     opportunitiesDesc: string;
     lighthouseInfo: string;
+    duplicateContent: string;
+    duplicateContentDesc: string;
+    identical: string;
+    nearIdentical: string;
+    siteAudit: string;
+    siteAuditDesc: string;
+    pagesWithIssues: string;
+    topOffenders: string;
+    duplicateTitles: string;
+    duplicateDescriptions: string;
+    auditIssues: Record<string, string>;
 }
 
 interface SecurityTranslations {
@@ -130,6 +141,9 @@ interface LinksTranslations {
     allLinksWorking: string;
     linksCheckedValid: string;
     linkText: string;
+    foundOn: string;
+    pages: string;
+    unchecked: string;
 }
 
 interface CWVMetricTranslations {
@@ -232,6 +246,35 @@ export const translations: Record<Language, TranslationKeys> = {
             bestPracticesDesc: "Checks for common web development best practices including HTTPS, image optimization, and modern JavaScript.",
             opportunitiesDesc: "These optimizations could improve your page load time. Sorted by potential impact.",
             lighthouseInfo: "Scores from Google Lighthouse. Hover over any metric for details.",
+            duplicateContent: "Duplicate Content",
+            duplicateContentDesc: "Crawled pages whose main text is identical or nearly so (URL parameters, printer versions, thin tag pages). Keep one version or point the others to it with a canonical tag.",
+            identical: "Identical",
+            nearIdentical: "Near-identical",
+            siteAudit: "On-page Audit (all pages)",
+            siteAuditDesc: "Title, meta description, H1, image alts, viewport, canonical and hreflang checked on every crawled page.",
+            pagesWithIssues: "pages with issues",
+            topOffenders: "Pages with the most issues",
+            duplicateTitles: "Duplicate titles",
+            duplicateDescriptions: "Duplicate meta descriptions",
+            auditIssues: {
+                title_missing: "Missing title",
+                title_too_long: "Title too long (over 60 characters)",
+                title_duplicate: "Title shared with other pages",
+                description_missing: "Missing meta description",
+                description_too_long: "Meta description too long (over 160 characters)",
+                description_duplicate: "Meta description shared with other pages",
+                h1_missing: "No H1 heading",
+                h1_multiple: "Several H1 headings",
+                image_alt_missing: "Images without alt attribute",
+                viewport_missing: "No viewport meta tag",
+                noindex: "Excluded from indexing (noindex)",
+                canonical_missing: "No canonical tag",
+                canonical_broken: "Canonical points to an error page",
+                canonical_chain: "Canonical points to a page canonicalized elsewhere",
+                hreflang_no_self: "Hreflang set does not include the page itself",
+                hreflang_no_return: "Hreflang alternate does not link back",
+                hreflang_broken: "Hreflang alternate is an error page",
+            },
         },
 
         security: {
@@ -375,6 +418,9 @@ export const translations: Record<Language, TranslationKeys> = {
             allLinksWorking: "All Links Working",
             linksCheckedValid: "links were checked and all are valid",
             linkText: "Link text",
+            foundOn: "Found on",
+            pages: "pages",
+            unchecked: "not checked (time limit)",
         },
 
         cwv: {
@@ -488,6 +534,35 @@ export const translations: Record<Language, TranslationKeys> = {
             bestPracticesDesc: "Vérifie les bonnes pratiques de développement web incluant HTTPS, l'optimisation des images et le JavaScript moderne.",
             opportunitiesDesc: "Ces optimisations pourraient améliorer le temps de chargement de votre page. Triées par impact potentiel.",
             lighthouseInfo: "Scores de Google Lighthouse. Survolez une métrique pour plus de détails.",
+            duplicateContent: "Contenu dupliqué",
+            duplicateContentDesc: "Pages crawlées dont le texte principal est identique ou presque (paramètres d'URL, versions imprimables, pages de tags pauvres). Gardez une seule version ou faites pointer les autres vers elle avec une balise canonical.",
+            identical: "Identiques",
+            nearIdentical: "Quasi identiques",
+            siteAudit: "Audit on-page (toutes les pages)",
+            siteAuditDesc: "Title, meta description, H1, attributs alt, viewport, canonical et hreflang vérifiés sur chaque page crawlée.",
+            pagesWithIssues: "pages avec des problèmes",
+            topOffenders: "Pages les plus problématiques",
+            duplicateTitles: "Titres dupliqués",
+            duplicateDescriptions: "Meta descriptions dupliquées",
+            auditIssues: {
+                title_missing: "Title absent",
+                title_too_long: "Title trop long (plus de 60 caractères)",
+                title_duplicate: "Title partagé avec d'autres pages",
+                description_missing: "Meta description absente",
+                description_too_long: "Meta description trop longue (plus de 160 caractères)",
+                description_duplicate: "Meta description partagée avec d'autres pages",
+                h1_missing: "Aucun titre H1",
+                h1_multiple: "Plusieurs titres H1",
+                image_alt_missing: "Images sans attribut alt",
+                viewport_missing: "Pas de balise meta viewport",
+                noindex: "Exclue de l'indexation (noindex)",
+                canonical_missing: "Pas de balise canonical",
+                canonical_broken: "La canonical pointe vers une page en erreur",
+                canonical_chain: "La canonical pointe vers une page elle-même canonicalisée ailleurs",
+                hreflang_no_self: "Les hreflang n'incluent pas la page elle-même",
+                hreflang_no_return: "Une alternative hreflang ne renvoie pas vers la page",
+                hreflang_broken: "Une alternative hreflang est une page en erreur",
+            },
         },
 
         security: {
@@ -631,6 +706,9 @@ export const translations: Record<Language, TranslationKeys> = {
             allLinksWorking: "Tous les liens fonctionnent",
             linksCheckedValid: "liens ont été vérifiés et sont tous valides",
             linkText: "Texte du lien",
+            foundOn: "Présent sur",
+            pages: "pages",
+            unchecked: "non vérifiés (limite de temps)",
         },
 
         cwv: {
@@ -53,9 +53,40 @@ export interface SEOResult {
         displayValue: string;
         score: number | null;
     }>;
+    duplicate_clusters?: DuplicateCluster[];
+    pages_compared?: number;
+    site_audit?: SiteAuditResult | null;
     error: string | null;
 }
 
+export interface DuplicateCluster {
+    pages: string[];
+    size: number;
+    max_distance: number;
+}
+
+export interface SiteAuditIssue {
+    code: string;
+    pages: number;
+    examples: string[];
+}
+
+export interface DuplicateMeta {
+    value: string;
+    size: number;
+    pages: string[];
+}
+
+export interface SiteAuditResult {
+    pages_audited: number;
+    pages_with_issues: number;
+    pages_reused: number;
+    issues: SiteAuditIssue[];
+    duplicate_titles: DuplicateMeta[];
+    duplicate_descriptions: DuplicateMeta[];
+    top_offenders: Array<{ url: string; issues: string[] }>;
+}
+
 // Security - Enhanced with evidence and remediation
 export interface SecurityHeader {
     name: string;
@@ -165,12 +196,19 @@ export interface TechStackResult {
 }
 
 // Broken Links
+export interface LinkSource {
+    page: string;
+    anchor_text: string | null;
+}
+
 export interface BrokenLink {
     url: string;
     status_code: number;
     source_text: string | null;
     is_internal: boolean;
     error_type: string;
+    sources?: LinkSource[];
+    source_count?: number;
 }
 
 export interface BrokenLinksResult {
@@ -179,6 +217,7 @@ export interface BrokenLinksResult {
     broken_count: number;
     internal_broken: number;
     external_broken: number;
+    unchecked_count?: number;
     error: string | null;
 }
 
@@ -241,6 +280,8 @@ export interface SPFInfo {
     record: string | null;
     status: "valid" | "warning" | "critical" | "missing";
     warnings: string[];
+    dns_lookups?: number;
+    includes?: string[];
 }
 
 export interface DMARCInfo {
@@ -256,12 +297,20 @@ export interface DKIMInfo {
     selectors_found: string[];
     status: "manual_check" | "found" | "missing";
     note: string;
+    providers?: string[];
+}
+
+export interface MXInfo {
+    present: boolean;
+    records: string[];
+    status: "valid" | "null" | "missing";
 }
 
 export interface DNSHealthResult {
     spf: SPFInfo;
     dmarc: DMARCInfo;
     dkim: DKIMInfo;
+    mx?: MXInfo;
     domain: string | null;
     server_ip: string | null;
     score: number;